@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Load the common-password list once at startup instead of on the first registration
+        from django.contrib.auth.password_validation import get_default_password_validators
+        get_default_password_validators()
+        from . import checks  # noqa: F401
@@ -0,0 +1,138 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from social.profile import invalidate_profile
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Avatar renditions
+# ------------------------------------------------------------
+# Each uploaded profile image is center-cropped to a square and saved once
+# per size in AVATAR_SIZES, off the request thread. The rendition URLs are
+# stored on the user (User.avatar_urls), so serializers pick one without
+# touching storage; until they exist the original image is served.
+
+def avatar_dir(user_id):
+    return f"profile_pics/avatars/{user_id}"
+
+
+def render_avatars(source, sizes):
+    """Square JPEG bytes for each size, from one crop of the source image"""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            # Transparent areas become white instead of black
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            rgba = image.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background
+        side = min(image.size)
+        square = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+
+    renditions = {}
+    for size in sorted(sizes, reverse=True):
+        resized = square.resize((min(size, side),) * 2, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, "JPEG", quality=_setting("AVATAR_JPEG_QUALITY", 85), optimize=True, progressive=True)
+        renditions[size] = buffer.getvalue()
+    return renditions
+
+
+def process_avatar(user_id, image_name):
+    """
+    Build the renditions of `image_name` and publish their URLs, unless the
+    user uploaded another image meanwhile. Older renditions are removed.
+    """
+    field = User._meta.get_field("image")
+    storage = field.storage
+    with storage.open(image_name) as source:
+        renditions = render_avatars(source, _setting("AVATAR_SIZES", (48, 96, 320)))
+
+    # New names per source image, so rendition URLs can be cached forever
+    token = hashlib.sha256(image_name.encode()).hexdigest()[:12]
+    directory = avatar_dir(user_id)
+    urls, names = {}, []
+    for size, data in renditions.items():
+        name = storage.save(f"{directory}/{token}-{size}.jpg", ContentFile(data))
+        names.append(name)
+        urls[str(size)] = storage.url(name)
+
+    with transaction.atomic():
+        updated = User.objects.filter(pk=user_id, image=image_name).update(
+            avatar_urls=urls, updated_at=timezone.now()
+        )
+    if not updated:
+        # Replaced or deleted meanwhile: these renditions belong to nobody
+        for name in names:
+            storage.delete(name)
+        return False
+    delete_stale_avatars(user_id, keep=names)
+    invalidate_profile(user_id)
+    return True
+
+
+def delete_stale_avatars(user_id, keep=()):
+    storage = User._meta.get_field("image").storage
+    directory = avatar_dir(user_id)
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        name = f"{directory}/{filename}"
+        if name not in keep:
+            storage.delete(name)
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_setting("AVATAR_WORKERS", 2), thread_name_prefix="avatars"
+        )
+    return _executor
+
+
+def _process_in_background(user_id, image_name):
+    try:
+        process_avatar(user_id, image_name)
+    except Exception:
+        # Serializers keep serving the original; `manage.py build_avatars` retries
+        logger.exception("Avatar processing failed for user %s (%s)", user_id, image_name)
+    finally:
+        connections.close_all()
+
+
+def avatar_changed(user):
+    """
+    Call inside the write that changed user.image: drops the old renditions'
+    URLs now and builds the new ones once the write has committed.
+    """
+    User.objects.filter(pk=user.pk).update(avatar_urls={})
+    user.avatar_urls = {}
+    if not user.image:
+        transaction.on_commit(lambda: delete_stale_avatars(user.pk))
+        return
+    image_name = user.image.name
+    if _setting("AVATAR_PROCESS_INLINE", False):
+        transaction.on_commit(lambda: process_avatar(user.pk, image_name))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_process_in_background, user.pk, image_name))
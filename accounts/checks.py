@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.checks import Error, Tags, register
+
+# Backends that lose revocations: per process, or culling/evicting entries
+# before they expire
+_UNSUITABLE_BACKENDS = {
+    LocMemCache: "is per process (lost on restart, invisible to other workers) and culls entries",
+    DummyCache: "stores nothing",
+    FileBasedCache: "culls entries past MAX_ENTRIES",
+    DatabaseCache: "culls entries past MAX_ENTRIES",
+    BaseMemcachedCache: "evicts least recently used entries",
+}
+
+
+@register(Tags.security, Tags.caches)
+def check_token_revocation_cache(app_configs, **kwargs):
+    """
+    Revoked refresh tokens (accounts/tokens.py) must stay revoked in every
+    worker until they expire. TOKEN_REVOCATION_CACHE = None uses the
+    token_blacklist tables instead.
+    """
+    alias = getattr(settings, "TOKEN_REVOCATION_CACHE", None)
+    if alias is None:
+        return []
+    if alias not in settings.CACHES:
+        return [Error(
+            f"TOKEN_REVOCATION_CACHE '{alias}' is not in CACHES.",
+            id="accounts.E001",
+        )]
+    shared = {"default", getattr(settings, "THROTTLE_CACHE", "default")}
+    if alias in shared:
+        return [Error(
+            f"TOKEN_REVOCATION_CACHE '{alias}' is shared with throttle and profile keys, "
+            "which can push revocations out.",
+            hint="Give revocations a cache alias of their own, or set it to None to use the blacklist tables.",
+            id="accounts.E002",
+        )]
+    cache = caches[alias]
+    for backend, reason in _UNSUITABLE_BACKENDS.items():
+        if isinstance(cache, backend):
+            return [Error(
+                f"TOKEN_REVOCATION_CACHE '{alias}' {reason}: a revoked refresh token could become valid again.",
+                hint="Use a shared Redis cache with maxmemory-policy noeviction, "
+                     "or set it to None to use the blacklist tables.",
+                id="accounts.E003",
+            )]
+    return []
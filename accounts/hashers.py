@@ -0,0 +1,73 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+# ------------------------------------------------------------
+# Bounded hashing pool
+# ------------------------------------------------------------
+# Hashing is pure CPU (argon2 and hashlib release the GIL), so a login storm
+# can have every request thread hashing at once and starve the rest of the
+# process of CPU. All hash/verify calls go through this pool, which caps
+# concurrent hashing at PASSWORD_HASHING_WORKERS per process.
+#
+# What it doesn't do is free the caller: it still holds its request thread
+# until the hash is done (run_hashing waits on the result), so logins beyond
+# the cap queue up on threads that are otherwise idle.
+
+_POOL_PREFIX = "password-hash"
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = getattr(settings, "PASSWORD_HASHING_WORKERS", None) or os.cpu_count() or 1
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=_POOL_PREFIX)
+    return _pool
+
+
+def run_hashing(fn, *args):
+    """Run a hashing call on the bounded pool and wait for the result"""
+    if threading.current_thread().name.startswith(_POOL_PREFIX):
+        return fn(*args)
+    return get_hashing_pool().submit(fn, *args).result()
+
+
+class BoundedHashingMixin:
+    """Send encode/verify/harden_runtime through the bounded pool"""
+
+    def encode(self, password, salt, *args, **kwargs):
+        return run_hashing(lambda: super(BoundedHashingMixin, self).encode(password, salt, *args, **kwargs))
+
+    def verify(self, password, encoded):
+        return run_hashing(lambda: super(BoundedHashingMixin, self).verify(password, encoded))
+
+    def harden_runtime(self, password, encoded):
+        return run_hashing(lambda: super(BoundedHashingMixin, self).harden_runtime(password, encoded))
+
+
+# ------------------------------------------------------------
+# Hashers
+# ------------------------------------------------------------
+class BoundedArgon2PasswordHasher(BoundedHashingMixin, Argon2PasswordHasher):
+    """
+    Argon2id with parameters from settings (defaults follow the OWASP
+    19 MiB / t=2 / p=1 profile instead of Django's 100 MiB / p=8).
+
+    Keeps the 'argon2' algorithm name, so Django's must_update() rehashes
+    existing argon2 hashes on login whenever these parameters change.
+    """
+    time_cost = getattr(settings, "PASSWORD_ARGON2_TIME_COST", 2)
+    memory_cost = getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 19456)
+    parallelism = getattr(settings, "PASSWORD_ARGON2_PARALLELISM", 1)
+
+
+class BoundedPBKDF2PasswordHasher(BoundedHashingMixin, PBKDF2PasswordHasher):
+    """Django's PBKDF2-SHA256 hasher, run on the bounded pool"""
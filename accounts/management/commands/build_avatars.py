@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import process_avatar
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Build missing avatar renditions (existing uploads, or ones whose background processing failed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="rebuild users that already have renditions too")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            users = users.filter(avatar_urls={})
+        start = time.perf_counter()
+        built = failed = 0
+        for user_id, image_name in users.values_list("pk", "image").iterator():
+            try:
+                built += process_avatar(user_id, image_name)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"User {user_id} ({image_name}): {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Built avatars for {built} users ({failed} failed) in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import import_blacklist, purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy unexpired token_blacklist revocations into the revocation cache (if any) and delete "
+        "expired blacklisted/outstanding token rows (run periodically)"
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        imported = import_blacklist()
+        blacklisted, outstanding = purge_expired_tokens()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} revocations, purged {blacklisted} blacklisted and "
+            f"{outstanding} outstanding tokens in {time.perf_counter() - start:.2f}s"
+        ))
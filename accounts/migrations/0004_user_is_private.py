@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_private',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_is_private'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_urls',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.core.validators import EmailValidator
 
 
@@ -18,10 +20,20 @@ class User(AbstractUser):
     )
     bio = models.TextField(max_length=150, blank=True, null=True)
     image = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # Square renditions of `image`, {"<size>": url}, built by accounts/avatars.py
+    avatar_urls = models.JSONField(default=dict, blank=True, editable=False)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True, null=True)
     is_verified = models.BooleanField(default=False)
+    # Private accounts only show posts to accepted followers
+    is_private = models.BooleanField(default=False)
+    # Maintained incrementally on post/follow changes, never counted on read
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the account is deleted; the row is reaped by `manage.py reap_deleted`
+    deleted_at = models.DateTimeField(blank=True, null=True, db_index=True)
 
     # Email not required for registration
     REQUIRED_FIELDS = []
@@ -38,3 +50,18 @@ class User(AbstractUser):
         if self.image:
             return self.image.url
         return None
+
+    def avatar_url(self, size=None):
+        """Smallest avatar rendition of at least `size` px (the original until renditions exist)"""
+        if not self.avatar_urls:
+            return self.get_profile_image_url()
+        size = size or getattr(settings, "AVATAR_DEFAULT_SIZE", 96)
+        sizes = sorted(int(s) for s in self.avatar_urls)
+        fitting = next((s for s in sizes if s >= size), sizes[-1])
+        return self.avatar_urls[str(fitting)]
+
+    def soft_delete(self):
+        """Deactivate the account: tokens stop working and its posts/comments are hidden at once"""
+        self.is_active = False
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['is_active', 'deleted_at', 'updated_at'])
@@ -0,0 +1,33 @@
+import gzip
+
+from django.contrib.auth.password_validation import CommonPasswordValidator
+
+
+# path -> frozenset of lowercased passwords, shared by every validator instance
+_password_sets = {}
+
+
+def load_password_set(path):
+    """Read (and gunzip) a password list once per process"""
+    key = str(path)
+    if key not in _password_sets:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                _password_sets[key] = frozenset(x.strip() for x in f)
+        except OSError:
+            with open(path) as f:
+                _password_sets[key] = frozenset(x.strip() for x in f)
+    return _password_sets[key]
+
+
+class CachedCommonPasswordValidator(CommonPasswordValidator):
+    """
+    CommonPasswordValidator that keeps the decompressed list in one
+    process-wide frozenset instead of re-reading it per instance.
+    Loaded at startup by AccountsConfig.ready().
+    """
+
+    def __init__(self, password_list_path=CommonPasswordValidator.DEFAULT_PASSWORD_LIST_PATH):
+        if password_list_path is CommonPasswordValidator.DEFAULT_PASSWORD_LIST_PATH:
+            password_list_path = self.DEFAULT_PASSWORD_LIST_PATH
+        self.passwords = load_password_set(password_list_path)
@@ -1,9 +1,12 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from django.contrib.auth.password_validation import validate_password
-from django.core.mail import send_mail
-from django.conf import settings
+from project.serializers import DynamicFieldsMixin
 from .models import User
+from .usernames import username_index
+from . import services
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -13,26 +16,32 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'password', 'confirm_password']
+        # Uniqueness is enforced by the insert itself (see create), not a pre-check query
+        extra_kwargs = {'username': {'validators': [UnicodeUsernameValidator()]}}
 
     def validate(self, attrs):
         if attrs['password'] != attrs['confirm_password']:
             raise serializers.ValidationError("Passwords don't match.")
         return attrs
 
-    def validate_username(self, value):
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-        return value
-
     def create(self, validated_data):
         validated_data.pop('confirm_password')
         temp_email = f"{validated_data['username']}@placeholder.local"
 
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=temp_email,
-            password=validated_data['password']
-        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=validated_data['username'],
+                    email=temp_email,
+                    password=validated_data['password']
+                )
+        except IntegrityError:
+            # Only the username's unique constraint means "taken"; anything else is a real error
+            if not User.objects.filter(username=validated_data['username']).exists():
+                raise
+            raise serializers.ValidationError({'username': ["A user with this username already exists."]})
+
+        username_index.add(user.username)
         return user
 
 
@@ -56,13 +65,13 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Must include username and password.')
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     profile_image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'bio', 'image', 'profile_image_url', 'gender', 'is_verified', 'created_at']
-        read_only_fields = ['id', 'username', 'is_verified', 'created_at', 'profile_image_url']
+        fields = ['id', 'username', 'email', 'bio', 'image', 'profile_image_url', 'avatar_urls', 'gender', 'is_verified', 'is_private', 'created_at']
+        read_only_fields = ['id', 'username', 'is_verified', 'created_at', 'profile_image_url', 'avatar_urls']
 
     def get_profile_image_url(self, obj):
         return obj.get_profile_image_url()
@@ -78,43 +87,16 @@ class EmailVerificationSerializer(serializers.Serializer):
         return value
 
     def save(self):
-        email = self.validated_data['email']
-        user = User.objects.get(id=self.context['user_id'])
-        
-        # Update user email
-        user.email = email
-        user.is_verified = True  # Mark as verified when email is added
-        user.save()
-        
-        # Send verification email
-        self.send_verification_email(user)
-        return user
-
-    def send_verification_email(self, user):
-        subject = 'Account Verification - Instagram Clone'
-        message = f'''
-        Hello {user.username},
-
-        Your account has been successfully verified!
-
-        Your email {user.email} has been added to your Instagram Clone account.
-
-        Thank you for using our platform!
-
-        Best regards,
-        Instagram Clone Team
-        '''
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@instagram-clone.com',
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+        # Unique email is still enforced by the column if two requests race past validate_email
+        try:
+            return services.verify_email(self.context['user_id'], self.validated_data['email'])
+        except IntegrityError:
+            if not User.objects.filter(email=self.validated_data['email']).exclude(id=self.context['user_id']).exists():
+                raise
+            raise serializers.ValidationError({'email': ["This email is already used by another account."]})
 
 
-class UserBasicSerializer(serializers.ModelSerializer):
+class UserBasicSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Basic user info for responses"""
     profile_image_url = serializers.SerializerMethodField()
 
@@ -123,4 +105,4 @@ class UserBasicSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'profile_image_url', 'is_verified']
 
     def get_profile_image_url(self, obj):
-        return obj.get_profile_image_url()
\ No newline at end of file
+        return obj.avatar_url()
\ No newline at end of file
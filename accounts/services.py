@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+
+from social.profile import invalidate_profile
+from sync.changes import record_author_removed
+from .models import User
+
+
+# ------------------------------------------------------------
+# Transactional write services
+# ------------------------------------------------------------
+def verify_email(user_id, email):
+    """
+    Store the email and mark the account verified in one transaction; the
+    notification email and cache invalidation only run once it has committed.
+    """
+    with transaction.atomic():
+        user = User.objects.select_for_update().get(id=user_id)
+        user.email = email
+        user.is_verified = True  # Mark as verified when email is added
+        user.save(update_fields=['email', 'is_verified', 'updated_at'])
+        transaction.on_commit(lambda: invalidate_profile(user.pk))
+        # robust: an SMTP failure is logged by Django instead of failing a committed request
+        transaction.on_commit(lambda: send_verification_email(user), robust=True)
+    return user
+
+
+def delete_account(user):
+    """Deactivate now (reaped later by `manage.py reap_deleted`); sync clients drop the content"""
+    with transaction.atomic():
+        user.soft_delete()
+        record_author_removed(user.pk)
+        transaction.on_commit(lambda: invalidate_profile(user.pk))
+
+
+def send_verification_email(user):
+    subject = 'Account Verification - Instagram Clone'
+    message = f'''
+    Hello {user.username},
+
+    Your account has been successfully verified!
+
+    Your email {user.email} has been added to your Instagram Clone account.
+
+    Thank you for using our platform!
+
+    Best regards,
+    Instagram Clone Team
+    '''
+
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@instagram-clone.com'),
+        recipient_list=[user.email],
+        fail_silently=False,
+    )
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache, caches
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .avatars import avatar_dir, process_avatar, render_avatars
+from .checks import check_token_revocation_cache
+from .hashers import BoundedPBKDF2PasswordHasher, get_hashing_pool, run_hashing
+from .models import User
+from .serializers import UserRegistrationSerializer
+from .usernames import UsernameIndex
+
+PASSWORD = "pw12345!xZ"
+
+REVOCATION_CACHES = {
+    "default": {"BACKEND": "project.cache.LocMemCache"},
+    "tokens": {"BACKEND": "project.cache.LocMemCache", "METRICS_NAME": "tokens"},
+}
+
+
+# ------------------------------------------------------------
+# Refresh-token revocation (accounts/tokens.py)
+# ------------------------------------------------------------
+class TokenRevocationTests(TestCase):
+    """Runs against the token_blacklist tables (TOKEN_REVOCATION_CACHE = None)"""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="alice", password=PASSWORD, email="alice@example.com")
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post("/api/accounts/login/", {"username": "alice", "password": PASSWORD}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["tokens"]
+
+    def refresh(self, token):
+        return self.client.post("/api/accounts/token/refresh/", {"refresh": token}, format="json")
+
+    def test_rotated_token_cannot_be_reused(self):
+        old = self.login()["refresh"]
+        response = self.refresh(old)
+        self.assertEqual(response.status_code, 200)
+        new = response.json()["refresh"]
+
+        self.assertEqual(self.refresh(old).status_code, 401)
+        self.assertEqual(self.refresh(new).status_code, 200)
+
+    def test_logout_revokes_the_refresh_token(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        response = self.client.post("/api/accounts/logout/", {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(tokens["refresh"]).status_code, 401)
+
+    def test_deactivated_account_cannot_refresh(self):
+        refresh = self.login()["refresh"]
+        User.objects.filter(username="alice").update(is_active=False)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+
+@override_settings(CACHES=REVOCATION_CACHES, TOKEN_REVOCATION_CACHE="tokens")
+class CachedTokenRevocationTests(TokenRevocationTests):
+    """Same behaviour with revocations in a cache of their own; nothing lands in the tables"""
+
+    def setUp(self):
+        super().setUp()
+        caches["tokens"].clear()
+
+    def tearDown(self):
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class TokenRevocationCheckTests(TestCase):
+    def check_ids(self):
+        return [error.id for error in check_token_revocation_cache(None)]
+
+    def test_blacklist_tables_need_no_cache(self):
+        with self.settings(TOKEN_REVOCATION_CACHE=None):
+            self.assertEqual(self.check_ids(), [])
+
+    def test_revocation_cache_must_be_dedicated_and_shared(self):
+        with self.settings(CACHES=REVOCATION_CACHES, TOKEN_REVOCATION_CACHE="missing"):
+            self.assertEqual(self.check_ids(), ["accounts.E001"])
+        with self.settings(CACHES=REVOCATION_CACHES, TOKEN_REVOCATION_CACHE="default"):
+            self.assertEqual(self.check_ids(), ["accounts.E002"])
+        with self.settings(CACHES=REVOCATION_CACHES, TOKEN_REVOCATION_CACHE="tokens"):
+            self.assertEqual(self.check_ids(), ["accounts.E003"])
+
+
+# ------------------------------------------------------------
+# Bounded hashing pool (accounts/hashers.py)
+# ------------------------------------------------------------
+class HashingPoolTests(TestCase):
+    def test_hashes_round_trip_on_the_pool(self):
+        hasher = BoundedPBKDF2PasswordHasher()
+        encoded = make_password("s3cret!", hasher="pbkdf2_sha256")
+        self.assertTrue(hasher.verify("s3cret!", encoded))
+        self.assertFalse(check_password("wrong", encoded))
+        self.assertTrue(run_hashing(lambda: threading.current_thread().name).startswith("password-hash"))
+
+    def test_concurrent_hashing_is_capped_at_the_pool_size(self):
+        workers = get_hashing_pool()._max_workers
+        lock, running, peak = threading.Lock(), [0], [0]
+
+        def hash_once():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            # Nested calls from a pool thread run inline instead of deadlocking
+            return run_hashing(lambda: 1)
+
+        with ThreadPoolExecutor(max_workers=workers + 4) as callers:
+            results = list(callers.map(lambda _: run_hashing(hash_once), range(3 * (workers + 4))))
+        self.assertEqual(sum(results), 3 * (workers + 4))
+        self.assertLessEqual(peak[0], workers)
+
+
+# ------------------------------------------------------------
+# Username availability (accounts/usernames.py)
+# ------------------------------------------------------------
+class UsernameIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="taken", password=PASSWORD)
+        self.index = UsernameIndex()
+
+    def test_checks_go_to_the_db_until_the_first_build(self):
+        with mock.patch("accounts.usernames._get_executor") as executor:
+            with self.assertNumQueries(1):
+                self.assertFalse(self.index.is_available("taken"))
+            self.assertTrue(self.index.is_available("free"))
+        # One background rebuild, not one per request and never on the request thread
+        executor.return_value.submit.assert_called_once_with(self.index._refresh_in_background)
+
+    def test_built_filter_answers_misses_without_a_query(self):
+        self.index.refresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.index.is_available("free"))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.index.is_available("taken"))
+
+    def test_registrations_are_added_incrementally(self):
+        self.index.refresh()
+        build = self.index._build
+
+        def racing_build():
+            bloom = build()
+            self.index.add("racer")  # registered while the scan was running
+            return bloom
+
+        with mock.patch.object(self.index, "_build", racing_build):
+            self.index.refresh()
+        self.index.add("newbie")
+        self.assertIn("racer", self.index._filter)
+        self.assertIn("newbie", self.index._filter)
+
+
+class RegistrationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="taken", password=PASSWORD)
+
+    def register(self, username):
+        data = {"username": username, "password": PASSWORD, "confirm_password": PASSWORD}
+        return APIClient().post("/api/accounts/register/", data, format="json")
+
+    def test_taken_username_is_a_validation_error(self):
+        response = self.register("taken")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.json())
+        self.assertEqual(self.register("fresh").status_code, 201)
+
+    def test_other_integrity_errors_are_not_reported_as_taken(self):
+        # The placeholder email of the new account collides, not the username
+        User.objects.create_user(username="someone", password=PASSWORD, email="newbie@placeholder.local")
+        serializer = UserRegistrationSerializer(
+            data={"username": "newbie", "password": PASSWORD, "confirm_password": PASSWORD}
+        )
+        self.assertTrue(serializer.is_valid())
+        with self.assertRaises(IntegrityError):
+            serializer.save()
+
+
+# ------------------------------------------------------------
+# Avatar renditions (accounts/avatars.py)
+# ------------------------------------------------------------
+def image_bytes(size, color, mode="RGB", format="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format)
+    return buffer.getvalue()
+
+
+class AvatarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root, AVATAR_PROCESS_INLINE=True)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user(username="pictured", password=PASSWORD)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.storage = User._meta.get_field("image").storage
+
+    def upload(self, name, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                "/api/accounts/profile/", {"image": SimpleUploadedFile(name, data)}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 200)
+        return User.objects.get(pk=self.user.pk)
+
+    def renditions(self):
+        return sorted(self.storage.listdir(avatar_dir(self.user.pk))[1])
+
+    def test_renditions_are_square_and_never_upscaled(self):
+        renditions = render_avatars(io.BytesIO(image_bytes((400, 200), (0, 0, 0, 0), mode="RGBA")), (48, 96, 320))
+        self.assertEqual(list(renditions), [320, 96, 48])
+        sizes = {size: Image.open(io.BytesIO(data)).size for size, data in renditions.items()}
+        self.assertEqual(sizes, {320: (200, 200), 96: (96, 96), 48: (48, 48)})
+        with Image.open(io.BytesIO(renditions[48])) as image:
+            self.assertEqual(image.format, "JPEG")
+            # Transparency is flattened onto white
+            self.assertGreater(min(image.getpixel((24, 24))), 245)
+
+    def test_upload_publishes_rendition_urls_and_replaces_old_ones(self):
+        user = self.upload("first.png", image_bytes((500, 500), "red"))
+        self.assertEqual(sorted(user.avatar_urls, key=int), ["48", "96", "320"])
+        self.assertEqual(user.avatar_url(60), user.avatar_urls["96"])
+        self.assertEqual(user.avatar_url(1000), user.avatar_urls["320"])
+        first = self.renditions()
+        self.assertEqual(len(first), 3)
+
+        user = self.upload("second.png", image_bytes((500, 500), "blue"))
+        second = self.renditions()
+        self.assertEqual(len(second), 3)
+        self.assertFalse(set(first) & set(second))
+
+        self.client.patch("/api/accounts/profile/", {"image": ""}, format="multipart")
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.avatar_urls, {})
+        self.assertIsNone(user.avatar_url())
+
+    def test_renditions_of_a_replaced_image_are_discarded(self):
+        user = self.upload("first.png", image_bytes((100, 100), "red"))
+        stale = self.storage.save("profile_pics/stale.png", SimpleUploadedFile("stale.png", image_bytes((80, 80), "blue")))
+        self.assertFalse(process_avatar(user.pk, stale))
+        self.assertEqual(User.objects.get(pk=user.pk).avatar_urls, user.avatar_urls)
+        self.assertEqual(len(self.renditions()), 3)
@@ -0,0 +1,146 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from posts.reaper import delete_in_chunks, keyset_chunks
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Refresh-token revocation
+# ------------------------------------------------------------
+# With TOKEN_REVOCATION_CACHE set, a revoked refresh token is one cache
+# entry, "revoked:<jti>", that expires with the token itself: nothing is
+# written when a token is issued, and logout, rotation and the check on
+# refresh are one cache call each. `manage.py purge_token_blacklist` carries
+# unexpired revocations from simplejwt's token_blacklist tables over and
+# deletes the rest.
+#
+# That cache must be a dedicated alias, shared by all workers and never
+# evicting a key before it expires (e.g. Redis with maxmemory-policy
+# noeviction); accounts/checks.py rejects anything else. Without it
+# (TOKEN_REVOCATION_CACHE = None), revocations are rows in the token_blacklist
+# tables, as with simplejwt's own blacklist.
+
+def _cache():
+    alias = _setting("TOKEN_REVOCATION_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def revocation_key(jti):
+    return f"revoked:{jti}"
+
+
+def revoke(jti, exp):
+    """Revoke `jti` until `exp` (epoch seconds) in the cache; False if it already was revoked"""
+    ttl = int(exp - time.time()) + 1
+    if ttl <= 0:
+        return True  # expired anyway
+    return _cache().add(revocation_key(jti), 1, ttl)
+
+
+def is_revoked(jti):
+    return _cache().get(revocation_key(jti)) is not None
+
+
+class RefreshToken(jwt_tokens.Token):
+    """
+    simplejwt's RefreshToken, revoked through the revocation cache, or through
+    the blacklist tables when there is none. Issuing a token writes nothing.
+    """
+    token_type = "refresh"
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME
+    no_copy_claims = jwt_tokens.RefreshToken.no_copy_claims
+    access_token_class = jwt_tokens.AccessToken
+    access_token = jwt_tokens.RefreshToken.access_token
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if _cache() is None:
+            revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        else:
+            revoked = is_revoked(jti)
+        if revoked:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """Revoke this token; False if it already was revoked"""
+        if _cache() is None:
+            _, created = jwt_tokens.BlacklistMixin.blacklist(self)
+            return created
+        return revoke(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+
+    def outstand(self):
+        """Issued tokens aren't recorded"""
+        return None
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh (and rotate) with RefreshToken above: one cache read, one user
+    lookup and, when rotating, one cache add. A token can only be rotated
+    once, even by concurrent requests.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.blacklist():
+                # Another request rotated this token first
+                raise InvalidToken(_("Token is blacklisted"))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+# ------------------------------------------------------------
+# Legacy token_blacklist tables
+# ------------------------------------------------------------
+
+def import_blacklist():
+    """Revoke every unexpired token in BlacklistedToken in the cache; returns how many"""
+    if _cache() is None:
+        return 0  # the tables are the revocation list
+    imported = 0
+    queryset = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+    for rows in keyset_chunks(queryset, "token__jti", "token__expires_at"):
+        for pk, jti, expires_at in rows:
+            revoke(jti, expires_at.timestamp())
+        imported += len(rows)
+    return imported
+
+
+def purge_expired_tokens():
+    """Delete expired blacklisted and outstanding token rows; returns (blacklisted, outstanding)"""
+    now = timezone.now()
+    blacklisted = delete_in_chunks(BlacklistedToken.objects.filter(token__expires_at__lte=now))
+    outstanding = delete_in_chunks(OutstandingToken.objects.filter(expires_at__lte=now))
+    return blacklisted, outstanding
@@ -7,6 +7,7 @@ app_name = 'accounts'
 urlpatterns = [
     # Authentication
     path('register/', views.register_view, name='register'),
+    path('username-available/', views.username_available_view, name='username_available'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -0,0 +1,127 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (bytearray bits, double hashing)"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="username-index")
+    return _executor
+
+
+class UsernameIndex:
+    """
+    In-memory Bloom filter of taken usernames.
+
+    A miss means the username is definitely free in this process's view, so
+    no query is needed; a hit is confirmed against the DB. Usernames
+    registered through this process are added as they are created, and the
+    filter is rebuilt in the background every USERNAME_INDEX_TTL seconds to
+    pick up users registered through other workers. Until the first build
+    finishes, every check goes to the DB. Registration itself still relies
+    on the unique constraint, so a stale answer can never create a duplicate.
+    """
+
+    def __init__(self):
+        self._filter = None
+        self._built_at = 0
+        self._refreshing = False
+        # Usernames registered while a rebuild is scanning the table
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        count = User.objects.count()
+        bloom = BloomFilter(capacity=max(count * 2, 100_000))
+        for username in User.objects.values_list("username", flat=True).iterator(chunk_size=10_000):
+            bloom.add(username)
+        return bloom
+
+    def refresh(self):
+        """Rebuild the filter from a full username scan (in the caller's thread)"""
+        with self._lock:
+            self._pending = set()
+        try:
+            bloom = self._build()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            # The scan may have passed these rows before they were inserted
+            for username in self._pending:
+                bloom.add(username)
+            self._filter, self._built_at, self._pending = bloom, time.monotonic(), None
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Rebuilding the username index failed")
+        finally:
+            connection.close()
+            self._refreshing = False
+
+    def _schedule_refresh(self):
+        ttl = getattr(settings, "USERNAME_INDEX_TTL", 600)
+        if self._filter is not None and time.monotonic() - self._built_at <= ttl:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        _get_executor().submit(self._refresh_in_background)
+
+    def add(self, username):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(username)
+            if self._pending is not None:
+                self._pending.add(username)
+
+    def is_available(self, username):
+        self._schedule_refresh()
+        bloom = self._filter
+        if bloom is not None and username not in bloom:
+            return True
+        return not User.objects.filter(username=username).exists()
+
+
+username_index = UsernameIndex()
@@ -1,10 +1,22 @@
 from rest_framework import status, generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.views.decorators.http import condition
+from posts.conditional import query_suffix
+from project.serializers import SparseFieldsMixin, parse_field_params
+from project.throttling import LoginRateThrottle, RegisterRateThrottle, UsernameCheckRateThrottle
 from .models import User
+from .avatars import avatar_changed
+from .tokens import RefreshToken
+from .usernames import username_index
+from . import services
+from social.profile import invalidate_profile
+from social.visibility import privacy_changed
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
@@ -16,6 +28,7 @@ from .serializers import (
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterRateThrottle])
 def register_view(request):
     """User registration with username and password only"""
     serializer = UserRegistrationSerializer(data=request.data)
@@ -37,8 +50,28 @@ def register_view(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([UsernameCheckRateThrottle])
+def username_available_view(request):
+    """Check if a username is free (served from the in-memory username index)"""
+    username = request.query_params.get('username', '')
+    if not username or len(username) > 150:
+        return Response({'username': ['Enter a username of 1-150 characters.']}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        UnicodeUsernameValidator()(username)
+    except ValidationError as e:
+        return Response({'username': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'username': username,
+        'available': username_index.is_available(username)
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login_view(request):
     """User login with username and password"""
     serializer = UserLoginSerializer(data=request.data)
@@ -63,7 +96,7 @@ def login_view(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
-    """User logout - blacklist refresh token"""
+    """User logout - revoke the refresh token (accounts/tokens.py)"""
     try:
         refresh_token = request.data.get("refresh")
         token = RefreshToken(refresh_token)
@@ -77,14 +110,29 @@ def logout_view(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
-    """Get and update user profile"""
+class UserProfileView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Get, update and delete user profile"""
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
         return self.request.user
 
+    def perform_update(self, serializer):
+        was_private = serializer.instance.is_private
+        old_image = serializer.instance.image.name or ''
+        with transaction.atomic():
+            user = serializer.save()
+            if (user.image.name or '') != old_image:
+                # Renditions are built in the background once this commits
+                avatar_changed(user)
+        if user.is_private != was_private:
+            privacy_changed(user)
+        invalidate_profile(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        services.delete_account(instance)
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -105,11 +153,26 @@ def email_verification_view(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def profile_etag(request):
+    """The authenticated user is already loaded, so this costs no query"""
+    if not request.user.is_authenticated:
+        return None
+    return f'"profile-{request.user.pk}-{request.user.updated_at.timestamp()}{query_suffix(request)}"'
+
+
+def profile_last_modified(request):
+    if not request.user.is_authenticated:
+        return None
+    return request.user.updated_at
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=profile_etag, last_modified_func=profile_last_modified)
 def user_profile_view(request):
     """Get current user profile"""
-    serializer = UserProfileSerializer(request.user)
+    fields, expand = parse_field_params(request)
+    serializer = UserProfileSerializer(request.user, context={'fields': fields, 'expand': expand})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,10 @@
+from .models import EngagementEvent
+
+
+def record_event(kind, post_id, author_id, actor_id=None):
+    """
+    Append one engagement event as part of the surrounding write.
+    Inside a write service's transaction it commits (or rolls back) with it,
+    so it costs a single INSERT and no extra commit; aggregation happens in compaction.
+    """
+    EngagementEvent.objects.create(kind=kind, post_id=post_id, author_id=author_id, actor_id=actor_id)
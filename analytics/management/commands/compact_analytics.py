@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import compact_events
+
+
+class Command(BaseCommand):
+    help = "Compact engagement events into hourly/daily rollups (run periodically, e.g. every minute)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = compact_events(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted {count} events in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils import timezone
+
+
+class EngagementEvent(models.Model):
+    """
+    Append-only log of write events, compacted into rollups by
+    `manage.py compact_analytics`. Plain ids instead of foreign keys so the
+    log never joins, cascades or locks against the OLTP tables.
+    """
+    POST = "post"
+    LIKE = "like"
+    UNLIKE = "unlike"
+    COMMENT = "comment"
+    KIND_CHOICES = [
+        (POST, "Post"),
+        (LIKE, "Like"),
+        (UNLIKE, "Unlike"),
+        (COMMENT, "Comment"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    post_id = models.BigIntegerField()
+    author_id = models.BigIntegerField()
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.kind} on Post {self.post_id} at {self.created_at}"
+
+
+class Granularity(models.TextChoices):
+    HOUR = "hour", "Hour"
+    DAY = "day", "Day"
+
+
+class PostRollup(models.Model):
+    post_id = models.BigIntegerField()
+    author_id = models.BigIntegerField()
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    bucket = models.DateTimeField()
+    likes = models.PositiveIntegerField(default=0)
+    unlikes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("post_id", "granularity", "bucket")
+        indexes = [models.Index(fields=["author_id", "granularity", "bucket"])]
+
+    def __str__(self):
+        return f"Post {self.post_id} {self.granularity} {self.bucket}"
+
+
+class AuthorRollup(models.Model):
+    author_id = models.BigIntegerField()
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    bucket = models.DateTimeField()
+    posts = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    unlikes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("author_id", "granularity", "bucket")
+
+    def __str__(self):
+        return f"Author {self.author_id} {self.granularity} {self.bucket}"
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import EngagementEvent, Granularity, PostRollup, AuthorRollup
+
+COUNTERS = {
+    "posts": Count("id", filter=Q(kind=EngagementEvent.POST)),
+    "likes": Count("id", filter=Q(kind=EngagementEvent.LIKE)),
+    "unlikes": Count("id", filter=Q(kind=EngagementEvent.UNLIKE)),
+    "comments": Count("id", filter=Q(kind=EngagementEvent.COMMENT)),
+}
+
+
+def _merge(model, key_fields, rows, counter_fields):
+    """Add aggregated rows onto existing rollups (bulk update + bulk create)"""
+    if not rows:
+        return
+    buckets = {r["bucket"] for r in rows}
+    existing = {
+        tuple(getattr(obj, f) for f in key_fields): obj
+        for obj in model.objects.filter(
+            bucket__in=buckets,
+            granularity=rows[0]["granularity"],
+            **{f"{key_fields[0]}__in": {r[key_fields[0]] for r in rows}},
+        )
+    }
+    to_create, to_update = [], []
+    for row in rows:
+        key = tuple(row[f] for f in key_fields)
+        obj = existing.get(key)
+        if obj is None:
+            to_create.append(model(**row))
+            continue
+        for f in counter_fields:
+            setattr(obj, f, getattr(obj, f) + row[f])
+        to_update.append(obj)
+
+    model.objects.bulk_create(to_create, batch_size=1000)
+    model.objects.bulk_update(to_update, counter_fields, batch_size=1000)
+
+
+def compact_events(batch_size=10_000):
+    """
+    Fold logged events into hourly and daily rollups and delete them.
+    Works in id-ordered batches, each in its own transaction. A batch is the
+    list of ids read at its start: it is aggregated and deleted by those ids,
+    so an event that commits mid-batch (with a lower id than ones already
+    seen) is left for the next batch rather than deleted uncounted.
+    Returns the number of events compacted.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(EngagementEvent.objects.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+
+            events = EngagementEvent.objects.filter(id__in=ids)
+            for granularity in Granularity.values:
+                bucketed = events.annotate(bucket=Trunc("created_at", granularity))
+
+                post_rows = list(
+                    bucketed.exclude(kind=EngagementEvent.POST)
+                    .values("post_id", "author_id", "bucket")
+                    .annotate(**{k: v for k, v in COUNTERS.items() if k != "posts"})
+                    .order_by()
+                )
+                for row in post_rows:
+                    row["granularity"] = granularity
+                _merge(PostRollup, ("post_id", "bucket"), post_rows, ["likes", "unlikes", "comments"])
+
+                author_rows = list(bucketed.values("author_id", "bucket").annotate(**COUNTERS).order_by())
+                for row in author_rows:
+                    row["granularity"] = granularity
+                _merge(AuthorRollup, ("author_id", "bucket"), author_rows, ["posts", "likes", "unlikes", "comments"])
+
+            count, _ = events.delete()
+        total += count
+
+    prune_hourly_rollups()
+    return total
+
+
+def prune_hourly_rollups():
+    """Hourly rollups are only kept for ANALYTICS_HOURLY_RETENTION_DAYS"""
+    days = getattr(settings, "ANALYTICS_HOURLY_RETENTION_DAYS", 14)
+    cutoff = timezone.now() - timedelta(days=days)
+    PostRollup.objects.filter(granularity=Granularity.HOUR, bucket__lt=cutoff).delete()
+    AuthorRollup.objects.filter(granularity=Granularity.HOUR, bucket__lt=cutoff).delete()
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .events import record_event
+from .models import AuthorRollup, EngagementEvent, Granularity, PostRollup
+from .rollups import compact_events
+
+# Inside the hourly retention window, with room for +2h in the same (UTC) day
+HOUR = (timezone.now() - timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+def log(kind, post_id, author_id, at):
+    EngagementEvent.objects.create(kind=kind, post_id=post_id, author_id=author_id, created_at=at)
+
+
+# ------------------------------------------------------------
+# Event log compaction (analytics/rollups.py)
+# ------------------------------------------------------------
+class CompactionTests(TestCase):
+    def rollup(self, model, granularity, **key):
+        return model.objects.filter(granularity=granularity, **key).values(
+            "bucket", *[f for f in ("posts", "likes", "unlikes", "comments") if hasattr(model, f)]
+        ).order_by("bucket")
+
+    def test_events_fold_into_hourly_and_daily_rollups(self):
+        log(EngagementEvent.POST, 1, 7, HOUR)
+        log(EngagementEvent.LIKE, 1, 7, HOUR + timedelta(minutes=5))
+        log(EngagementEvent.LIKE, 1, 7, HOUR + timedelta(minutes=50))
+        log(EngagementEvent.UNLIKE, 1, 7, HOUR + timedelta(minutes=55))
+        log(EngagementEvent.COMMENT, 1, 7, HOUR + timedelta(hours=2))
+
+        self.assertEqual(compact_events(), 5)
+        self.assertFalse(EngagementEvent.objects.exists())
+
+        self.assertEqual(list(self.rollup(PostRollup, Granularity.HOUR, post_id=1)), [
+            {"bucket": HOUR, "likes": 2, "unlikes": 1, "comments": 0},
+            {"bucket": HOUR + timedelta(hours=2), "likes": 0, "unlikes": 0, "comments": 1},
+        ])
+        self.assertEqual(list(self.rollup(AuthorRollup, Granularity.DAY, author_id=7)), [
+            {"bucket": HOUR.replace(hour=0), "posts": 1, "likes": 2, "unlikes": 1, "comments": 1},
+        ])
+
+    def test_batches_and_later_runs_add_onto_existing_rollups(self):
+        for minute in range(7):
+            log(EngagementEvent.LIKE, 1, 7, HOUR + timedelta(minutes=minute))
+        self.assertEqual(compact_events(batch_size=3), 7)
+
+        log(EngagementEvent.LIKE, 1, 7, HOUR + timedelta(minutes=30))
+        log(EngagementEvent.LIKE, 2, 7, HOUR)
+        self.assertEqual(compact_events(), 2)
+
+        self.assertEqual(PostRollup.objects.get(post_id=1, granularity=Granularity.HOUR).likes, 8)
+        self.assertEqual(PostRollup.objects.get(post_id=2, granularity=Granularity.DAY).likes, 1)
+        self.assertEqual(AuthorRollup.objects.get(author_id=7, granularity=Granularity.DAY).likes, 9)
+
+    def test_old_hourly_rollups_are_pruned(self):
+        old = timezone.now() - timedelta(days=30)
+        log(EngagementEvent.LIKE, 1, 7, old)
+        compact_events()
+        self.assertFalse(PostRollup.objects.filter(granularity=Granularity.HOUR).exists())
+        self.assertTrue(PostRollup.objects.filter(granularity=Granularity.DAY).exists())
+
+
+class CreatorInsightsTests(TestCase):
+    def test_insights_read_the_compacted_rollups(self):
+        cache.clear()
+        author = User.objects.create_user(username="creator", password="pw12345!xZ", email="c@example.com")
+        record_event(EngagementEvent.POST, 1, author.pk)
+        record_event(EngagementEvent.LIKE, 1, author.pk)
+        record_event(EngagementEvent.COMMENT, 1, author.pk)
+        compact_events()
+
+        client = APIClient()
+        client.force_authenticate(author)
+        response = client.get("/api/analytics/insights/?days=1")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["totals"], {"posts": 1, "likes": 1, "unlikes": 0, "comments": 1})
+        self.assertEqual(body["top_posts"][0]["post_id"], 1)
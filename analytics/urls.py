@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("insights/", views.CreatorInsightsView.as_view(), name="creator-insights"),
+]
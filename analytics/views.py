@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import AuthorRollup, Granularity, PostRollup
+
+
+# ------------------------------------------------------------
+# Creator Insights (reads rollup tables only)
+# ------------------------------------------------------------
+class CreatorInsightsView(APIView):
+    """
+    GET -> engagement series and top posts for the current user
+           ?granularity=day|hour  &days=<1-90>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        granularity = request.query_params.get("granularity", Granularity.DAY)
+        if granularity not in Granularity.values:
+            return Response({"granularity": ["Must be 'day' or 'hour'."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = max(1, min(int(request.query_params.get("days", 30)), 90))
+        except ValueError:
+            return Response({"days": ["Must be an integer."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        since = timezone.now() - timedelta(days=days)
+        author_rollups = AuthorRollup.objects.filter(
+            author_id=request.user.pk, granularity=granularity, bucket__gte=since
+        ).order_by("bucket")
+        series = list(author_rollups.values("bucket", "posts", "likes", "unlikes", "comments"))
+
+        totals = author_rollups.aggregate(
+            posts=Sum("posts"), likes=Sum("likes"), unlikes=Sum("unlikes"), comments=Sum("comments")
+        )
+        top_posts = list(
+            PostRollup.objects.filter(author_id=request.user.pk, granularity=granularity, bucket__gte=since)
+            .values("post_id")
+            .annotate(likes=Sum("likes"), unlikes=Sum("unlikes"), comments=Sum("comments"))
+            .annotate(engagement=F("likes") - F("unlikes") + F("comments"))
+            .order_by("-engagement")[:10]
+        )
+
+        return Response({
+            "granularity": granularity,
+            "days": days,
+            "totals": {k: v or 0 for k, v in totals.items()},
+            "series": series,
+            "top_posts": top_posts,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,113 @@
+"""
+Compare the sync post list/detail/comment views with their async variants.
+
+SQLite answers in microseconds, so --db-latency-ms adds a fixed delay to
+every query to emulate a networked database (where the async gain shows).
+Both sides keep --concurrency requests in flight: the sync path on that
+many worker threads, like a threaded WSGI worker; the async path on one
+event loop, querying on ASYNC_DB_THREADS (--db-threads) pool threads.
+
+    python -m benchmarks.bench_async_views [--requests 200] [--concurrency 16] [--db-threads 8]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django
+
+
+def add_db_latency(seconds):
+    """Delay every query by a fixed amount, in whatever thread runs it"""
+    from django.db.backends import utils
+
+    original = utils.CursorWrapper.execute
+
+    def execute(self, sql, params=None):
+        time.sleep(seconds)
+        return original(self, sql, params)
+
+    utils.CursorWrapper.execute = execute
+
+
+def seed(posts=30):
+    from accounts.models import User
+    from posts.models import Post, PostMedia, Like, Comment
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    users = [User.objects.create(username=f"bench{i}", email=f"bench{i}@example.com") for i in range(10)]
+    for i in range(posts):
+        post = Post.objects.create(author=users[i % 10], caption=f"post {i}")
+        PostMedia.objects.create(post=post, file=f"uploads/posts/bench_{i}.jpg")
+        for u in users[: i % 5 + 1]:
+            Like.objects.create(user=u, post=post)
+        parent = Comment.objects.create(post=post, author=users[0], content="nice")
+        Comment.objects.create(post=post, author=users[1], content="+1", parent_comment=parent)
+    return post.id, users[0].id, str(RefreshToken.for_user(users[0]).access_token)
+
+
+def run_sync(paths, token, total, concurrency):
+    from django.test import Client
+
+    def one(path):
+        start = time.perf_counter()
+        response = Client().get(path, HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, (paths[i % len(paths)] for i in range(total))))
+    return total / (time.perf_counter() - start), sum(latencies) / len(latencies)
+
+
+def run_async(paths, token, total, concurrency):
+    from asgiref.sync import ThreadSensitiveContext
+    from django.test import AsyncClient
+
+    async def one(path, semaphore):
+        # ASGIHandler gives each request its own ThreadSensitiveContext; the test client doesn't
+        async with semaphore, ThreadSensitiveContext():
+            start = time.perf_counter()
+            response = await AsyncClient().get(path, headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(paths[i % len(paths)], semaphore) for i in range(total)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(main())
+    return total / (time.perf_counter() - start), sum(latencies) / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight, on both sides")
+    parser.add_argument("--db-threads", type=int, default=None, help="ASYNC_DB_THREADS for the async side")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    if args.db_threads is not None:
+        settings.ASYNC_DB_THREADS = args.db_threads
+    db_threads = settings.ASYNC_DB_THREADS
+    post_id, user_id, token = seed()
+    add_db_latency(args.db_latency_ms / 1000)
+
+    sync_paths = ["/api/posts/", f"/api/posts/user/{user_id}/", f"/api/posts/{post_id}/comments/"]
+    async_paths = [p.replace("/api/posts/", "/api/posts/async/", 1) for p in sync_paths]
+
+    print(f"{args.requests} requests, {args.concurrency} in flight, db latency {args.db_latency_ms} ms/query\n")
+    sync_rps, sync_latency = run_sync(sync_paths, token, args.requests, args.concurrency)
+    print(f"sync  ({args.concurrency} threads)         {sync_rps:>8.1f} req/s   mean latency {sync_latency * 1000:7.1f} ms")
+    async_rps, async_latency = run_async(async_paths, token, args.requests, args.concurrency)
+    print(f"async (1 loop, {db_threads} db threads) {async_rps:>8.1f} req/s   mean latency {async_latency * 1000:7.1f} ms")
+    print(f"\nthroughput x{async_rps / sync_rps:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare DRF's stdlib JSONRenderer/JSONParser with FastJSONRenderer/FastJSONParser
+on a realistic page of PostSerializer output.
+
+    python -m benchmarks.bench_json_renderers [--posts 50] [--rounds 300]
+"""
+import argparse
+import io
+
+from benchmarks.common import setup_django, measure, report
+
+
+def build_payload(post_count):
+    """Create posts with media, likes and comment threads and serialize a page"""
+    from accounts.models import User
+    from posts.models import Post, PostMedia, Like, Comment
+    from posts.serializers import PostSerializer
+    from posts.views import shape_post_queryset
+
+    users = [User.objects.create(username=f"bench{i}", email=f"bench{i}@example.com") for i in range(20)]
+    for i in range(post_count):
+        post = Post.objects.create(author=users[i % 20], caption="Sunset over the bay #travel " * 3)
+        PostMedia.objects.create(post=post, file=f"uploads/posts/bench_{i}.jpg")
+        for u in users[: (i % 10) + 1]:
+            Like.objects.create(user=u, post=post)
+        for j in range(3):
+            parent = Comment.objects.create(post=post, author=users[j], content="Looks amazing! 😍")
+            Comment.objects.create(post=post, author=users[j + 1], content="Agreed", parent_comment=parent)
+
+    queryset = shape_post_queryset(Post.objects.all(), set(PostSerializer.Meta.fields))
+    data = PostSerializer(queryset, many=True).data
+    return {"count": post_count, "next": None, "previous": None, "results": data}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from project import renderers
+    from project.renderers import FastJSONRenderer, FastJSONParser
+
+    payload = build_payload(args.posts)
+    body = JSONRenderer().render(payload)
+    print(f"payload: {args.posts} posts, {len(body):,} bytes (DRF JSONRenderer)")
+    print(f"         {len(FastJSONRenderer().render(payload)):,} bytes (FastJSONRenderer, compact)\n")
+
+    drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    drf_parser, fast_parser = JSONParser(), FastJSONParser()
+
+    baseline = measure(lambda: drf_renderer.render(payload), args.rounds)
+    report("render: DRF JSONRenderer", baseline)
+    report("render: FastJSONRenderer", measure(lambda: fast_renderer.render(payload), args.rounds), baseline)
+
+    parse_base = measure(lambda: drf_parser.parse(io.BytesIO(body)), args.rounds)
+    report("parse:  DRF JSONParser", parse_base)
+    report("parse:  FastJSONParser", measure(lambda: fast_parser.parse(io.BytesIO(body)), args.rounds), parse_base)
+
+    if renderers.orjson is not None:
+        saved, renderers.orjson = renderers.orjson, None
+        try:
+            report("render: FastJSONRenderer (no orjson)",
+                   measure(lambda: fast_renderer.render(payload), args.rounds), baseline)
+            report("parse:  FastJSONParser (no orjson)",
+                   measure(lambda: fast_parser.parse(io.BytesIO(body)), args.rounds), parse_base)
+        finally:
+            renderers.orjson = saved
+    else:
+        print("\norjson is not installed: FastJSON* timings above are the pure-Python fallback")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Logins per second per core for the configured password hashers.
+
+Measures a single verify() per login (what authenticate() costs on top of
+the user lookup), first on one thread, then with --threads concurrent
+logins going through the bounded hashing pool.
+
+    python -m benchmarks.bench_password_hashing [--seconds 3] [--threads 8]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, report
+
+PASSWORD = "correct horse battery staple"
+
+
+def logins_per_second(hasher, encoded, seconds, threads=1):
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            assert hasher.verify(PASSWORD, encoded)
+            done += 1
+        return done
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+    from accounts.hashers import BoundedArgon2PasswordHasher, BoundedPBKDF2PasswordHasher, get_hashing_pool
+
+    candidates = [("PBKDF2 (Django default)", PBKDF2PasswordHasher())]
+    candidates.append(("PBKDF2 (bounded pool)", BoundedPBKDF2PasswordHasher()))
+    if "accounts.hashers.BoundedArgon2PasswordHasher" in settings.PASSWORD_HASHERS:
+        candidates.append(("Argon2id (tuned, bounded pool)", BoundedArgon2PasswordHasher()))
+    else:
+        print("argon2-cffi is not installed: skipping Argon2\n")
+
+    print(f"cores: {os.cpu_count()}, hashing pool: {get_hashing_pool()._max_workers} workers\n")
+    for label, hasher in candidates:
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        report(f"{label}, 1 thread", logins_per_second(hasher, encoded, args.seconds))
+        rate = logins_per_second(hasher, encoded, args.seconds, args.threads)
+        report(f"{label}, {args.threads} threads", rate)
+        report(f"{label}, per core", rate / min(args.threads, os.cpu_count() or 1))
+        print()
+
+
+if __name__ == "__main__":
+    main()
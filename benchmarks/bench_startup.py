@@ -0,0 +1,94 @@
+"""
+Worker cold start: time to boot Django, load the URLconf and build the WSGI
+app, for the default settings and the lean API-worker profile
+(project/settings_lean.py), plus where the import time goes.
+
+Each boot runs in a fresh interpreter. Wall times are the median of
+`--repeat` plain runs; the per-module breakdown comes from one extra run
+under `python -X importtime`.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 15]
+    python -m benchmarks.bench_startup --settings project.settings_lean
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from benchmarks.common import BASE_DIR
+
+PROFILES = ["project.settings", "project.settings_lean"]
+
+# What a worker does before it can take its first request
+BOOT = """
+import time
+start = time.perf_counter()
+from project.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - start)
+"""
+
+
+def boot(settings_module, importtime=False):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    result = subprocess.run(
+        command + ["-c", BOOT], cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def profile(settings_module, repeat, top):
+    times = [boot(settings_module)[0] for _ in range(repeat)]
+    _, stderr = boot(settings_module, importtime=True)
+    modules = parse_importtime(stderr)
+
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"\n[{settings_module}] boot {statistics.median(times) * 1000:.1f} ms "
+          f"(median of {repeat}), {len(modules)} modules imported, "
+          f"{sum(self_us for _, self_us, _ in modules) / 1000:.1f} ms importing")
+    print(f"\n  {'package':<40} {'self ms':>10}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<40} {self_us / 1000:>10.1f}")
+    print(f"\n  {'module':<40} {'self ms':>10} {'cumul. ms':>10}")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: -m[1])[:top]:
+        print(f"  {name:<40} {self_us / 1000:>10.1f} {cumulative_us / 1000:>10.1f}")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--settings", choices=PROFILES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = {name: profile(name, args.repeat, args.top) for name in ([args.settings] if args.settings else PROFILES)}
+    if len(results) > 1:
+        baseline = results[PROFILES[0]]
+        print()
+        for name, seconds in results.items():
+            print(f"{name:<40} {seconds * 1000:>10.1f} ms   x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Write throughput: autocommit statement-per-row writes vs the transactional
+services (posts/services.py), on SQLite (rollback journal), SQLite (WAL) and,
+when POSTGRES_DB is set, PostgreSQL.
+
+Each database runs in its own subprocess, since Django is configured once
+per process.
+
+    python -m benchmarks.bench_writes [--number 200] [--media 4]
+    python -m benchmarks.bench_writes --database sqlite-wal
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import setup_django, measure, report
+
+DATABASES = ["sqlite", "sqlite-wal", "postgres"]
+
+
+def database_settings(name):
+    if name == "postgres":
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ["POSTGRES_DB"],
+            "USER": os.environ.get("POSTGRES_USER", ""),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", ""),
+            "PORT": os.environ.get("POSTGRES_PORT", ""),
+        }
+    database = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.sqlite3"),
+    }
+    if name == "sqlite-wal":
+        database["OPTIONS"] = {
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+            "transaction_mode": "IMMEDIATE",
+        }
+    else:
+        database["OPTIONS"] = {"init_command": "PRAGMA journal_mode=DELETE; PRAGMA synchronous=FULL;"}
+    return database
+
+
+def run(name, number, media_count):
+    setup_django(database_settings(name))
+    from django.conf import settings
+    settings.MEDIA_ROOT = tempfile.mkdtemp(prefix="bench-media-")
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db.models import F
+    from accounts.models import User
+    from analytics.events import record_event
+    from analytics.models import EngagementEvent
+    from posts.models import Post, PostMedia, Comment
+    from posts import services
+
+    author = User.objects.create_user(username="bench-author", password="x")
+    post = Post.objects.create(author=author, caption="target")
+
+    def uploads():
+        return [SimpleUploadedFile(f"m{i}.jpg", b"\xff\xd8" + b"0" * 512) for i in range(media_count)]
+
+    def legacy_post():
+        # The old path: every statement its own autocommit transaction
+        created = Post.objects.create(author=author, caption="bench")
+        for f in uploads():
+            PostMedia.objects.create(post=created, file=f)
+        User.objects.filter(pk=author.pk).update(posts_count=F("posts_count") + 1)
+        record_event(EngagementEvent.POST, created.pk, author.pk, author.pk)
+
+    def service_post():
+        services.create_post(author, files=uploads(), caption="bench")
+
+    def legacy_comment():
+        Comment.objects.create(author=author, post=post, content="bench")
+        Post.touch(post.pk)
+        record_event(EngagementEvent.COMMENT, post.pk, author.pk, author.pk)
+
+    def service_comment():
+        services.add_comment(post, author, "bench")
+
+    print(f"\n[{name}] {number} writes each, {media_count} media files per post")
+    baseline = measure(legacy_post, number)
+    report("post + media, autocommit per row", baseline)
+    report("post + media, services.create_post", measure(service_post, number), baseline)
+    baseline = measure(legacy_comment, number)
+    report("comment, autocommit per statement", baseline)
+    report("comment, services.add_comment", measure(service_comment, number), baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database", choices=DATABASES)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--media", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.database:
+        run(args.database, args.number, args.media)
+        return
+
+    for name in DATABASES:
+        if name == "postgres" and not os.environ.get("POSTGRES_DB"):
+            print("\n[postgres] POSTGRES_DB is not set: skipping")
+            continue
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_writes", "--database", name,
+             "--number", str(args.number), "--media", str(args.media)],
+            check=False,
+        )
+
+
+if __name__ == "__main__":
+    main()
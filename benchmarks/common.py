@@ -0,0 +1,54 @@
+"""
+Shared setup for the standalone benchmark scripts.
+
+Each script runs against a throwaway SQLite database so the development
+db.sqlite3 is never touched:
+
+    python -m benchmarks.bench_json_renderers
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def setup_django(database=None):
+    """Configure Django on a temporary database and run migrations"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+
+    import django
+    from django.conf import settings
+
+    if database is None:
+        database = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.sqlite3"),
+        }
+    settings.DATABASES["default"] = database
+    settings.ALLOWED_HOSTS = ["*"]
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+
+
+def measure(fn, number):
+    """Run fn() `number` times and return operations per second"""
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    elapsed = time.perf_counter() - start
+    return number / elapsed
+
+
+def report(label, ops_per_sec, baseline=None):
+    """Print one aligned benchmark line, with speedup against a baseline"""
+    line = f"{label:<40} {ops_per_sec:>12,.1f} ops/s"
+    if baseline:
+        line += f"   x{ops_per_sec / baseline:.2f}"
+    print(line)
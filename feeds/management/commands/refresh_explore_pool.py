@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from feeds.ranking import refresh_candidate_pool
+
+
+class Command(BaseCommand):
+    help = "Rebuild the explore candidate pool (run on a schedule, e.g. every 5-10 minutes)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        pool = refresh_candidate_pool()
+        self.stdout.write(self.style.SUCCESS(
+            f"Explore pool refreshed: {len(pool['post_id'])} candidates in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,161 @@
+import hashlib
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from posts.models import Post, Like
+from social.models import Follow
+from social.visibility import get_visibility
+
+POOL_CACHE_KEY = "explore:pool"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Candidate pool (precomputed, refreshed by `manage.py refresh_explore_pool`)
+# ------------------------------------------------------------
+def build_candidate_pool():
+    """
+    Load recent posts with their engagement into column arrays.
+    Two aggregate queries, no matter how many candidates.
+    """
+    now = timezone.now()
+    window_start = now - timedelta(days=_setting("EXPLORE_POOL_DAYS", 7))
+    velocity_start = now - timedelta(hours=_setting("EXPLORE_VELOCITY_HOURS", 24))
+
+    # Explore only ever recommends public accounts
+    rows = list(
+        Post.objects.filter(created_at__gte=window_start, author__is_private=False)
+        .annotate(
+            recent_likes=Count("likes", filter=Q(likes__created_at__gte=velocity_start), distinct=True),
+            total_likes=Count("likes", distinct=True),
+        )
+        .order_by("-created_at")
+        .values_list("id", "author_id", "created_at", "recent_likes", "total_likes")
+        [: _setting("EXPLORE_POOL_SIZE", 5000)]
+    )
+    post_ids = [r[0] for r in rows]
+    recent_comments = dict(
+        Post.objects.filter(pk__in=post_ids)
+        .annotate(n=Count("comments", filter=Q(comments__created_at__gte=velocity_start)))
+        .values_list("pk", "n")
+    ) if post_ids else {}
+
+    pool = {
+        "built_at": now.timestamp(),
+        "post_id": np.array(post_ids, dtype=np.int64),
+        "author_id": np.array([r[1] for r in rows], dtype=np.int64),
+        "created_at": np.array([r[2].timestamp() for r in rows], dtype=np.float64),
+        "recent_likes": np.array([r[3] for r in rows], dtype=np.float64),
+        "total_likes": np.array([r[4] for r in rows], dtype=np.float64),
+        "recent_comments": np.array([recent_comments.get(pid, 0) for pid in post_ids], dtype=np.float64),
+    }
+    return pool
+
+
+def refresh_candidate_pool():
+    pool = build_candidate_pool()
+    cache.set(POOL_CACHE_KEY, pool, _setting("EXPLORE_POOL_TIMEOUT", 3600))
+    return pool
+
+
+def get_candidate_pool():
+    pool = cache.get(POOL_CACHE_KEY)
+    if pool is None:
+        pool = refresh_candidate_pool()
+    return pool
+
+
+# ------------------------------------------------------------
+# Viewer affinity & segments
+# ------------------------------------------------------------
+def author_affinity(user):
+    """author_id -> weight, from the viewer's recent likes and follows (two small queries)"""
+    since = timezone.now() - timedelta(days=30)
+    liked = (
+        Like.objects.filter(user=user, created_at__gte=since)
+        .exclude(post__author_id=user.pk)
+        .values("post__author_id")
+        .annotate(n=Count("id"))
+        .order_by("-n")[:50]
+    )
+    affinity = {row["post__author_id"]: float(np.log1p(row["n"])) for row in liked}
+    for author_id in Follow.objects.filter(follower=user, accepted=True).values_list("following_id", flat=True)[:200]:
+        affinity[author_id] = affinity.get(author_id, 0.0) + 1.0
+    return affinity
+
+
+def segment(affinity):
+    """
+    Viewers sharing the same top authors share one cached ranking.
+    Returns (cache_key, affinity restricted to those authors).
+    """
+    top = sorted(affinity, key=lambda a: (-affinity[a], a))[: _setting("EXPLORE_SEGMENT_AUTHORS", 5)]
+    if not top:
+        return "explore:segment:default", {}
+    digest = hashlib.md5(",".join(map(str, sorted(top))).encode(), usedforsecurity=False).hexdigest()
+    return f"explore:segment:{digest}", {author_id: affinity[author_id] for author_id in top}
+
+
+# ------------------------------------------------------------
+# Vectorized scoring
+# ------------------------------------------------------------
+def score_candidates(pool, affinity, now=None):
+    """
+    score = w_recency * 2^(-age / half_life)
+          + w_velocity * log1p((recent_likes + 2 * recent_comments) / (age_hours + 2))
+          + w_affinity * affinity[author]
+    computed over the whole pool as NumPy array operations.
+    """
+    now = now or time.time()
+    weights = _setting("EXPLORE_WEIGHTS", {"recency": 1.0, "velocity": 1.5, "affinity": 0.8})
+    half_life = _setting("EXPLORE_HALF_LIFE_HOURS", 12.0)
+
+    age_hours = np.maximum(now - pool["created_at"], 0) / 3600.0
+    recency = np.exp2(-age_hours / half_life)
+    velocity = np.log1p((pool["recent_likes"] + 2.0 * pool["recent_comments"]) / (age_hours + 2.0))
+
+    author_weights = np.zeros(len(pool["author_id"]))
+    if affinity:
+        keys = np.fromiter(affinity.keys(), dtype=np.int64, count=len(affinity))
+        values = np.fromiter(affinity.values(), dtype=np.float64, count=len(affinity))
+        order = np.argsort(keys)
+        keys, values = keys[order], values[order]
+        idx = np.clip(np.searchsorted(keys, pool["author_id"]), 0, len(keys) - 1)
+        author_weights = np.where(keys[idx] == pool["author_id"], values[idx], 0.0)
+
+    return (
+        weights["recency"] * recency
+        + weights["velocity"] * velocity
+        + weights["affinity"] * author_weights
+    )
+
+
+def rank_pool(pool, affinity, limit):
+    """Return [(post_id, author_id), ...] for the top `limit` candidates"""
+    if not len(pool["post_id"]):
+        return []
+    scores = score_candidates(pool, affinity)
+    limit = min(limit, len(scores))
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return list(zip(pool["post_id"][top].tolist(), pool["author_id"][top].tolist()))
+
+
+def explore_ranking(user):
+    """Ranked (post_id, author_id) pairs for a viewer, cached per segment (blocked authors removed)"""
+    key, segment_affinity = segment(author_affinity(user))
+    ranked = cache.get(key)
+    if ranked is None:
+        ranked = rank_pool(get_candidate_pool(), segment_affinity, _setting("EXPLORE_RESULTS", 500))
+        cache.set(key, ranked, _setting("EXPLORE_CACHE_TIMEOUT", 120))
+    hidden, _, _ = get_visibility(user)
+    return [(post_id, author_id) for post_id, author_id in ranked if author_id != user.pk and author_id not in hidden]
@@ -1,3 +1,93 @@
+import time
+
+import numpy as np
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from posts import services
+from .ranking import rank_pool, score_candidates
+
+
+def make_user(username, **extra):
+    return User.objects.create_user(username=username, password="pw12345!xZ", email=f"{username}@example.com", **extra)
+
+
+def make_pool(*rows, now):
+    """rows of (post_id, author_id, age_hours, recent_likes, recent_comments)"""
+    columns = list(zip(*rows))
+    return {
+        "post_id": np.array(columns[0], dtype=np.int64),
+        "author_id": np.array(columns[1], dtype=np.int64),
+        "created_at": now - np.array(columns[2], dtype=np.float64) * 3600,
+        "recent_likes": np.array(columns[3], dtype=np.float64),
+        "total_likes": np.array(columns[3], dtype=np.float64),
+        "recent_comments": np.array(columns[4], dtype=np.float64),
+    }
+
+
+# ------------------------------------------------------------
+# Vectorized scoring (feeds/ranking.py)
+# ------------------------------------------------------------
+class ScoringTests(TestCase):
+    def setUp(self):
+        self.now = time.time()
+
+    def ranked_ids(self, pool, affinity=None, limit=10):
+        return [post_id for post_id, _ in rank_pool(pool, affinity or {}, limit)]
+
+    def test_newer_beats_older_at_equal_engagement(self):
+        pool = make_pool((1, 10, 30, 0, 0), (2, 10, 1, 0, 0), (3, 10, 6, 0, 0), now=self.now)
+        self.assertEqual(self.ranked_ids(pool), [2, 3, 1])
+
+    def test_engagement_velocity_outranks_a_little_recency(self):
+        pool = make_pool((1, 10, 1, 0, 0), (2, 10, 3, 40, 10), now=self.now)
+        self.assertEqual(self.ranked_ids(pool), [2, 1])
+
+    def test_affinity_lifts_the_viewers_authors(self):
+        pool = make_pool((1, 10, 1, 0, 0), (2, 20, 2, 0, 0), now=self.now)
+        self.assertEqual(self.ranked_ids(pool), [1, 2])
+        self.assertEqual(self.ranked_ids(pool, {20: 1.0, 99: 5.0}), [2, 1])
+
+    def test_top_k_matches_a_full_sort(self):
+        rng = np.random.default_rng(7)
+        n = 2000
+        pool = make_pool(*zip(
+            range(n), rng.integers(1, 50, n), rng.uniform(0, 168, n), rng.integers(0, 100, n), rng.integers(0, 20, n)
+        ), now=self.now)
+        affinity = {3: 1.5, 7: 0.5}
+        scores = score_candidates(pool, affinity, now=self.now)
+        expected = pool["post_id"][np.argsort(-scores, kind="stable")][:25].tolist()
+        self.assertEqual(self.ranked_ids(pool, affinity, limit=25), expected)
+        self.assertEqual(rank_pool(make_pool((1, 1, 0, 0, 0), now=self.now), {}, 10), [(1, 1)])
+
+
+# ------------------------------------------------------------
+# GET /api/feeds/explore/
+# ------------------------------------------------------------
+class ExploreViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = make_user("viewer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def explore_ids(self):
+        response = self.client.get("/api/feeds/explore/")
+        self.assertEqual(response.status_code, 200)
+        return [post["id"] for post in response.json()["results"]]
+
+    def test_ranks_by_engagement_and_skips_own_private_and_blocked(self):
+        public, private, blocked = make_user("public"), make_user("private", is_private=True), make_user("blocked")
+        busy = services.create_post(public, caption="busy")
+        quiet = services.create_post(public, caption="quiet")
+        for i in range(5):
+            services.toggle_post_like(quiet if i == 0 else busy, make_user(f"fan{i}"))
+        services.create_post(private, caption="followers only")
+        services.create_post(blocked, caption="hidden")
+        services.create_post(self.viewer, caption="mine")
+        self.assertEqual(self.client.post(f"/api/users/{blocked.pk}/block/").status_code, 201)
 
-# Create your tests here.
+        self.client.force_authenticate(User.objects.get(pk=self.viewer.pk))
+        self.assertEqual(self.explore_ids(), [busy.pk, quiet.pk])
@@ -1,3 +1,31 @@
-from django.shortcuts import render
+from rest_framework import generics, permissions
 
-# Create your views here.
+from posts.models import Post
+from posts.serializers import PostSerializer
+from posts.views import PostPagination, shape_post_queryset
+from project.serializers import SparseFieldsMixin
+from .ranking import explore_ranking
+
+
+# ------------------------------------------------------------
+# Explore / Discovery
+# ------------------------------------------------------------
+class ExploreView(SparseFieldsMixin, generics.ListAPIView):
+    """
+    GET -> ranked discovery posts for the current user (authenticated only)
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PostPagination
+
+    def get_queryset(self):
+        return [post_id for post_id, _ in explore_ranking(self.request.user)]
+
+    def list(self, request, *args, **kwargs):
+        # Paginate the ranked ids, then load just that page in ranking order
+        page_ids = self.paginate_queryset(self.get_queryset())
+        posts = shape_post_queryset(Post.objects.filter(pk__in=page_ids), self.requested_fields, request.user)
+        by_id = {post.pk: post for post in posts}
+        page = [by_id[post_id] for post_id in page_ids if post_id in by_id]
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
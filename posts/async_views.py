@@ -0,0 +1,335 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from project.renderers import dumps
+from project.serializers import parse_field_params, resolve_fields
+from social.visibility import get_visibility
+from .conditional import post_etag, comments_etag
+from .live import coalesce, get_broker, post_channel
+from .models import Post, Comment
+from .serializers import PostSerializer, CommentSerializer
+from .views import (
+    PostPagination, CommentPagination, PostListCreateView, UserPostsView, PostDetailView, CommentListView,
+    shape_post_queryset, shape_comment_queryset,
+)
+
+
+# ------------------------------------------------------------
+# Async (ASGI-native) read views
+# ------------------------------------------------------------
+# Same payloads, throttles and ETags as PostListCreateView / UserPostsView /
+# PostDetailView / CommentListView (the same querysets and serializers run
+# on a DB pool thread), but the request never holds a thread while waiting
+# on the DB, and the count of a page is queried alongside the page itself.
+#
+# Those queries run on a bounded pool of ASYNC_DB_THREADS threads. Each
+# thread keeps its connection between queries, like a WSGI worker between
+# requests: it is closed once CONN_MAX_AGE has passed or it became unusable,
+# so a worker holds at most ASYNC_DB_THREADS connections.
+
+def _json(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "ASYNC_DB_THREADS", 8), thread_name_prefix="async-db"
+        )
+    return _executor
+
+
+def _in_own_connection(fn):
+    """Run fn on a DB pool thread, reusing that thread's connection within CONN_MAX_AGE"""
+    def run():
+        close_old_connections()
+        try:
+            return fn()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=_get_executor())
+
+
+async def gather_queries(*fns):
+    """Issue independent ORM reads concurrently, each on a pool thread's connection"""
+    return await asyncio.gather(*(_in_own_connection(fn)() for fn in fns))
+
+
+async def authenticate(request):
+    """
+    JWT auth (same backend as the sync API); returns the user or raises.
+    The user is set on the request for the serializers and validators, and
+    their visibility sets are loaded here, so visible_to() needs no I/O later.
+    """
+    result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    await sync_to_async(get_visibility)(result[0])
+    request.user = result[0]
+    return result[0]
+
+
+def _check_throttles(request, view_class):
+    """The sync view's throttle_classes, checked the way APIView.check_throttles does"""
+    view = view_class()
+    waits = [throttle.wait() for throttle in view.get_throttles() if not throttle.allow_request(request, view)]
+    if waits:
+        waits = [wait for wait in waits if wait is not None]
+        raise exceptions.Throttled(max(waits, default=None))
+
+
+async def admit(request, view_class):
+    """Authenticate, then throttle as view_class would; raises an APIException to refuse"""
+    user = await authenticate(request)
+    await sync_to_async(_check_throttles)(request, view_class)
+    return user
+
+
+def _error(exc):
+    response = _json({"detail": str(exc.detail)}, status=exc.status_code)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+def _not_found():
+    return _json({"detail": "No Post matches the given query."}, status=404)
+
+
+class _FieldsRequest:
+    """Minimal adapter so parse_field_params() can read a plain Django request"""
+
+    def __init__(self, request):
+        self.method = request.method
+        self.query_params = request.GET
+
+
+def _page_params(request, paginator_class):
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    try:
+        size = int(request.GET.get(paginator_class.page_size_query_param, paginator_class.page_size))
+    except ValueError:
+        size = paginator_class.page_size
+    return page, max(1, min(size, paginator_class.max_page_size))
+
+
+def _page_links(request, page, size, count):
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, "page", page + 1) if page * size < count else None
+    if page <= 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, "page")
+    else:
+        previous_url = replace_query_param(url, "page", page - 1)
+    return next_url, previous_url
+
+
+# ------------------------------------------------------------
+# Payloads (the sync views' serializers, on a pool thread)
+# ------------------------------------------------------------
+def _requested_fields(request, serializer_class):
+    return resolve_fields(serializer_class, *parse_field_params(_FieldsRequest(request)))
+
+
+def _serialize(serializer_class, instance, request, many=False):
+    """Serializer output as the sync view renders it; may query (replies), so call it on a pool thread"""
+    fields, expand = parse_field_params(_FieldsRequest(request))
+    context = {"request": request, "fields": fields, "expand": expand}
+    return serializer_class(instance, many=many, context=context).data
+
+
+async def _paginated(request, paginator_class, serializer_class, queryset):
+    page, size = _page_params(request, paginator_class)
+    offset = (page - 1) * size
+    count, results = await gather_queries(
+        queryset.count,
+        lambda: _serialize(serializer_class, queryset[offset:offset + size], request, many=True),
+    )
+    next_url, previous_url = _page_links(request, page, size, count)
+    return _json({"count": count, "next": next_url, "previous": previous_url, "results": results})
+
+
+async def _conditional(request, pk, etag_func, build):
+    """
+    post_condition / comments_condition for an async view: the same ETag, a
+    304 when it matches, 404 when the post isn't visible, else build()
+    """
+    etag = await _in_own_connection(lambda: etag_func(request, pk))()
+    if etag is None:
+        return _not_found()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await build()
+    response.headers.setdefault("ETag", etag)
+    return response
+
+
+# ------------------------------------------------------------
+# Views
+# ------------------------------------------------------------
+async def post_list_async(request):
+    """GET -> list all posts (async variant of PostListCreateView)"""
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user = await admit(request, PostListCreateView)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    fields = _requested_fields(request, PostSerializer)
+    queryset = shape_post_queryset(Post.objects.all(), fields, user)
+    return await _paginated(request, PostPagination, PostSerializer, queryset)
+
+
+async def user_posts_async(request, user_id):
+    """GET -> list posts by a user (async variant of UserPostsView)"""
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user = await admit(request, UserPostsView)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    fields = _requested_fields(request, PostSerializer)
+    queryset = shape_post_queryset(Post.objects.filter(author_id=user_id), fields, user)
+    return await _paginated(request, PostPagination, PostSerializer, queryset)
+
+
+async def post_detail_async(request, pk):
+    """GET -> retrieve a post (async variant of PostDetailView)"""
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user = await admit(request, PostDetailView)
+    except exceptions.APIException as exc:
+        return _error(exc)
+
+    def load():
+        queryset = shape_post_queryset(Post.objects.filter(pk=pk), _requested_fields(request, PostSerializer), user)
+        post = queryset.first()
+        return None if post is None else _serialize(PostSerializer, post, request)
+
+    async def build():
+        data = await _in_own_connection(load)()
+        return _not_found() if data is None else _json(data)
+
+    return await _conditional(request, pk, post_etag, build)
+
+
+async def comment_list_async(request, pk):
+    """GET -> list top-level comments with replies (async variant of CommentListView)"""
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user = await admit(request, CommentListView)
+    except exceptions.APIException as exc:
+        return _error(exc)
+
+    async def build():
+        queryset = shape_comment_queryset(
+            Comment.objects.filter(post_id=pk, parent_comment__isnull=True),
+            _requested_fields(request, CommentSerializer), user,
+        )
+        return await _paginated(request, CommentPagination, CommentSerializer, queryset)
+
+    return await _conditional(request, pk, comments_etag, build)
+
+
+# ------------------------------------------------------------
+# Live updates (server-sent events)
+# ------------------------------------------------------------
+def _sse(event, data):
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def _visible_now(user, post_ids):
+    """Reload the viewer's visibility (a block or unfollow drops the cached sets) and recheck the posts"""
+    user.__dict__.pop("_visibility", None)
+    hidden, _, _ = get_visibility(user)
+    return hidden, set(Post.objects.visible_to(user).filter(pk__in=post_ids).values_list("pk", flat=True))
+
+
+async def _live_events(user, post_ids):
+    """
+    Wait for an event, give the window time to fill, then send it coalesced.
+    Visibility is rechecked before every flush: events of posts the viewer
+    can no longer see are dropped, and the stream ends once none are left.
+    """
+    window = getattr(settings, "LIVE_COALESCE_SECONDS", 0.5)
+    heartbeat = getattr(settings, "LIVE_HEARTBEAT_SECONDS", 15)
+    broker = get_broker()
+    # Subscribed on first iteration, so a client gone before the body starts leaves nothing behind
+    subscription = broker.subscribe([post_channel(pk) for pk in post_ids])
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                first = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            await asyncio.sleep(window)
+            events = [first] + subscription.drain()
+            hidden, post_ids = await _in_own_connection(partial(_visible_now, user, post_ids))()
+            if not post_ids:
+                return
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield _sse("resync", {"posts": sorted(post_ids)})
+                continue
+            events = [
+                e for e in events
+                if e["post"] in post_ids
+                and not (e["type"] == "comment" and e["comment"]["author"]["id"] in hidden)
+            ]
+            for event in coalesce(events):
+                yield _sse(event["type"], event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def post_live_stream(request):
+    """
+    GET -> text/event-stream of like-count deltas (`likes`), new comments
+           (`comment`, or `comments` with a count on busy posts) and
+           deletions for the posts in ?posts=1,2,3. Serve through project/asgi.py.
+    """
+    if request.method != "GET":
+        return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user = await authenticate(request)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    try:
+        requested = {int(pk) for pk in request.GET.get("posts", "").split(",") if pk.strip()}
+    except ValueError:
+        return _json({"posts": ["Must be a comma-separated list of post ids."]}, status=400)
+    max_posts = getattr(settings, "LIVE_MAX_POSTS", 50)
+    if not requested or len(requested) > max_posts:
+        return _json({"posts": [f"Between 1 and {max_posts} post ids."]}, status=400)
+
+    post_ids = [pk async for pk in Post.objects.visible_to(user).filter(pk__in=requested).values_list("pk", flat=True)]
+    if not post_ids:
+        return _json({"detail": "No Post matches the given query."}, status=404)
+    response = StreamingHttpResponse(_live_events(user, post_ids), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Don't let nginx buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,83 @@
+import hashlib
+
+from django.db.models import Max, OuterRef, Subquery
+from django.views.decorators.http import condition
+
+from social.visibility import get_visibility
+from sync.models import Change
+from .models import Comment, Post
+
+
+# ------------------------------------------------------------
+# Cheap validators for conditional GET (ETag)
+# ------------------------------------------------------------
+# Validators are read from Post.version, the latest change-log seq of the
+# post and its comments (likes only record a change), the post author's
+# updated_at and the latest updated_at of its comment authors in a single
+# query, so a 304 is returned before any serializer work happens.
+#
+# No Last-Modified: the body also depends on the viewer's blocks and follows,
+# which carry no timestamp (an unblock deletes the row), so If-Modified-Since
+# would answer 304 with a stale body. The ETag folds in the visibility tag.
+
+def _commenters_updated_at():
+    """Latest updated_at among the post's comment authors (their blocks are in the body too)"""
+    return Subquery(
+        Comment.all_objects.filter(post=OuterRef("pk")).order_by()
+        .values("post").annotate(latest=Max("author__updated_at")).values("latest")
+    )
+
+def _latest_change_seq():
+    """Seq of the newest change to the post or any of its comments (an index lookup)"""
+    return Subquery(Change.objects.filter(post_id=OuterRef("pk")).order_by("-seq").values("seq")[:1])
+
+
+def post_validator(request, pk):
+    """
+    Return (version, change_seq, authors_updated_at) for a post, memoized on
+    the request, or None when it doesn't exist or isn't visible to the user.
+    authors_updated_at covers the post author and every comment author.
+    """
+    cache = getattr(request, "_post_validators", None)
+    if cache is None:
+        cache = request._post_validators = {}
+    if pk not in cache:
+        row = (
+            Post.objects.visible_to(request.user).filter(pk=pk)
+            .annotate(change_seq=_latest_change_seq(), commenters_updated_at=_commenters_updated_at())
+            .values_list("version", "change_seq", "author__updated_at", "commenters_updated_at").first()
+        )
+        if row is None:
+            cache[pk] = None
+        else:
+            # Author blocks are part of the body, so profile edits also invalidate it
+            version, change_seq, *authors = row
+            cache[pk] = (version, change_seq or 0, max(t for t in authors if t is not None))
+    return cache[pk]
+
+
+def query_suffix(request):
+    """Different ?fields=/?page= produce different bodies, so they get different tags"""
+    query = request.META.get("QUERY_STRING", "")
+    if not query:
+        return ""
+    return "-" + hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def post_etag(request, pk, prefix="post"):
+    validator = post_validator(request, pk)
+    if validator is None:
+        return None
+    version, change_seq, authors_updated_at = validator
+    # Blocking someone hides their comments, so the viewer's block list is part of the tag
+    _, _, visibility_tag = get_visibility(request.user)
+    return f'"{prefix}-{pk}-v{version}-c{change_seq}-a{authors_updated_at.timestamp()}-b{visibility_tag}{query_suffix(request)}"'
+
+
+def comments_etag(request, pk):
+    # Comments and their likes record changes under the post's id
+    return post_etag(request, pk, prefix="comments")
+
+
+post_condition = condition(etag_func=post_etag)
+comments_condition = condition(etag_func=comments_etag)
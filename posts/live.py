@@ -0,0 +1,162 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Live post updates (server-sent events)
+# ------------------------------------------------------------
+# Write services publish small events once their transaction commits; the
+# broker fans them out to every stream subscribed to the post's channel
+# (posts/async_views.py: post_live_stream). Streams coalesce what arrives
+# within LIVE_COALESCE_SECONDS, so a hot post costs one message per window.
+#
+# InProcessBroker only reaches streams served by the same process. With
+# several ASGI workers point LIVE_BROKER at a shared implementation (e.g.
+# Redis pub/sub) with the same subscribe / unsubscribe / publish methods.
+
+def post_channel(post_id):
+    return f"post:{post_id}"
+
+
+class Subscription:
+    """One stream's inbox; events are handed over on the stream's event loop"""
+
+    def __init__(self, channels, maxsize):
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when events were dropped for a slow client: it must refetch
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        return await self.queue.get()
+
+    def drain(self):
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+
+class InProcessBroker:
+    """Fan-out to the subscriptions of this process; publish() is thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channels):
+        """Call from the stream's event loop"""
+        subscription = Subscription(channels, _setting("LIVE_QUEUE_SIZE", 1000))
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Loop already closed: the stream is gone
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(_setting("LIVE_BROKER", "posts.live.InProcessBroker"))()
+    return _broker
+
+
+# ------------------------------------------------------------
+# Events (published from posts/services.py on commit)
+# ------------------------------------------------------------
+
+def publish_likes(post_id, delta):
+    get_broker().publish(post_channel(post_id), {"type": "likes", "post": post_id, "delta": delta})
+
+
+def publish_comment(comment):
+    from .serializers import UserPublicSerializer  # serializers -> services -> live
+    get_broker().publish(post_channel(comment.post_id), {
+        "type": "comment",
+        "post": comment.post_id,
+        "comment": {
+            "id": comment.pk,
+            "post": comment.post_id,
+            "author": UserPublicSerializer(comment.author).data,
+            "content": comment.content,
+            "parent_comment": comment.parent_comment_id,
+            "replies": [],
+            "likes_count": 0,
+            "depth": comment.depth,
+            "created_at": _datetime_field.to_representation(comment.created_at),
+        },
+    })
+
+
+def publish_post_deleted(post_id):
+    get_broker().publish(post_channel(post_id), {"type": "deleted", "post": post_id})
+
+
+def coalesce(events, comments_per_post=None):
+    """
+    Merge one window of events: like deltas are summed per post; beyond
+    `comments_per_post` new comments on a post only their count is sent
+    (the client refetches the comments instead).
+    """
+    comments_per_post = comments_per_post or _setting("LIVE_COMMENTS_PER_WINDOW", 20)
+    likes, comments, deleted = {}, {}, set()
+    for event in events:
+        if event["type"] == "likes":
+            likes[event["post"]] = likes.get(event["post"], 0) + event["delta"]
+        elif event["type"] == "comment":
+            comments.setdefault(event["post"], []).append(event)
+        elif event["type"] == "deleted":
+            deleted.add(event["post"])
+
+    merged = [{"type": "likes", "post": post, "delta": delta} for post, delta in likes.items()
+              if delta and post not in deleted]
+    for post, items in comments.items():
+        if post in deleted:
+            continue
+        if len(items) > comments_per_post:
+            merged.append({"type": "comments", "post": post, "count": len(items)})
+        else:
+            merged.extend(items)
+    merged.extend({"type": "deleted", "post": post} for post in deleted)
+    return merged
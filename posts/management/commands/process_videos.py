@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts.models import PostMedia
+from posts.video import process_video, VideoProcessingError
+
+
+class Command(BaseCommand):
+    help = "Process pending and failed post videos (and videos uploaded before processing existed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stuck", action="store_true",
+                            help="also retry videos left 'processing' by a worker that died")
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        statuses = [PostMedia.PENDING, PostMedia.FAILED] + ([PostMedia.PROCESSING] if options["stuck"] else [])
+        queryset = PostMedia.objects.filter(type=PostMedia.VIDEO).filter(
+            Q(status__in=statuses) | Q(status=PostMedia.READY, stream="")
+        ).order_by("pk")
+        media_ids = list(queryset.values_list("pk", flat=True)[:options["limit"]])
+        # process_video only picks up pending / failed rows
+        PostMedia.objects.filter(pk__in=media_ids).update(status=PostMedia.PENDING)
+
+        start = time.perf_counter()
+        done = failed = 0
+        for media_id in media_ids:
+            try:
+                done += process_video(media_id)
+            except VideoProcessingError as e:
+                failed += 1
+                self.stderr.write(f"media {media_id}: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {done} videos ({failed} failed) in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,22 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from posts.reaper import reap_deleted
+
+
+class Command(BaseCommand):
+    help = "Permanently remove soft-deleted posts and accounts in bounded chunks (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=float, default=None, help="defaults to REAPER_GRACE_HOURS")
+        parser.add_argument("--limit", type=int, default=None, help="max posts and accounts per run")
+
+    def handle(self, *args, **options):
+        grace = timedelta(hours=options["grace_hours"]) if options["grace_hours"] is not None else None
+        start = time.perf_counter()
+        posts, users = reap_deleted(grace=grace, limit=options["limit"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Reaped {posts} posts and {users} accounts in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,210 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from posts.models import Post, PostMedia, Like, Comment, CommentLike
+from posts.threads import MAX_DEPTH, path_segment
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at values we generate instead of now()"""
+    fields = [m._meta.get_field("created_at") for m in models]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f in fields:
+            f.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "Generate a large synthetic dataset (users, posts, media, comment threads, likes) with bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--posts", type=int, default=100_000, help="total posts (power-law per user)")
+        parser.add_argument("--avg-likes", type=float, default=20, help="mean likes per post")
+        parser.add_argument("--avg-comments", type=float, default=5, help="mean comments per post")
+        parser.add_argument("--reply-depth", type=int, default=6, help=f"max comment thread depth (0-{MAX_DEPTH - 1})")
+        parser.add_argument("--days", type=int, default=30, help="spread timestamps over this many days")
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--password", default="seed-password", help="password for every seeded user")
+        parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible data")
+
+    # ------------------------------------------------------------
+    # Distributions
+    # ------------------------------------------------------------
+    def power_law(self, mean, cap, alpha=1.8):
+        """Pareto-distributed non-negative int with roughly the given mean"""
+        scale = mean * (alpha - 1) / alpha
+        return min(int(random.paretovariate(alpha) * scale), cap)
+
+    def random_time(self):
+        return self.now - timedelta(seconds=random.random() * self.span)
+
+    # ------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------
+    def handle(self, *args, **options):
+        # Same limit as the API's: deeper paths overflow Comment.path
+        if not 0 <= options["reply_depth"] < MAX_DEPTH:
+            raise CommandError(f"--reply-depth must be between 0 and {MAX_DEPTH - 1}.")
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.span = options["days"] * 86400
+        start = time.perf_counter()
+
+        with explicit_timestamps(Post, Like, Comment, CommentLike):
+            user_ids, posts_per_user = self.create_users(options)
+            post_ids = self.create_posts(user_ids, posts_per_user)
+            self.create_media(post_ids)
+            self.create_likes(user_ids, post_ids, options["avg_likes"])
+            comment_ids = self.create_comments(user_ids, post_ids, options["avg_comments"], options["reply_depth"])
+            self.create_comment_likes(user_ids, comment_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Seeding finished in {time.perf_counter() - start:.1f}s"))
+
+    def bulk(self, model, objs):
+        """bulk_create in one transaction per batch; returns the created objects"""
+        created = []
+        for i in range(0, len(objs), self.batch_size):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(objs[i:i + self.batch_size]))
+        return created
+
+    def log(self, label, count, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<14} {count:>12,} rows  {elapsed:7.1f}s  ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    # ------------------------------------------------------------
+    # Generators
+    # ------------------------------------------------------------
+    def create_users(self, options):
+        start = time.perf_counter()
+        n = options["users"]
+        # One hash shared by every seeded user: hashing millions of passwords would dominate the run
+        password = make_password(options["password"])
+
+        weights = [self.power_law(10, 10_000) + 1 for _ in range(n)]
+        total_weight = sum(weights)
+        posts_per_user = [round(w * options["posts"] / total_weight) for w in weights]
+
+        prefix = f"seed{int(self.now.timestamp())}_"
+        users = [
+            User(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@seed.local",
+                password=password,
+                posts_count=posts_per_user[i],
+            )
+            for i in range(n)
+        ]
+        user_ids = [u.pk for u in self.bulk(User, users)]
+        self.log("users", n, start)
+        return user_ids, posts_per_user
+
+    def create_posts(self, user_ids, posts_per_user):
+        start = time.perf_counter()
+        post_ids, batch = [], []
+        for user_id, count in zip(user_ids, posts_per_user):
+            for _ in range(count):
+                batch.append(Post(author_id=user_id, caption="Seeded post #seed", created_at=self.random_time()))
+                if len(batch) >= self.batch_size:
+                    post_ids.extend((p.pk, p.author_id) for p in self.bulk(Post, batch))
+                    batch = []
+        post_ids.extend((p.pk, p.author_id) for p in self.bulk(Post, batch))
+        self.log("posts", len(post_ids), start)
+        return post_ids
+
+    def create_media(self, post_ids):
+        start = time.perf_counter()
+        total, batch = 0, []
+        for post_id, _ in post_ids:
+            for i in range(random.choices((1, 2, 3, 5), weights=(70, 15, 10, 5))[0]):
+                media_type = PostMedia.VIDEO if random.random() < 0.1 else PostMedia.IMAGE
+                ext = "mp4" if media_type == PostMedia.VIDEO else "jpg"
+                batch.append(PostMedia(post_id=post_id, file=f"uploads/posts/seed/{post_id}_{i}.{ext}", type=media_type))
+            if len(batch) >= self.batch_size:
+                total += len(self.bulk(PostMedia, batch))
+                batch = []
+        total += len(self.bulk(PostMedia, batch))
+        self.log("media", total, start)
+
+    def create_likes(self, user_ids, post_ids, avg_likes):
+        start = time.perf_counter()
+        total, batch = 0, []
+        for post_id, _ in post_ids:
+            count = self.power_law(avg_likes, len(user_ids))
+            for user_id in random.sample(user_ids, count):
+                batch.append(Like(user_id=user_id, post_id=post_id, created_at=self.random_time()))
+            if len(batch) >= self.batch_size:
+                total += len(self.bulk(Like, batch))
+                batch = []
+        total += len(self.bulk(Like, batch))
+        self.log("likes", total, start)
+
+    def create_comments(self, user_ids, post_ids, avg_comments, max_depth):
+        """Top-level comments first, then each reply level pointing at the previous one"""
+        start = time.perf_counter()
+        comment_ids = []
+        for i in range(0, len(post_ids), self.batch_size):
+            chunk = post_ids[i:i + self.batch_size]
+            level = self.bulk(Comment, [
+                Comment(post_id=post_id, author_id=random.choice(user_ids), content="Seeded comment",
+                        created_at=self.random_time())
+                for post_id, _ in chunk
+                for _ in range(self.power_law(avg_comments, 5_000))
+            ])
+            self.set_paths(level)
+            comment_ids.extend(c.pk for c in level)
+
+            for _ in range(max_depth):
+                replies = [
+                    Comment(post_id=parent.post_id, parent_comment_id=parent.pk, author_id=random.choice(user_ids),
+                            content="Seeded reply", created_at=parent.created_at + timedelta(minutes=random.randint(1, 600)))
+                    for parent in level
+                    if random.random() < 0.35
+                    for _ in range(random.randint(1, 3))
+                ]
+                if not replies:
+                    break
+                parents = {parent.pk: parent for parent in level}
+                level = self.bulk(Comment, replies)
+                self.set_paths(level, parents)
+                comment_ids.extend(c.pk for c in level)
+        self.log("comments", len(comment_ids), start)
+        return comment_ids
+
+    def set_paths(self, comments, parents=None):
+        """Materialized paths need the new ids, so they are filled in after bulk_create"""
+        for comment in comments:
+            parent = parents[comment.parent_comment_id] if parents else None
+            comment.path = (parent.path if parent else "") + path_segment(comment.pk)
+            comment.depth = parent.depth + 1 if parent else 0
+        for i in range(0, len(comments), self.batch_size):
+            with transaction.atomic():
+                Comment.all_objects.bulk_update(comments[i:i + self.batch_size], ["path", "depth"])
+
+    def create_comment_likes(self, user_ids, comment_ids):
+        start = time.perf_counter()
+        total, batch = 0, []
+        for comment_id in comment_ids:
+            count = self.power_law(1.5, len(user_ids))
+            for user_id in random.sample(user_ids, count):
+                batch.append(CommentLike(user_id=user_id, comment_id=comment_id, created_at=self.random_time()))
+            if len(batch) >= self.batch_size:
+                total += len(self.bulk(CommentLike, batch))
+                batch = []
+        total += len(self.bulk(CommentLike, batch))
+        self.log("comment likes", total, start)
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+PATH_WIDTH = 10
+
+
+def backfill_paths(apps, schema_editor):
+    """Walk the adjacency list one level at a time, writing paths in batches"""
+    Comment = apps.get_model('posts', 'Comment')
+    parents = {}
+    frontier = list(Comment.objects.filter(parent_comment__isnull=True).values_list('pk', flat=True))
+    while frontier:
+        batch = []
+        for i in range(0, len(frontier), 1000):
+            ids = frontier[i:i + 1000]
+            for comment in Comment.objects.filter(pk__in=ids).only('pk', 'parent_comment_id'):
+                parent_path, parent_depth = parents.get(comment.parent_comment_id, ('', -1))
+                comment.path = parent_path + f'{comment.pk:0{PATH_WIDTH}d}/'
+                comment.depth = parent_depth + 1
+                batch.append(comment)
+        Comment.objects.bulk_update(batch, ['path', 'depth'], batch_size=1000)
+        parents = {c.pk: (c.path, c.depth) for c in batch}
+        parent_ids, frontier = list(parents), []
+        for i in range(0, len(parent_ids), 1000):
+            frontier.extend(
+                Comment.objects.filter(parent_comment_id__in=parent_ids[i:i + 1000]).values_list('pk', flat=True)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='posts_comme_post_id_abd11d_idx'),
+        ),
+    ]
@@ -1,13 +1,64 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.conf import settings
+from django.utils import timezone
+
+from social.visibility import get_visibility
+from .threads import path_segment
 
 User = settings.AUTH_USER_MODEL
 
 
+# ------------------------------------------------------------
+# Soft delete
+# ------------------------------------------------------------
+# Deleting only stamps `deleted_at` (or deactivates the account); the default
+# managers hide those rows at once and `manage.py reap_deleted` removes them
+# and their dependents later in bounded chunks (see posts/reaper.py).
+
+# ------------------------------------------------------------
+# Visibility (private accounts & blocks, see social/visibility.py)
+# ------------------------------------------------------------
+class PostQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Drop posts of blocked/blocking authors and of private authors `user` doesn't follow"""
+        hidden, allowed, _ = get_visibility(user)
+        queryset = self.filter(Q(author__is_private=False) | Q(author_id__in=allowed))
+        return queryset.exclude(author_id__in=hidden) if hidden else queryset
+
+
+class CommentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Drop comments of blocked/blocking authors (the post itself is checked by the caller)"""
+        hidden, _, _ = get_visibility(user)
+        return self.exclude(author_id__in=hidden) if hidden else self
+
+
+class LivePostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Hides soft-deleted posts and posts of deactivated accounts"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True, author__is_active=True)
+
+
+class LiveCommentManager(models.Manager.from_queryset(CommentQuerySet)):
+    """Hides comments on soft-deleted posts and comments of deactivated accounts"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(post__deleted_at__isnull=True, author__is_active=True)
+
+
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     caption = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every change to the post or its likes/comments (used as ETag)
+    version = models.PositiveIntegerField(default=1)
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = LivePostManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["-created_at"]
@@ -15,6 +66,21 @@ class Post(models.Model):
     def __str__(self):
         return f"Post by {self.author} ({self.id})"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def touch(cls, post_id):
+        """Bump version/updated_at after comments change, without loading the post"""
+        cls.all_objects.filter(pk=post_id).update(version=F("version") + 1, updated_at=timezone.now())
+
+    def soft_delete(self):
+        """Hide the post immediately; likes, comments and media are reaped later"""
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted_at", "version", "updated_at"])
+
 
 class PostMedia(models.Model):
     IMAGE = "image"
@@ -24,9 +90,30 @@ class PostMedia(models.Model):
         (VIDEO, "Video"),
     ]
 
+    # Videos are processed in the background (posts/video.py); images are ready as uploaded
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    ]
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="media")
     file = models.FileField(upload_to="uploads/posts/")
     type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, default=IMAGE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=READY)
+    error = models.CharField(max_length=255, blank=True, default="")
+    # Video outputs: preview frame, HLS master playlist and its variants
+    poster = models.FileField(blank=True, default="", editable=False)
+    stream = models.FileField(blank=True, default="", editable=False)
+    renditions = models.JSONField(default=list, blank=True, editable=False)
+    duration = models.FloatField(null=True, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"Media for Post {self.post.id} ({self.type})"
@@ -52,13 +139,37 @@ class Comment(models.Model):
         "self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+    # Materialized path of ancestor ids + own id, and nesting level (see posts/threads.py)
+    path = models.CharField(max_length=255, blank=True, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = LiveCommentManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [models.Index(fields=["post", "path"])]
 
     def __str__(self):
         return f"Comment by {self.author} on Post {self.post.id}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            self.set_path()
+
+    def set_path(self):
+        """Path needs the new primary key, so it is written right after the insert"""
+        parent = self.parent_comment if self.parent_comment_id else None
+        self.path = (parent.path if parent else "") + path_segment(self.pk)
+        self.depth = parent.depth + 1 if parent else 0
+        Comment.all_objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+
 
 class CommentLike(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comment_likes")
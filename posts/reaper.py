@@ -0,0 +1,196 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.avatars import delete_stale_avatars
+from accounts.models import User
+from social.models import Block, Follow, Suggestion, SuggestionQueue
+from social.profile import invalidate_profile
+from social.visibility import invalidate_visibility
+from .models import Post, PostMedia, Like, Comment, CommentLike
+from .threads import RANGES_PER_QUERY, subtree_q
+from .video import delete_video_outputs
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Chunked raw deletes
+# ------------------------------------------------------------
+# Django's collector loads every dependent row into memory before deleting.
+# Here each chunk is one indexed SELECT of primary keys plus one raw DELETE in
+# its own short transaction: no model instances, no signals, bounded locks.
+
+def keyset_chunks(queryset, *fields, descending=False, batch_size=None):
+    """Yield lists of (pk, *fields) rows in primary-key order, `batch_size` at a time"""
+    batch_size = batch_size or _setting("REAPER_BATCH_SIZE", 1000)
+    ordering, after = ("-pk", "pk__lt") if descending else ("pk", "pk__gt")
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(**{after: last})
+        rows = list(chunk.order_by(ordering).values_list("pk", *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def raw_delete(model, pks):
+    """DELETE ... WHERE pk IN (...) without the collector"""
+    with transaction.atomic():
+        return model._base_manager.filter(pk__in=pks)._raw_delete(model._base_manager.db)
+
+
+def delete_in_chunks(queryset, descending=False):
+    deleted = 0
+    for rows in keyset_chunks(queryset, descending=descending):
+        deleted += raw_delete(queryset.model, [row[0] for row in rows])
+    return deleted
+
+
+def touch_posts(post_ids):
+    """Bump version/updated_at (ETags) of posts that lost likes or comments"""
+    if post_ids:
+        Post.all_objects.filter(pk__in=set(post_ids)).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def delete_blobs(storage, names):
+    """Remove files from storage once the rows pointing at them are gone"""
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: [storage.delete(name) for name in names])
+
+
+# ------------------------------------------------------------
+# Comment threads
+# ------------------------------------------------------------
+def comment_subtree_ids(roots):
+    """Ids of the given (post_id, path) comments plus all their replies, via path ranges"""
+    ids = []
+    for i in range(0, len(roots), RANGES_PER_QUERY):
+        q = Q(pk__in=[])
+        for post_id, path in roots[i:i + RANGES_PER_QUERY]:
+            q |= subtree_q(path, post_id=post_id, include_self=True)
+        ids.extend(Comment.all_objects.filter(q).values_list("pk", flat=True))
+    return ids
+
+
+def delete_comments(comment_ids):
+    """Delete comments (with their likes) deepest-first: replies always have higher ids than their parents"""
+    batch_size = _setting("REAPER_BATCH_SIZE", 1000)
+    comment_ids = sorted(set(comment_ids), reverse=True)
+    for start in range(0, len(comment_ids), batch_size):
+        chunk = comment_ids[start:start + batch_size]
+        delete_in_chunks(CommentLike.objects.filter(comment_id__in=chunk))
+        raw_delete(Comment, chunk)
+
+
+# ------------------------------------------------------------
+# Reapers
+# ------------------------------------------------------------
+def reap_post(post_id):
+    """Delete a post and everything hanging off it, chunk by chunk"""
+    delete_in_chunks(CommentLike.objects.filter(comment__post_id=post_id))
+    delete_in_chunks(Comment.all_objects.filter(post_id=post_id), descending=True)
+    delete_in_chunks(Like.objects.filter(post_id=post_id))
+
+    storage = PostMedia._meta.get_field("file").storage
+    for rows in keyset_chunks(PostMedia.objects.filter(post_id=post_id), "file", "type"):
+        with transaction.atomic():
+            raw_delete(PostMedia, [pk for pk, _, _ in rows])
+            delete_blobs(storage, [name for _, name, _ in rows])
+            videos = [pk for pk, _, kind in rows if kind == PostMedia.VIDEO]
+            if videos:
+                transaction.on_commit(lambda: [delete_video_outputs(pk) for pk in videos])
+
+    raw_delete(Post, [post_id])
+
+
+def reap_user(user_id):
+    """Delete an account: its posts, engagement, follows, blocks, suggestions and tokens, then the user row itself"""
+    for rows in keyset_chunks(Post.all_objects.filter(author_id=user_id)):
+        for (post_id,) in rows:
+            reap_post(post_id)
+
+    for rows in keyset_chunks(Like.objects.filter(user_id=user_id), "post_id"):
+        with transaction.atomic():
+            raw_delete(Like, [pk for pk, _ in rows])
+            touch_posts([post_id for _, post_id in rows])
+
+    for rows in keyset_chunks(CommentLike.objects.filter(user_id=user_id), "comment__post_id"):
+        with transaction.atomic():
+            raw_delete(CommentLike, [pk for pk, _ in rows])
+            touch_posts([post_id for _, post_id in rows])
+
+    # Replies by other users go with the thread they answered
+    # (each pass deletes what it read, so the next pass simply starts over)
+    user_comments = Comment.all_objects.filter(author_id=user_id).order_by("pk").values_list("post_id", "path")
+    while rows := list(user_comments[: _setting("REAPER_BATCH_SIZE", 1000)]):
+        with transaction.atomic():
+            delete_comments(comment_subtree_ids(rows))
+            touch_posts([post_id for post_id, _ in rows])
+
+    # Follow edges: keep the other side's counters right (pending requests were never counted)
+    for rows in keyset_chunks(Follow.objects.filter(following_id=user_id), "follower_id", "accepted"):
+        with transaction.atomic():
+            raw_delete(Follow, [pk for pk, _, _ in rows])
+            followers = [follower_id for _, follower_id, accepted in rows if accepted]
+            User.objects.filter(pk__in=followers, following_count__gt=0).update(following_count=F("following_count") - 1)
+        invalidate_profile(*followers)
+    for rows in keyset_chunks(Follow.objects.filter(follower_id=user_id), "following_id", "accepted"):
+        with transaction.atomic():
+            raw_delete(Follow, [pk for pk, _, _ in rows])
+            following = [following_id for _, following_id, accepted in rows if accepted]
+            User.objects.filter(pk__in=following, followers_count__gt=0).update(followers_count=F("followers_count") - 1)
+        invalidate_profile(*following)
+
+    # Blocks either way: the other side's cached hidden set still lists this account
+    blocks = Block.objects.filter(Q(blocker_id=user_id) | Q(blocked_id=user_id))
+    for rows in keyset_chunks(blocks, "blocker_id", "blocked_id"):
+        raw_delete(Block, [pk for pk, _, _ in rows])
+        invalidate_visibility(*{other for _, *pair in rows for other in pair if other != user_id})
+
+    delete_in_chunks(Suggestion.objects.filter(user_id=user_id))
+    delete_in_chunks(Suggestion.objects.filter(candidate_id=user_id))
+    raw_delete(SuggestionQueue, [user_id])
+
+    delete_in_chunks(BlacklistedToken.objects.filter(token__user_id=user_id))
+    delete_in_chunks(OutstandingToken.objects.filter(user_id=user_id))
+
+    with transaction.atomic():
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return
+        image = user.image.name if user.image else None
+        # Only group/permission links and admin log entries are left for the collector
+        user.delete()
+        delete_blobs(User._meta.get_field("image").storage, [image])
+        transaction.on_commit(lambda: delete_stale_avatars(user_id))
+    invalidate_profile(user_id)
+
+
+def reap_deleted(grace=None, limit=None):
+    """
+    Reap posts and accounts soft-deleted more than `grace` ago.
+    Returns (posts_reaped, users_reaped).
+    """
+    grace = grace if grace is not None else timedelta(hours=_setting("REAPER_GRACE_HOURS", 1))
+    cutoff = timezone.now() - grace
+
+    post_ids = Post.all_objects.filter(deleted_at__lte=cutoff).order_by("pk").values_list("pk", flat=True)
+    user_ids = User.objects.filter(is_active=False, deleted_at__lte=cutoff).order_by("pk").values_list("pk", flat=True)
+    if limit:
+        post_ids, user_ids = post_ids[:limit], user_ids[:limit]
+    post_ids, user_ids = list(post_ids), list(user_ids)
+
+    for post_id in post_ids:
+        reap_post(post_id)
+    for user_id in user_ids:
+        reap_user(user_id)
+    return len(post_ids), len(user_ids)
@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.conf import settings
+from django.db.models import Count
+from project.serializers import DynamicFieldsMixin
 from .models import Post, PostMedia, Like, Comment, CommentLike
+from .threads import MAX_DEPTH, attach_replies, attach_post_replies
+from .video import is_video
+from . import services
 
 User = settings.AUTH_USER_MODEL
 
@@ -12,7 +17,15 @@ class UserPublicSerializer(serializers.Serializer):
     """Public user info serializer (used inside other serializers)"""
     id = serializers.IntegerField(read_only=True)
     username = serializers.CharField(read_only=True)
-    image = serializers.ImageField(read_only=True, required=False)
+    # Small avatar rendition (precomputed URL), not the full-size upload
+    image = serializers.SerializerMethodField()
+
+    def get_image(self, obj):
+        url = obj.avatar_url()
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
 
 # -----------------------------------------
@@ -22,7 +35,8 @@ class PostMediaSerializer(serializers.ModelSerializer):
     """Serializer for post media files (image/video)"""
     class Meta:
         model = PostMedia
-        fields = ['id', 'file', 'type']
+        # Videos: show `poster` until the client plays `stream` (HLS)
+        fields = ['id', 'file', 'type', 'status', 'poster', 'stream', 'duration', 'width', 'height']
 
 
 # -----------------------------------------
@@ -39,7 +53,26 @@ class CommentLikeSerializer(serializers.ModelSerializer):
 # -----------------------------------------
 # Comment Serializer (supports nested replies)
 # -----------------------------------------
-class CommentSerializer(serializers.ModelSerializer):
+def reply_queryset(context=None):
+    """Replies as the comment views load them (author joined, likes annotated, blocked authors hidden)"""
+    queryset = Comment.objects.select_related('author').annotate(likes_total=Count('likes', distinct=True))
+    request = (context or {}).get('request')
+    if request is not None and request.user.is_authenticated:
+        queryset = queryset.visible_to(request.user)
+    return queryset
+
+
+class CommentListSerializer(serializers.ListSerializer):
+    """Loads the replies of every comment in the list with one range query before serializing"""
+
+    def to_representation(self, data):
+        comments = list(data.all() if hasattr(data, 'all') else data)
+        if 'replies' in self.child.fields:
+            attach_replies(comments, reply_queryset(self.context))
+        return super().to_representation(comments)
+
+
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for comments and replies"""
     author = UserPublicSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
@@ -55,17 +88,32 @@ class CommentSerializer(serializers.ModelSerializer):
             'parent_comment',
             'replies',
             'likes_count',
+            'depth',
             'created_at',
         ]
-        read_only_fields = ['author', 'post', 'replies', 'likes_count']
+        read_only_fields = ['author', 'post', 'replies', 'likes_count', 'depth']
+        expandable_fields = ['replies']
+        list_serializer_class = CommentListSerializer
 
     def get_replies(self, obj):
-        """Return nested replies for each comment"""
-        replies_qs = obj.replies.all()
-        return CommentSerializer(replies_qs, many=True).data
+        """Return nested replies for each comment (whole subtree loaded in one query)"""
+        if not hasattr(obj, 'reply_list'):
+            attach_replies([obj], reply_queryset(self.context))
+        return CommentSerializer(obj.reply_list, many=True, context={'request': self.context.get('request')}).data
+
+    def validate(self, attrs):
+        parent = attrs.get('parent_comment')
+        post = self.context.get('post')
+        if parent is not None and post is not None and parent.post_id != post.pk:
+            raise serializers.ValidationError({'parent_comment': 'Reply must belong to the same post.'})
+        if parent is not None and parent.depth + 1 >= MAX_DEPTH:
+            raise serializers.ValidationError({'parent_comment': f'Replies cannot be nested more than {MAX_DEPTH} levels.'})
+        return attrs
 
     def get_likes_count(self, obj):
-        """Return number of likes for the comment"""
+        """Return number of likes for the comment (annotated by the view when possible)"""
+        if hasattr(obj, 'likes_total'):
+            return obj.likes_total
         return obj.likes.count()
 
     def create(self, validated_data):
@@ -76,12 +124,7 @@ class CommentSerializer(serializers.ModelSerializer):
         # ✅ Remove parent_comment to avoid passing it twice
         parent_comment = validated_data.pop('parent_comment', None)
 
-        return Comment.objects.create(
-            author=user,
-            post=post,
-            parent_comment=parent_comment,
-            **validated_data
-        )
+        return services.add_comment(post, user, parent_comment=parent_comment, **validated_data)
 
 
 # -----------------------------------------
@@ -99,7 +142,19 @@ class LikeSerializer(serializers.ModelSerializer):
 # -----------------------------------------
 # Post Serializer
 # -----------------------------------------
-class PostSerializer(serializers.ModelSerializer):
+class PostListSerializer(serializers.ListSerializer):
+    """Loads replies for the prefetched comments of the whole page in one range query"""
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        if 'comments' in self.child.fields:
+            loaded = [post for post in posts if hasattr(post, 'top_level_comments')]
+            roots = [c for post in loaded for c in post.top_level_comments]
+            attach_post_replies(loaded, roots, reply_queryset(self.context))
+        return super().to_representation(posts)
+
+
+class PostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Main post serializer with nested media, likes, and comments"""
     author = UserPublicSerializer(read_only=True)
     media = PostMediaSerializer(many=True, read_only=True)
@@ -118,28 +173,42 @@ class PostSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['author', 'media', 'likes_count', 'comments']
+        expandable_fields = ['media', 'comments']
+        list_serializer_class = PostListSerializer
 
     def get_likes_count(self, obj):
-        """Return total likes for the post"""
+        """Return total likes for the post (annotated by the view when possible)"""
+        if hasattr(obj, 'likes_total'):
+            return obj.likes_total
         return obj.likes.count()
 
     def get_comments(self, obj):
         """Return top-level comments only (exclude replies)"""
-        qs = obj.comments.filter(parent_comment__isnull=True)
-        return CommentSerializer(qs, many=True).data
+        if hasattr(obj, 'top_level_comments'):
+            qs = obj.top_level_comments
+        else:
+            qs = obj.comments.filter(parent_comment__isnull=True)
+        # Only the request is passed on: 'fields' in this context are post fields
+        return CommentSerializer(qs, many=True, context={'request': self.context.get('request')}).data
+
+    def validate(self, attrs):
+        """Reject oversized videos before anything is stored"""
+        request = self.context.get('request')
+        files = request.FILES.getlist('media') if request and hasattr(request, 'FILES') else []
+        max_bytes = getattr(settings, 'VIDEO_MAX_BYTES', 200 * 1024 * 1024)
+        if any(is_video(f) and f.size > max_bytes for f in files):
+            raise serializers.ValidationError({'media': [f'Videos can be at most {max_bytes // (1024 * 1024)} MB.']})
+        return attrs
 
     def create(self, validated_data):
         """
         Create a post and handle uploaded media files.
         Author is passed from the view via serializer.save(author=request.user)
         """
-        post = Post.objects.create(**validated_data)  # ✅ no author here
-
-        # Handle uploaded media files if any
+        # Handle uploaded media files if any (written with the post in one transaction)
         request = self.context.get('request')
-        if request and hasattr(request, 'FILES'):
-            media_files = request.FILES.getlist('media')
-            for f in media_files:
-                PostMedia.objects.create(post=post, file=f)
+        media_files = request.FILES.getlist('media') if request and hasattr(request, 'FILES') else []
+        return services.create_post(files=media_files, **validated_data)
 
-        return post
+    def update(self, instance, validated_data):
+        return services.update_post(instance, **validated_data)
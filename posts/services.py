@@ -0,0 +1,128 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from accounts.models import User
+from analytics.events import record_event
+from analytics.models import EngagementEvent
+from social.profile import invalidate_profile
+from social.suggestions import queue_suggestions
+from sync.changes import record_change, record_changes
+from sync.models import Change
+from . import live
+from .models import Post, PostMedia, Like, Comment, CommentLike
+from .reaper import delete_comments
+from .threads import subtree_q
+from .video import is_video, schedule_videos
+
+
+# ------------------------------------------------------------
+# Transactional write services
+# ------------------------------------------------------------
+# Each write is exactly one transaction (one commit / fsync). Side effects
+# that must not happen for a rolled-back write (cache invalidation, analytics
+# events) are deferred with transaction.on_commit. Every write also appends
+# its sync change (sync/changes.py) inside the same transaction.
+
+def create_post(author, files=(), **fields):
+    """Post + all its media rows + the author's counter, all or nothing"""
+    media = []
+    try:
+        with transaction.atomic():
+            post = Post.objects.create(author=author, **fields)
+            # FileField.pre_save() stores each upload as the rows are built
+            media = PostMedia.objects.bulk_create([
+                PostMedia(post=post, file=f, type=PostMedia.VIDEO, status=PostMedia.PENDING)
+                if is_video(f) else PostMedia(post=post, file=f)
+                for f in files
+            ])
+            schedule_videos(item.pk for item in media if item.type == PostMedia.VIDEO)
+            User.objects.filter(pk=author.pk).update(posts_count=F("posts_count") + 1)
+            record_event(EngagementEvent.POST, post.pk, author.pk, author.pk)
+            record_change(Change.POST, post.pk, post.pk)
+            transaction.on_commit(lambda: invalidate_profile(author.pk))
+    except Exception:
+        # Uploads already written to storage belong to no row now
+        for item in media:
+            item.file.delete(save=False)
+        raise
+    return post
+
+
+def update_post(post, **fields):
+    with transaction.atomic():
+        for name, value in fields.items():
+            setattr(post, name, value)
+        post.save()
+        record_change(Change.POST, post.pk, post.pk)
+    return post
+
+
+def delete_post(post):
+    """Soft-delete (likes, comments and media files are reaped in the background)"""
+    with transaction.atomic():
+        post.soft_delete()
+        User.objects.filter(pk=post.author_id, posts_count__gt=0).update(posts_count=F("posts_count") - 1)
+        record_change(Change.POST, post.pk, post.pk, deleted=True)
+        transaction.on_commit(lambda: invalidate_profile(post.author_id))
+        transaction.on_commit(lambda: live.publish_post_deleted(post.pk))
+
+
+def add_comment(post, author, content, parent_comment=None):
+    """Comment (with its materialized path) + post version bump in one transaction"""
+    with transaction.atomic():
+        comment = Comment.objects.create(
+            author=author, post=post, parent_comment=parent_comment, content=content
+        )
+        Post.touch(post.pk)
+        record_event(EngagementEvent.COMMENT, post.pk, post.author_id, author.pk)
+        record_change(Change.COMMENT, comment.pk, post.pk)
+        transaction.on_commit(lambda: live.publish_comment(comment))
+    return comment
+
+
+def delete_comment(comment):
+    """The whole reply subtree is one range on (post, path); raw-delete it deepest-first"""
+    with transaction.atomic():
+        subtree = Comment.all_objects.filter(subtree_q(comment.path, post_id=comment.post_id, include_self=True))
+        ids = list(subtree.values_list("pk", flat=True))
+        delete_comments(ids)
+        Post.touch(comment.post_id)
+        record_changes(Change.COMMENT, [(pk, comment.post_id) for pk in ids], deleted=True)
+
+
+def _create_like(model, **fields):
+    """Insert a like in a savepoint; False if a concurrent request already created it"""
+    try:
+        with transaction.atomic():
+            model.objects.create(**fields)
+    except IntegrityError:
+        return False
+    return True
+
+
+# Likes don't touch the post row (a hot post would serialize its likers on
+# it): their change-log row is what moves the post's ETag (posts/conditional.py).
+
+def toggle_post_like(post, user):
+    """Like or unlike; returns True when the post is now liked"""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if not deleted and not _create_like(Like, user=user, post=post):
+            return True
+        queue_suggestions(user.pk)
+        kind = EngagementEvent.UNLIKE if deleted else EngagementEvent.LIKE
+        record_event(kind, post.pk, post.author_id, user.pk)
+        # The like count is part of the post's state
+        record_change(Change.POST, post.pk, post.pk)
+        transaction.on_commit(lambda: live.publish_likes(post.pk, -1 if deleted else 1))
+    return not deleted
+
+
+def toggle_comment_like(comment, user):
+    """Like or unlike a comment; returns True when it is now liked"""
+    with transaction.atomic():
+        deleted, _ = CommentLike.objects.filter(user=user, comment=comment).delete()
+        if not deleted and not _create_like(CommentLike, user=user, comment=comment):
+            return True
+        record_change(Change.COMMENT, comment.pk, comment.post_id)
+    return not deleted
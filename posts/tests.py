@@ -1,3 +1,459 @@
-from django.test import TestCase
+import asyncio
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from analytics.models import EngagementEvent
+from project.throttling import LoginRateThrottle
+from social.models import Block, Follow, Suggestion, SuggestionQueue
+from sync.models import Change
+from . import live, services
+from .async_views import _live_events
+from .live import InProcessBroker, coalesce, post_channel
+from .models import Post, PostMedia, Comment, Like, CommentLike
+from .reaper import reap_deleted
+from .threads import MAX_DEPTH, path_segment
+from .video import VideoProcessingError, probe, process_video
+from .views import PostDetailView
+
+
+def make_user(username):
+    return User.objects.create_user(username=username, password="pw12345!xZ", email=f"{username}@example.com")
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class PostTestCase(TestCase):
+    def setUp(self):
+        # Throttle buckets and visibility sets live in the (per-process) cache
+        cache.clear()
+        self.author = make_user("author")
+        self.reader = make_user("reader")
+        self.post = services.create_post(self.author, caption="hello")
+        self.client = client_for(self.reader)
+
+    def comment(self, content, parent=None, author=None):
+        return services.add_comment(self.post, author or self.reader, content, parent_comment=parent)
+
+
+# ------------------------------------------------------------
+# Materialized-path threads
+# ------------------------------------------------------------
+class CommentThreadTests(PostTestCase):
+    def test_path_and_depth_are_set_on_insert(self):
+        root = self.comment("root")
+        reply = self.comment("reply", parent=root)
+        nested = self.comment("nested", parent=reply)
+
+        nested.refresh_from_db()
+        self.assertEqual(root.path, path_segment(root.pk))
+        self.assertEqual(nested.path, path_segment(root.pk) + path_segment(reply.pk) + path_segment(nested.pk))
+        self.assertEqual([root.depth, reply.depth, nested.depth], [0, 1, 2])
+
+    def test_replies_come_back_in_thread_order(self):
+        root = self.comment("root")
+        first = self.comment("first", parent=root)
+        second = self.comment("second", parent=root)
+        first_child = self.comment("first child", parent=first)
+        other_root = self.comment("other root")
+        self.comment("elsewhere", parent=other_root)
+
+        response = self.client.get(f"/api/posts/comments/{root.pk}/replies/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["id"] for c in response.json()["results"]], [first.pk, first_child.pk, second.pk])
+        self.assertEqual([c["depth"] for c in response.json()["results"]], [1, 2, 1])
+
+        response = self.client.get(f"/api/posts/comments/{root.pk}/replies/?max_depth=1")
+        self.assertEqual([c["id"] for c in response.json()["results"]], [first.pk, second.pk])
+
+    def test_comment_list_nests_replies_without_a_query_per_level(self):
+        def thread(levels):
+            parent = self.comment("root")
+            for _ in range(levels):
+                parent = self.comment("reply", parent=parent)
+
+        url = f"/api/posts/{self.post.pk}/comments/"
+        thread(2)
+        self.client.get(url)  # warm the viewer's visibility sets
+        with CaptureQueriesContext(connection) as shallow:
+            self.client.get(url)
+        thread(8)
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(url)
+
+        self.assertEqual(len(deep), len(shallow))
+        node, depth = response.json()["results"][-1], 0
+        while node["replies"]:
+            node, depth = node["replies"][0], depth + 1
+        self.assertEqual(depth, 8)
+
+    def test_replies_deeper_than_max_depth_are_rejected(self):
+        parent = self.comment("root")
+        for _ in range(MAX_DEPTH - 1):
+            parent = self.comment("reply", parent=parent)
+        self.assertEqual(parent.depth, MAX_DEPTH - 1)
+
+        response = self.client.post(
+            f"/api/posts/{self.post.pk}/comment/", {"content": "too deep", "parent_comment": parent.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("parent_comment", response.json())
+
+
+# ------------------------------------------------------------
+# Conditional GET
+# ------------------------------------------------------------
+class ConditionalGetTests(PostTestCase):
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(f"/api/posts/{self.post.pk}/")["ETag"]
+        response = self.client.get(f"/api/posts/{self.post.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_invalidate_the_etag(self):
+        url = f"/api/posts/{self.post.pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        self.comment("new comment")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        services.toggle_post_like(self.post, self.reader)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        comments_url = f"/api/posts/{self.post.pk}/comments/"
+        etag = self.client.get(comments_url)["ETag"]
+        services.toggle_comment_like(Comment.objects.get(post=self.post), self.author)
+        self.assertEqual(self.client.get(comments_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_commenter_profile_edit_invalidates_the_etag(self):
+        self.comment("hi")
+        for url in (f"/api/posts/{self.post.pk}/", f"/api/posts/{self.post.pk}/comments/"):
+            etag = self.client.get(url)["ETag"]
+            User.objects.filter(pk=self.reader.pk).update(updated_at=F("updated_at") + timedelta(seconds=1))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200, url)
+
+    def test_blocking_a_commenter_is_not_answered_from_cache(self):
+        commenter = make_user("commenter")
+        self.comment("hi", author=commenter)
+        url = f"/api/posts/{self.post.pk}/comments/"
+        first = self.client.get(url)
+        self.assertNotIn("Last-Modified", first)
+
+        self.assertEqual(self.client.post(f"/api/users/{commenter.pk}/block/").status_code, 201)
+        # A fresh user object, as on a real request (visibility sets are memoized on it)
+        self.client = client_for(User.objects.get(pk=self.reader.pk))
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=first["ETag"], HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [])
+        # If-Modified-Since alone is not a validator for these endpoints
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT").status_code, 200
+        )
+
+    def test_query_string_is_part_of_the_etag(self):
+        full = self.client.get(f"/api/posts/{self.post.pk}/")["ETag"]
+        sparse = self.client.get(f"/api/posts/{self.post.pk}/?fields=id")["ETag"]
+        self.assertNotEqual(full, sparse)
+
+
+# ------------------------------------------------------------
+# Likes
+# ------------------------------------------------------------
+class LikeToggleTests(PostTestCase):
+    def test_toggle_likes_and_unlikes(self):
+        url = f"/api/posts/{self.post.pk}/like/"
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertFalse(Like.objects.exists())
+
+        comment = self.comment("hi")
+        self.assertTrue(services.toggle_comment_like(comment, self.author))
+        self.assertFalse(services.toggle_comment_like(comment, self.author))
+
+    def test_losing_the_insert_race_counts_as_already_liked(self):
+        services.toggle_post_like(self.post, self.author)
+        comment = self.comment("hi")
+        services.toggle_comment_like(comment, self.author)
+        events, changes = EngagementEvent.objects.count(), Change.objects.count()
+
+        # Both requests saw no like and tried to insert one: the second hits the unique constraint
+        with mock.patch.object(Like.objects, "filter", return_value=Like.objects.none()):
+            self.assertTrue(services.toggle_post_like(self.post, self.author))
+        with mock.patch.object(CommentLike.objects, "filter", return_value=CommentLike.objects.none()):
+            self.assertTrue(services.toggle_comment_like(comment, self.author))
+
+        self.assertEqual((Like.objects.count(), CommentLike.objects.count()), (1, 1))
+        self.assertEqual((EngagementEvent.objects.count(), Change.objects.count()), (events, changes))
+
+    def test_likes_leave_the_post_row_alone(self):
+        post = Post.objects.get(pk=self.post.pk)
+        services.toggle_post_like(self.post, self.reader)
+        services.toggle_comment_like(self.comment("hi"), self.reader)
+        # The comment bumped the version once; the likes did not
+        self.assertEqual(Post.objects.get(pk=self.post.pk).version, post.version + 1)
+
+
+# ------------------------------------------------------------
+# Soft delete and the reaper
+# ------------------------------------------------------------
+class SoftDeleteTests(PostTestCase):
+    def test_deleted_post_is_hidden_until_reaped(self):
+        root = self.comment("root")
+        reply = self.comment("reply", parent=root, author=self.author)
+        services.toggle_post_like(self.post, self.reader)
+        services.toggle_comment_like(reply, self.reader)
+
+        response = client_for(self.author).delete(f"/api/posts/{self.post.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(f"/api/posts/{self.post.pk}/").status_code, 404)
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(User.objects.get(pk=self.author.pk).posts_count, 0)
+
+        # Still inside the grace period
+        self.assertEqual(reap_deleted(), (0, 0))
+        self.assertEqual(reap_deleted(grace=timedelta(0)), (1, 0))
+        self.assertFalse(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.all_objects.filter(post_id=self.post.pk).exists())
+        self.assertFalse(Like.objects.filter(post_id=self.post.pk).exists())
+        self.assertFalse(CommentLike.objects.exists())
+
+    def test_reaping_an_account_removes_its_threads_and_engagement(self):
+        other_post = services.create_post(self.author, caption="other")
+        root = self.comment("reader's comment")
+        answer = self.comment("answer", parent=root, author=self.author)
+        kept = self.comment("author's comment", author=self.author)
+        services.toggle_post_like(other_post, self.reader)
+        services.toggle_comment_like(kept, self.reader)
+
+        self.assertEqual(self.client.delete("/api/accounts/profile/").status_code, 204)
+        self.assertEqual(reap_deleted(grace=timedelta(0)), (0, 1))
+
+        self.assertFalse(User.objects.filter(pk=self.reader.pk).exists())
+        # Replies by others go with the thread they answered
+        self.assertFalse(Comment.all_objects.filter(pk__in=[root.pk, answer.pk]).exists())
+        self.assertTrue(Comment.all_objects.filter(pk=kept.pk).exists())
+        self.assertFalse(Like.objects.filter(user_id=self.reader.pk).exists())
+        self.assertFalse(CommentLike.objects.exists())
+        self.assertTrue(Post.objects.filter(pk=other_post.pk).exists())
+
+    def test_reaping_an_account_removes_its_social_rows(self):
+        private = make_user("private")
+        User.objects.filter(pk=private.pk).update(is_private=True)
+        Follow.objects.create(follower=self.reader, following=private, accepted=False)
+        Block.objects.create(blocker=self.author, blocked=self.reader)
+        Block.objects.create(blocker=self.reader, blocked=private)
+        now = timezone.now()
+        Suggestion.objects.create(user=self.reader, candidate=private, rank=0, score=1.0, computed_at=now)
+        Suggestion.objects.create(user=self.author, candidate=self.reader, rank=0, score=1.0, computed_at=now)
+        SuggestionQueue.objects.create(user=self.reader, queued_at=now)
+
+        self.assertEqual(self.client.delete("/api/accounts/profile/").status_code, 204)
+        self.assertEqual(reap_deleted(grace=timedelta(0)), (0, 1))
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Block.objects.exists())
+        self.assertFalse(Suggestion.objects.exists())
+        self.assertFalse(SuggestionQueue.objects.exists())
+
+
+# ------------------------------------------------------------
+# Async read views
+# ------------------------------------------------------------
+class AsyncViewTests(TransactionTestCase):
+    """The async views query from their own pool threads, so the data must be committed"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = make_user("author")
+        self.reader = make_user("reader")
+        self.post = services.create_post(self.author, caption="hello")
+        services.create_post(self.reader, caption="second")
+        root = services.add_comment(self.post, self.reader, "root")
+        services.add_comment(self.post, self.author, "reply", parent_comment=root)
+        services.toggle_post_like(self.post, self.reader)
+        self.sync = client_for(self.reader)
+        self.async_client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.reader)}")
+
+    def pair(self, suffix):
+        sync = self.sync.get(f"/api/posts/{suffix}")
+        response = self.async_client.get(f"/api/posts/async/{suffix}")
+        self.assertEqual((response.status_code, sync.status_code), (200, 200), suffix)
+        return sync, response
+
+    def test_payloads_match_the_sync_views(self):
+        for suffix in (
+            "",
+            "?fields=id,caption&page_size=1",
+            "?expand=comments",
+            f"user/{self.author.pk}/",
+            f"{self.post.pk}/",
+            f"{self.post.pk}/?fields=likes_count,comments",
+            f"{self.post.pk}/comments/",
+            f"{self.post.pk}/comments/?fields=id,replies",
+        ):
+            sync, response = self.pair(suffix)
+            # Page links point back at the async route
+            self.assertEqual(json.loads(response.content.replace(b"/async/", b"/")), sync.json(), suffix)
+
+    def test_etags_match_and_answer_not_modified(self):
+        for suffix in (f"{self.post.pk}/", f"{self.post.pk}/comments/"):
+            sync, response = self.pair(suffix)
+            self.assertEqual(response["ETag"], sync["ETag"])
+            response = self.async_client.get(f"/api/posts/async/{suffix}", HTTP_IF_NONE_MATCH=sync["ETag"])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], sync["ETag"])
+
+    def test_sync_view_throttles_apply(self):
+        url = f"/api/posts/async/{self.post.pk}/"
+        with mock.patch.object(PostDetailView, "throttle_classes", [LoginRateThrottle]):
+            statuses = [self.async_client.get(url).status_code for _ in range(11)]
+            self.assertEqual(statuses, [200] * 10 + [429])
+            self.assertGreater(int(self.async_client.get(url)["Retry-After"]), 0)
+
+
+
+# ------------------------------------------------------------
+# Video pipeline (posts/video.py), with ffmpeg/ffprobe mocked out
+# ------------------------------------------------------------
+def ffprobe_output(format_name, width=1920, height=1080):
+    return json.dumps({
+        "format": {"format_name": format_name, "duration": "12.5"},
+        "streams": [{"codec_type": "video", "width": width, "height": height, "avg_frame_rate": "30/1"}],
+    })
+
+
+class VideoPipelineTests(PostTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def input_options(self, args):
+        """The options between the binary's flags and the input (-i, or ffprobe's trailing path)"""
+        end = args.index("-i") if "-i" in args else len(args) - 1
+        return args[:end]
+
+    def test_probe_only_reads_local_files_with_allowed_demuxers(self):
+        with mock.patch("posts.video._run", return_value=ffprobe_output("mov,mp4,m4a,3gp,3g2,mj2")) as run:
+            self.assertEqual(probe("/tmp/source.mp4"), (12.5, 1920, 1080, 30.0, "mov"))
+        options = self.input_options(list(run.call_args.args))
+        self.assertIn(("-protocol_whitelist", "file"), list(zip(options, options[1:])))
+        self.assertIn(("-format_whitelist", "mov,matroska,avi"), list(zip(options, options[1:])))
+
+    def test_playlists_and_other_containers_are_refused(self):
+        for format_name in ("hls", "concat", "image2"):
+            with mock.patch("posts.video._run", return_value=ffprobe_output(format_name)):
+                with self.assertRaisesMessage(VideoProcessingError, "unsupported container"):
+                    probe("/tmp/source.mp4")
+
+    def test_ffmpeg_is_pinned_to_the_probed_demuxer(self):
+        media = PostMedia.objects.create(
+            post=self.post, type=PostMedia.VIDEO, status=PostMedia.PENDING,
+            file=ContentFile(b"not really a video", name="clip.webm"),
+        )
+        calls = []
+
+        def run(*args):
+            calls.append(list(args))
+            return ffprobe_output("matroska,webm", width=640, height=360) if len(calls) == 1 else ""
+
+        with mock.patch("posts.video._run", side_effect=run):
+            self.assertTrue(process_video(media.pk))
+        self.assertEqual(len(calls), 3)  # probe, poster, one 360p rendition
+        for args in calls[1:]:
+            options = self.input_options(args)
+            pairs = list(zip(options, options[1:]))
+            self.assertIn(("-protocol_whitelist", "file"), pairs)
+            self.assertIn(("-f", "matroska"), pairs)
+        media.refresh_from_db()
+        self.assertEqual((media.status, media.width, media.height), (PostMedia.READY, 640, 360))
+
+# ------------------------------------------------------------
+# Live updates (posts/live.py, posts/async_views.py: post_live_stream)
+# ------------------------------------------------------------
+def comment_event(post_id, author_id):
+    return {"type": "comment", "post": post_id, "comment": {"author": {"id": author_id}}}
+
+
+class CoalesceTests(TestCase):
+    def test_like_deltas_are_summed_and_cancelled_ones_dropped(self):
+        events = [{"type": "likes", "post": p, "delta": d} for p, d in ((1, 1), (2, 1), (1, 1), (2, -1), (1, -1))]
+        self.assertEqual(coalesce(events), [{"type": "likes", "post": 1, "delta": 1}])
+
+    def test_busy_posts_send_a_comment_count(self):
+        events = [comment_event(1, 7) for _ in range(3)] + [comment_event(2, 7)]
+        self.assertEqual(coalesce(events, comments_per_post=2), [
+            {"type": "comments", "post": 1, "count": 3},
+            comment_event(2, 7),
+        ])
+
+    def test_deletion_supersedes_the_posts_other_events(self):
+        events = [{"type": "likes", "post": 1, "delta": 2}, comment_event(1, 7), {"type": "deleted", "post": 1}]
+        self.assertEqual(coalesce(events), [{"type": "deleted", "post": 1}])
+
+
+@override_settings(LIVE_COALESCE_SECONDS=0)
+class LiveStreamTests(TransactionTestCase):
+    """The stream rechecks visibility from a pool thread, so the data must be committed"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = make_user("author")
+        self.reader = make_user("reader")
+        self.post = services.create_post(self.author, caption="hello")
+        self.broker = InProcessBroker()
+        patcher = mock.patch.object(live, "_broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def publish_like(self):
+        self.broker.publish(post_channel(self.post.pk), {"type": "likes", "post": self.post.pk, "delta": 1})
+
+    async def test_closed_streams_leave_no_subscription(self):
+        # Never started: the client went away before the body was sent
+        await _live_events(self.reader, [self.post.pk]).aclose()
+        self.assertEqual(self.broker._channels, {})
+
+        stream = _live_events(self.reader, [self.post.pk])
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        self.assertIn(post_channel(self.post.pk), self.broker._channels)
+        await stream.aclose()
+        self.assertEqual(self.broker._channels, {})
+
+    async def test_events_stop_once_the_viewer_is_blocked(self):
+        stream = _live_events(await User.objects.aget(pk=self.reader.pk), [self.post.pk])
+        await anext(stream)
+        self.publish_like()
+        self.assertIn(b"event: likes", await asyncio.wait_for(anext(stream), timeout=5))
+
+        response = await sync_to_async(client_for(self.author).post)(f"/api/users/{self.reader.pk}/block/")
+        self.assertEqual(response.status_code, 201)
+        self.publish_like()
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertEqual(self.broker._channels, {})
@@ -0,0 +1,87 @@
+from django.db.models import Q
+
+
+# ------------------------------------------------------------
+# Materialized paths for comment threads
+# ------------------------------------------------------------
+# Every comment stores the ids of its ancestors and itself as fixed-width
+# segments, e.g. "0000000012/0000000047/". Sorting by path gives threads in
+# display order (depth-first, siblings oldest first), and a comment's whole
+# subtree is the contiguous index range [path, path + PATH_END).
+
+PATH_WIDTH = 10
+PATH_END = "~"  # sorts after digits and "/"
+MAX_DEPTH = 20  # 20 * 11 chars fits Comment.path (max_length=255)
+# Subtree ranges OR-ed into one query (SQLite caps expression depth at 1000)
+RANGES_PER_QUERY = 100
+
+
+def path_segment(pk):
+    return f"{pk:0{PATH_WIDTH}d}/"
+
+
+def subtree_q(path, post_id=None, include_self=False, max_depth=None):
+    """
+    Range filter for the comments below `path` (one index range on (post, path)).
+    `max_depth` is an absolute Comment.depth bound.
+    """
+    q = Q(path__gte=path) if include_self else Q(path__gt=path)
+    q &= Q(path__lt=path + PATH_END)
+    if post_id is not None:
+        q &= Q(post_id=post_id)
+    if max_depth is not None:
+        q &= Q(depth__lte=max_depth)
+    return q
+
+
+def threads_q(roots, max_depth=None):
+    """OR of the subtree ranges of several comments: all their replies in one query"""
+    q = Q(pk__in=[])
+    for root in roots:
+        limit = root.depth + max_depth if max_depth is not None else None
+        q |= subtree_q(root.path, post_id=root.post_id, max_depth=limit)
+    return q
+
+
+def _link(roots, replies):
+    """Hang `replies` (in path order) under their parents as `reply_list`"""
+    nodes = {}
+    for root in roots:
+        root.reply_list = []
+        nodes[root.pk] = root
+    for comment in replies:
+        parent = nodes.get(comment.parent_comment_id)
+        if parent is None:
+            continue
+        comment.reply_list = []
+        nodes[comment.pk] = comment
+        parent.reply_list.append(comment)
+
+
+def attach_replies(roots, queryset, max_depth=None):
+    """
+    Load every reply below `roots` with range queries (one per
+    RANGES_PER_QUERY roots, however deep the threads go) and set
+    `reply_list` on each comment in display order.
+
+    Replies whose parent is not visible through `queryset` are dropped with
+    their subtree, the same as walking the adjacency list would.
+    """
+    roots = [root for root in roots if not hasattr(root, "reply_list")]
+    replies = []
+    for i in range(0, len(roots), RANGES_PER_QUERY):
+        chunk = roots[i:i + RANGES_PER_QUERY]
+        replies.extend(queryset.filter(threads_q(chunk, max_depth)).order_by("path"))
+    _link(roots, sorted(replies, key=lambda c: c.path))
+
+
+def attach_post_replies(posts, roots, queryset):
+    """
+    Same as attach_replies() when `roots` are all top-level comments of
+    `posts`: a single (post, path) index scan however many threads there are.
+    """
+    roots = [root for root in roots if not hasattr(root, "reply_list")]
+    if not roots:
+        return
+    replies = queryset.filter(post_id__in=[post.pk for post in posts], depth__gt=0).order_by("path")
+    _link(roots, replies)
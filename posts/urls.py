@@ -1,9 +1,10 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path("comments/<int:pk>/", views.CommentDeleteView.as_view(), name="delete-comment"),
     path("comments/<int:pk>/like/", views.CommentLikeToggleView.as_view(), name="like-comment"),
+    path("comments/<int:pk>/replies/", views.CommentRepliesView.as_view(), name="comment-replies"),
 
     # 📸 Posts
     path("", views.PostListCreateView.as_view(), name="post-list-create"),
@@ -12,4 +13,11 @@ urlpatterns = [
     path("<int:pk>/like/", views.PostLikeToggleView.as_view(), name="post-like"),
     path("<int:pk>/comment/", views.CommentCreateView.as_view(), name="add-comment"),
     path("<int:pk>/comments/", views.CommentListView.as_view(), name="list-comments"),
+
+    # ⚡ Async read variants (serve through project/asgi.py)
+    path("async/", async_views.post_list_async, name="post-list-async"),
+    path("async/<int:pk>/", async_views.post_detail_async, name="post-detail-async"),
+    path("async/user/<int:user_id>/", async_views.user_posts_async, name="user-posts-async"),
+    path("async/<int:pk>/comments/", async_views.comment_list_async, name="list-comments-async"),
+    path("live/", async_views.post_live_stream, name="post-live"),
 ]
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+
+from social.profile import invalidate_profile
+from .models import Post, PostMedia
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Video pipeline
+# ------------------------------------------------------------
+# Uploaded videos are stored as-is with status "pending", then processed
+# off the request thread with the local ffmpeg/ffprobe binaries:
+#   probe     -> duration, dimensions and frame rate (uploads without a video
+#                stream fail)
+#   poster    -> one JPEG frame, used as the preview in feeds and grids
+#   renditions-> HLS variants per VIDEO_RENDITIONS rung at or below the
+#                source's short side, plus a master playlist for adaptive streaming
+# Outputs live under video_dir(media.pk) and are recorded on the PostMedia row.
+#
+# Uploads are untrusted: every call reads the source only through the file
+# protocol, ffprobe may only pick a demuxer from VIDEO_INPUT_FORMATS, and
+# ffmpeg is then pinned (-f) to the demuxer the probe found. A playlist or
+# concat list renamed to .mp4 can't make ffmpeg open other files or URLs.
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".m4v", ".webm", ".mkv", ".avi"}
+
+
+class VideoProcessingError(Exception):
+    pass
+
+
+def is_video(upload):
+    content_type = getattr(upload, "content_type", "") or ""
+    return content_type.startswith("video/") or os.path.splitext(upload.name)[1].lower() in VIDEO_EXTENSIONS
+
+
+def video_dir(media_id):
+    return f"uploads/posts/video/{media_id}"
+
+
+def _run(*args):
+    try:
+        result = subprocess.run(
+            args, capture_output=True, text=True, check=True,
+            timeout=_setting("VIDEO_PROCESS_TIMEOUT", 600),
+        )
+    except FileNotFoundError:
+        raise VideoProcessingError(f"{args[0]} not found (set FFMPEG_BINARY / FFPROBE_BINARY)")
+    except subprocess.CalledProcessError as e:
+        raise VideoProcessingError(e.stderr.strip().splitlines()[-1] if e.stderr.strip() else str(e))
+    except subprocess.TimeoutExpired:
+        raise VideoProcessingError(f"{args[0]} timed out")
+    return result.stdout
+
+
+def _input_options(input_format=None):
+    """Options placed before -i / the probed path: local file only, known demuxers only"""
+    if input_format is None:
+        formats = ",".join(_setting("VIDEO_INPUT_FORMATS", ("mov", "matroska", "avi")))
+        return ("-protocol_whitelist", "file", "-format_whitelist", formats)
+    return ("-protocol_whitelist", "file", "-f", input_format)
+
+
+def _demuxer(format_name):
+    """ffprobe's "mov,mp4,m4a,3gp,3g2,mj2" -> "mov", if that demuxer is allowed"""
+    allowed = _setting("VIDEO_INPUT_FORMATS", ("mov", "matroska", "avi"))
+    demuxer = next((name for name in (format_name or "").split(",") if name in allowed), None)
+    if demuxer is None:
+        raise VideoProcessingError(f"unsupported container {format_name!r}")
+    return demuxer
+
+
+def _frame_rate(value):
+    """ffprobe's "30000/1001" -> 29.97; None for "0/0" or missing"""
+    num, _, den = (value or "").partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def probe(path):
+    """(duration seconds, width, height, frames per second, demuxer) of the first video stream"""
+    output = _run(
+        _setting("FFPROBE_BINARY", "ffprobe"), "-v", "error", *_input_options(), "-print_format", "json",
+        "-show_streams", "-show_format", path,
+    )
+    info = json.loads(output)
+    input_format = _demuxer(info.get("format", {}).get("format_name"))
+    stream = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), None)
+    if stream is None:
+        raise VideoProcessingError("no video stream")
+    duration = float(info.get("format", {}).get("duration") or stream.get("duration") or 0)
+    width, height = int(stream["width"]), int(stream["height"])
+    # Phone footage is often stored landscape with a rotation flag
+    rotation = int(stream.get("tags", {}).get("rotate", 0) or 0)
+    if rotation % 180:
+        width, height = height, width
+    # avg_frame_rate is the real rate of variable-rate phone footage; r_frame_rate the container's guess
+    fps = _frame_rate(stream.get("avg_frame_rate")) or _frame_rate(stream.get("r_frame_rate")) or 30.0
+    return duration, width, height, fps, input_format
+
+
+def extract_poster(source, target, duration, input_format):
+    ffmpeg = _setting("FFMPEG_BINARY", "ffmpeg")
+    offset = min(1.0, duration / 2)
+    _run(
+        ffmpeg, "-v", "error", "-y", "-ss", f"{offset:.2f}", *_input_options(input_format), "-i", source,
+        "-frames:v", "1", "-vf", f"scale='min({_setting('VIDEO_POSTER_WIDTH', 720)},iw)':-2",
+        "-q:v", "3", target,
+    )
+
+
+def encode_renditions(source, workdir, width, height, fps, input_format):
+    """
+    HLS variants for each rung <= the source's short side (at least the
+    lowest rung, so portrait 1080x1920 gets "1080p" at 1080 wide); returns
+    the rendition list and the master playlist file name. Keyframes fall
+    every VIDEO_SEGMENT_SECONDS at the source's frame rate, so segments can
+    be cut on them.
+    """
+    ffmpeg = _setting("FFMPEG_BINARY", "ffmpeg")
+    ladder = _setting("VIDEO_RENDITIONS", [(360, 800), (720, 2500), (1080, 5000)])
+    portrait = height > width
+    rungs = [(h, kbps) for h, kbps in ladder if h <= min(width, height)] or [min(ladder)]
+    segment = str(_setting("VIDEO_SEGMENT_SECONDS", 4))
+    gop = max(1, round(float(segment) * fps))
+
+    renditions = []
+    master = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for rung, kbps in rungs:
+        playlist = f"{rung}p.m3u8"
+        if portrait:
+            rung_width, rung_height = rung, round(height * rung / width / 2) * 2
+        else:
+            rung_width, rung_height = round(width * rung / height / 2) * 2, rung
+        _run(
+            ffmpeg, "-v", "error", "-y", *_input_options(input_format), "-i", source,
+            "-vf", f"scale={rung_width}:{rung_height}",
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+            "-b:v", f"{kbps}k", "-maxrate", f"{kbps * 107 // 100}k", "-bufsize", f"{kbps * 2}k",
+            "-g", str(gop), "-sc_threshold", "0",
+            "-c:a", "aac", "-b:a", "128k", "-ac", "2",
+            "-hls_time", segment, "-hls_playlist_type", "vod",
+            "-hls_segment_filename", os.path.join(workdir, f"{rung}p_%03d.ts"),
+            os.path.join(workdir, playlist),
+        )
+        bandwidth = (kbps + 128) * 1000
+        master.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={rung_width}x{rung_height}")
+        master.append(playlist)
+        renditions.append({"height": rung_height, "width": rung_width, "bitrate": bandwidth, "playlist": playlist})
+
+    with open(os.path.join(workdir, "master.m3u8"), "w") as f:
+        f.write("\n".join(master) + "\n")
+    return renditions, "master.m3u8"
+
+
+def process_video(media_id):
+    """Probe, poster and transcode one PostMedia video; returns True when it's ready"""
+    updated = PostMedia.objects.filter(
+        pk=media_id, type=PostMedia.VIDEO, status__in=[PostMedia.PENDING, PostMedia.FAILED]
+    ).update(status=PostMedia.PROCESSING)
+    if not updated:
+        return False  # already done, or picked up by another worker
+    media = PostMedia.objects.select_related("post").get(pk=media_id)
+    storage = media.file.storage
+    directory = video_dir(media.pk)
+    workdir = tempfile.mkdtemp(prefix="video-")
+    try:
+        # ffmpeg needs a local path; storage may be remote
+        source = os.path.join(workdir, "source" + os.path.splitext(media.file.name)[1])
+        with media.file.open("rb") as src, open(source, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+        duration, width, height, fps, input_format = probe(source)
+        if duration > _setting("VIDEO_MAX_SECONDS", 600):
+            raise VideoProcessingError(f"longer than {_setting('VIDEO_MAX_SECONDS', 600)}s")
+        outputs = os.path.join(workdir, "out")
+        os.mkdir(outputs)
+        extract_poster(source, os.path.join(outputs, "poster.jpg"), duration, input_format)
+        renditions, master = encode_renditions(source, outputs, width, height, fps, input_format)
+
+        # Playlists reference segments by relative name, so keep names as-is
+        delete_video_outputs(media.pk)
+        for filename in sorted(os.listdir(outputs)):
+            with open(os.path.join(outputs, filename), "rb") as f:
+                storage.save(f"{directory}/{filename}", File(f))
+        for rendition in renditions:
+            rendition["url"] = storage.url(f"{directory}/{rendition['playlist']}")
+
+        with transaction.atomic():
+            PostMedia.objects.filter(pk=media.pk).update(
+                status=PostMedia.READY, error="",
+                duration=duration, width=width, height=height,
+                poster=f"{directory}/poster.jpg", stream=f"{directory}/{master}",
+                renditions=renditions,
+            )
+            Post.touch(media.post_id)
+            # Profile grids show the poster
+            transaction.on_commit(lambda: invalidate_profile(media.post.author_id))
+        return True
+    except Exception as e:
+        PostMedia.objects.filter(pk=media.pk).update(status=PostMedia.FAILED, error=str(e)[:255])
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def delete_video_outputs(media_id):
+    storage = PostMedia._meta.get_field("file").storage
+    directory = video_dir(media_id)
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        storage.delete(f"{directory}/{filename}")
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_setting("VIDEO_WORKERS", 1), thread_name_prefix="video")
+    return _executor
+
+
+def _process_logged(media_id):
+    try:
+        process_video(media_id)
+    except Exception:
+        # Left as "failed" with the error; `manage.py process_videos` retries
+        logger.exception("Video processing failed for media %s", media_id)
+
+
+def _process_in_background(media_id):
+    try:
+        _process_logged(media_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_videos(media_ids):
+    """Call inside the write that stored the uploads: processing starts once it commits"""
+    media_ids = list(media_ids)
+    if not media_ids:
+        return
+    if _setting("VIDEO_PROCESS_INLINE", False):
+        transaction.on_commit(lambda: [_process_logged(pk) for pk in media_ids])
+    else:
+        transaction.on_commit(lambda: [_get_executor().submit(_process_in_background, pk) for pk in media_ids])
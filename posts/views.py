@@ -1,11 +1,19 @@
 from rest_framework import generics, status, permissions, pagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db.models import Count, Prefetch
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 
-from .models import Post, Like, Comment, CommentLike
+from project.serializers import SparseFieldsMixin
+from project.throttling import LikeRateThrottle, CommentRateThrottle
+from .models import Post, Comment
 from .serializers import PostSerializer, CommentSerializer
 from .permissions import IsAuthorOrReadOnly, IsCommentOwnerOrPostOwner
+from .conditional import post_condition, comments_condition, post_validator
+from . import services
+from .threads import subtree_q
 
 
 # ------------------------------------------------------------
@@ -23,41 +31,101 @@ class CommentPagination(pagination.PageNumberPagination):
     max_page_size = 50
 
 
+# ------------------------------------------------------------
+# Sparse Fieldsets (?fields= / ?expand=)
+# ------------------------------------------------------------
+def shape_post_queryset(queryset, fields, viewer=None):
+    """
+    Only join/prefetch/annotate what the requested post fields need.
+    With a viewer, posts and comment previews they may not see are filtered out.
+    """
+    if viewer is not None:
+        queryset = queryset.visible_to(viewer)
+    # Meta.ordering is dropped from GROUP BY queries, so pin it explicitly
+    if not queryset.query.order_by:
+        queryset = queryset.order_by(*Post._meta.ordering)
+    if "author" in fields:
+        queryset = queryset.select_related("author")
+    if "media" in fields:
+        queryset = queryset.prefetch_related("media")
+    if "likes_count" in fields:
+        queryset = queryset.annotate(likes_total=Count("likes", distinct=True))
+    if "comments" in fields:
+        top_level = (
+            Comment.objects.filter(parent_comment__isnull=True)
+            .select_related("author")
+            .annotate(likes_total=Count("likes", distinct=True))
+        )
+        if viewer is not None:
+            top_level = top_level.visible_to(viewer)
+        queryset = queryset.prefetch_related(
+            Prefetch("comments", queryset=top_level, to_attr="top_level_comments")
+        )
+    return queryset
+
+
+def shape_comment_queryset(queryset, fields, viewer=None):
+    """Only join/annotate what the requested comment fields need (hiding blocked authors for a viewer)"""
+    if viewer is not None:
+        queryset = queryset.visible_to(viewer)
+    if not queryset.query.order_by:
+        queryset = queryset.order_by(*Comment._meta.ordering)
+    if "author" in fields:
+        queryset = queryset.select_related("author")
+    if "likes_count" in fields:
+        queryset = queryset.annotate(likes_total=Count("likes", distinct=True))
+    return queryset
+
+
 # ------------------------------------------------------------
 # Post List & Create View (Authenticated only)
 # ------------------------------------------------------------
-class PostListCreateView(generics.ListCreateAPIView):
+class PostListCreateView(SparseFieldsMixin, generics.ListCreateAPIView):
     """
     GET  -> list all posts (authenticated only)
     POST -> create new post (authenticated only)
     """
-    queryset = Post.objects.all().select_related("author").prefetch_related("media", "likes", "comments")
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]  # 👈 changed here
     pagination_class = PostPagination
 
+    def get_queryset(self):
+        return shape_post_queryset(Post.objects.all(), self.requested_fields, self.request.user)
+
     def perform_create(self, serializer):
+        # Counters, analytics and cache invalidation happen inside services.create_post
         serializer.save(author=self.request.user)
 
 
 # ------------------------------------------------------------
 # Post Detail, Update, Delete
 # ------------------------------------------------------------
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET    -> retrieve post details
     PUT    -> update post (author only)
     DELETE -> delete post (author only)
     """
-    queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, IsAuthorOrReadOnly]  # 👈 changed here
 
+    def get_queryset(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return Post.objects.visible_to(self.request.user)
+        return shape_post_queryset(Post.objects.all(), self.requested_fields, self.request.user)
+
+    @method_decorator(post_condition)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        services.delete_post(instance)
+
 
 # ------------------------------------------------------------
 # Retrieve Posts by User
 # ------------------------------------------------------------
-class UserPostsView(generics.ListAPIView):
+class UserPostsView(SparseFieldsMixin, generics.ListAPIView):
     """
     GET -> list all posts by a specific user (authenticated only)
     """
@@ -67,11 +135,7 @@ class UserPostsView(generics.ListAPIView):
 
     def get_queryset(self):
         user_id = self.kwargs.get("user_id")
-        return (
-            Post.objects.filter(author_id=user_id)
-            .select_related("author")
-            .prefetch_related("media", "likes", "comments")
-        )
+        return shape_post_queryset(Post.objects.filter(author_id=user_id), self.requested_fields, self.request.user)
 
 
 # ------------------------------------------------------------
@@ -82,14 +146,11 @@ class PostLikeToggleView(APIView):
     POST -> toggle like/unlike a post
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [LikeRateThrottle]
 
     def post(self, request, pk):
-        post = get_object_or_404(Post, pk=pk)
-        user = request.user
-
-        like, created = Like.objects.get_or_create(user=user, post=post)
-        if not created:
-            like.delete()
+        post = get_object_or_404(Post.objects.visible_to(request.user), pk=pk)
+        if not services.toggle_post_like(post, request.user):
             return Response({"message": "Unliked post"}, status=status.HTTP_200_OK)
         return Response({"message": "Liked post"}, status=status.HTTP_201_CREATED)
 
@@ -102,9 +163,10 @@ class CommentCreateView(APIView):
     POST -> add comment or reply to a post
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [CommentRateThrottle]
 
     def post(self, request, pk):
-        post = get_object_or_404(Post, pk=pk)
+        post = get_object_or_404(Post.objects.visible_to(request.user), pk=pk)
         serializer = CommentSerializer(data=request.data, context={"request": request, "post": post})
         if serializer.is_valid():
             serializer.save()
@@ -115,7 +177,7 @@ class CommentCreateView(APIView):
 # ------------------------------------------------------------
 # List Comments for a Post (Authenticated only)
 # ------------------------------------------------------------
-class CommentListView(generics.ListAPIView):
+class CommentListView(SparseFieldsMixin, generics.ListAPIView):
     """
     GET -> list comments for a specific post (authenticated only)
     """
@@ -125,7 +187,15 @@ class CommentListView(generics.ListAPIView):
 
     def get_queryset(self):
         post_id = self.kwargs.get("pk")
-        return Comment.objects.filter(post_id=post_id, parent_comment__isnull=True).select_related("author")
+        # Same memoized lookup the ETag used: no extra query for the visibility check
+        if post_validator(self.request, post_id) is None:
+            raise Http404
+        queryset = Comment.objects.filter(post_id=post_id, parent_comment__isnull=True)
+        return shape_comment_queryset(queryset, self.requested_fields, self.request.user)
+
+    @method_decorator(comments_condition)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 # ------------------------------------------------------------
@@ -139,6 +209,45 @@ class CommentDeleteView(generics.DestroyAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsCommentOwnerOrPostOwner]  # 👈 changed here
 
+    def perform_destroy(self, instance):
+        services.delete_comment(instance)
+
+
+# ------------------------------------------------------------
+# Replies of a Comment (paginated, flattened thread)
+# ------------------------------------------------------------
+class CommentRepliesView(SparseFieldsMixin, generics.ListAPIView):
+    """
+    GET -> every reply below a comment in thread order, flattened (use `depth` to indent)
+           ?max_depth=N limits it to N levels below the comment
+    """
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentPagination
+
+    @property
+    def requested_fields(self):
+        # Each reply is its own row here, so nothing is nested
+        return super().requested_fields - {"replies"}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["expand"] = self.requested_fields, None
+        return context
+
+    def get_queryset(self):
+        root = get_object_or_404(
+            Comment.objects.visible_to(self.request.user).only("id", "post_id", "path", "depth"), pk=self.kwargs.get("pk")
+        )
+        if post_validator(self.request, root.post_id) is None:
+            raise Http404
+        try:
+            max_depth = root.depth + max(int(self.request.query_params["max_depth"]), 1)
+        except (KeyError, ValueError):
+            max_depth = None
+        queryset = Comment.objects.filter(subtree_q(root.path, post_id=root.post_id, max_depth=max_depth))
+        return shape_comment_queryset(queryset.order_by("path"), self.requested_fields, self.request.user)
+
 
 # ------------------------------------------------------------
 # Like & Unlike Comment
@@ -148,13 +257,12 @@ class CommentLikeToggleView(APIView):
     POST -> toggle like/unlike a comment
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [LikeRateThrottle]
 
     def post(self, request, pk):
-        comment = get_object_or_404(Comment, pk=pk)
-        user = request.user
-
-        like, created = CommentLike.objects.get_or_create(user=user, comment=comment)
-        if not created:
-            like.delete()
+        comment = get_object_or_404(Comment.objects.visible_to(request.user), pk=pk)
+        if post_validator(request, comment.post_id) is None:
+            raise Http404
+        if not services.toggle_comment_like(comment, request.user):
             return Response({"message": "Unliked comment"}, status=status.HTTP_200_OK)
         return Response({"message": "Liked comment"}, status=status.HTTP_201_CREATED)
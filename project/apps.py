@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    """Project-wide management commands (loadgen, build_schema); no models"""
+    name = 'project'
@@ -3,6 +3,12 @@ ASGI config for project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The async read views in posts/async_views.py (/api/posts/async/...) and the
+live update stream (/api/posts/live/, server-sent events) only avoid holding
+a thread per request/connection when served from here, e.g.:
+
+    uvicorn project.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,168 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import resolve, Resolver404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------
+# Batch settings
+# ------------------------------------------------------------
+MAX_BATCH_SIZE = 20
+MAX_PARALLEL_WORKERS = 4
+ALLOWED_PREFIXES = ("/api/posts/", "/api/accounts/")
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Sub-requests must not re-authenticate or touch these headers
+STRIPPED_META_KEYS = ("CONTENT_TYPE", "CONTENT_LENGTH", "QUERY_STRING", "wsgi.input")
+
+
+def _build_sub_request(request, method, path, body):
+    """Build a WSGI request for one sub-request, sharing the parent's auth context"""
+    parts = urlsplit(path)
+    payload = json.dumps(body).encode() if body is not None else b""
+
+    environ = {k: v for k, v in request.META.items() if k not in STRIPPED_META_KEYS}
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": parts.path,
+        "QUERY_STRING": parts.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "wsgi.input": BytesIO(payload),
+    })
+    sub_request = WSGIRequest(environ)
+
+    # DRF picks these up and skips JWT decoding + user lookup for the sub-request
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _dispatch(request, op):
+    """Run a single sub-request and return its status/body (errors stay within the item)"""
+    try:
+        match = resolve(urlsplit(op["path"]).path)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+    if iscoroutinefunction(match.func):
+        # Async (and streaming) views need an event loop of their own
+        return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Async views can't be batched."}}
+
+    sub_request = _build_sub_request(request, op["method"], op["path"], op.get("body"))
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", op["method"], op["path"])
+        return {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"detail": "Internal server error."}}
+    if response.streaming:
+        response.close()
+        return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Streaming responses can't be batched."}}
+
+    if hasattr(response, "data"):
+        body = response.data
+    else:
+        try:
+            body = json.loads(response.content) if response.content else None
+        except ValueError:
+            body = response.content.decode(errors="replace")
+    return {"status": response.status_code, "body": body}
+
+
+def _dispatch_in_thread(request, op):
+    """Worker entry point: every thread owns its own DB connection"""
+    try:
+        return _dispatch(request, op)
+    finally:
+        connections.close_all()
+
+
+def _parse_operations(raw_ops):
+    """Validate the sub-request list, returning (operations, errors)"""
+    if not isinstance(raw_ops, list) or not raw_ops:
+        return None, {"requests": "Must be a non-empty list."}
+    if len(raw_ops) > MAX_BATCH_SIZE:
+        return None, {"requests": f"At most {MAX_BATCH_SIZE} sub-requests are allowed."}
+
+    operations = []
+    for index, raw in enumerate(raw_ops):
+        if not isinstance(raw, dict) or not isinstance(raw.get("path"), str):
+            return None, {"requests": f"Sub-request {index} must be an object with a 'path'."}
+        method = str(raw.get("method", "GET")).upper()
+        path = raw["path"]
+        if not path.startswith(ALLOWED_PREFIXES):
+            return None, {"requests": f"Sub-request {index} targets an unsupported path."}
+        operations.append({"method": method, "path": path, "body": raw.get("body")})
+    return operations, None
+
+
+# ------------------------------------------------------------
+# Batch endpoint
+# ------------------------------------------------------------
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_view(request):
+    """
+    Run several posts/accounts API calls in one round-trip.
+
+    Body: {"requests": [{"method": "GET", "path": "/api/posts/1/"}, ...], "parallel": false}
+    Sub-requests run in order. Identical reads between two writes are executed
+    once and share the result; with "parallel": true those reads run on a small
+    thread pool.
+    """
+    operations, errors = _parse_operations(request.data.get("requests"))
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    results = [None] * len(operations)
+    parallel = bool(request.data.get("parallel"))
+    read_cache = {}
+    pending_reads = []
+
+    def flush_reads():
+        """Run the queued reads, dispatching each distinct (method, path) once"""
+        keys = []
+        for index in pending_reads:
+            key = (operations[index]["method"], operations[index]["path"])
+            if key not in read_cache and key not in keys:
+                keys.append(key)
+
+        if parallel and len(keys) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_WORKERS, len(keys))) as pool:
+                futures = {
+                    key: pool.submit(_dispatch_in_thread, request, {"method": key[0], "path": key[1]})
+                    for key in keys
+                }
+                for key, future in futures.items():
+                    read_cache[key] = future.result()
+        else:
+            for key in keys:
+                read_cache[key] = _dispatch(request, {"method": key[0], "path": key[1]})
+
+        for index in pending_reads:
+            results[index] = read_cache[(operations[index]["method"], operations[index]["path"])]
+        pending_reads.clear()
+
+    for index, op in enumerate(operations):
+        if op["method"] in READ_ONLY_METHODS:
+            pending_reads.append(index)
+            continue
+
+        # A write may change what later reads see, so reads are never merged across it
+        flush_reads()
+        read_cache.clear()
+        results[index] = _dispatch(request, op)
+    flush_reads()
+
+    return Response({"responses": results}, status=status.HTTP_200_OK)
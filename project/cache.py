@@ -0,0 +1,80 @@
+from django.core.cache.backends import locmem, redis
+
+from .metrics import CACHE_OPERATIONS
+
+_missing = object()
+
+
+# ------------------------------------------------------------
+# Cache backends that count their calls (cache_operations_total)
+# ------------------------------------------------------------
+# Same backends as Django's, named in CACHES['<alias>']['BACKEND']; the
+# `cache` label is CACHES['<alias>']['METRICS_NAME'] (default: "default").
+
+class MetricsCacheMixin:
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self.metrics_name = params.get("METRICS_NAME", "default")
+
+    def _count(self, operation, result, amount=1):
+        CACHE_OPERATIONS.inc(self.metrics_name, operation, result, amount=amount)
+
+    def _call(self, operation, method, *args, **kwargs):
+        try:
+            value = method(*args, **kwargs)
+        except Exception:
+            self._count(operation, "error")
+            raise
+        self._count(operation, "ok")
+        return value
+
+    def get(self, key, default=None, version=None):
+        try:
+            value = super().get(key, _missing, version=version)
+        except Exception:
+            self._count("get", "error")
+            raise
+        if value is _missing:
+            self._count("get", "miss")
+            return default
+        self._count("get", "hit")
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        try:
+            values = super().get_many(keys, version=version)
+        except Exception:
+            self._count("get", "error")
+            raise
+        if values:
+            self._count("get", "hit", len(values))
+        if len(keys) > len(values):
+            self._count("get", "miss", len(keys) - len(values))
+        return values
+
+    def set(self, *args, **kwargs):
+        return self._call("set", super().set, *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        return self._call("add", super().add, *args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self._call("set", super().set_many, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call("delete", super().delete, *args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self._call("delete", super().delete_many, *args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        return self._call("incr", super().incr, *args, **kwargs)
+
+
+class LocMemCache(MetricsCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(MetricsCacheMixin, redis.RedisCache):
+    pass
@@ -0,0 +1,29 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, any `extra`
+    fields and the formatted exception, if any. Loaded while settings are
+    configured, so it only uses the standard library.
+    """
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        # Anything else (e.g. the request django.request passes along) as str()
+        return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":"))
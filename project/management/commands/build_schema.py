@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project.schema import generate_schema, schema_dir, write_schema_artifact
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once (run on deploy) for /api/schema/, /api/docs/ and /api/redoc/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None, help="defaults to API_SCHEMA_DIR")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        directory = options["dir"] or schema_dir()
+        digest = write_schema_artifact(generate_schema(), directory)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote schema {digest} to {directory} in {time.perf_counter() - start:.2f}s"
+        ))
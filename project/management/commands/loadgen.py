@@ -0,0 +1,129 @@
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from posts.models import Post
+
+DEFAULT_MIX = "posts_list=30,post_detail=20,user_posts=10,comments=15,like=10,comment=5,profile=5,explore=5"
+
+
+class Command(BaseCommand):
+    help = "Replay a weighted request mix against a running API server with per-user JWT tokens"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+        parser.add_argument("--concurrency", type=int, default=16, help="parallel client threads")
+        parser.add_argument("--users", type=int, default=200, help="distinct users to issue tokens for")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="name=weight pairs, e.g. posts_list=50,like=50")
+        parser.add_argument("--timeout", type=float, default=10)
+
+    # ------------------------------------------------------------
+    # Request mix
+    # ------------------------------------------------------------
+    def build_request(self, name):
+        """Return (method, path, body) for one request of the given kind"""
+        post_id = random.choice(self.post_ids)
+        routes = {
+            "posts_list": ("GET", f"/api/posts/?page={random.randint(1, 5)}", None),
+            "post_detail": ("GET", f"/api/posts/{post_id}/", None),
+            "user_posts": ("GET", f"/api/posts/user/{random.choice(self.author_ids)}/", None),
+            "comments": ("GET", f"/api/posts/{post_id}/comments/", None),
+            "like": ("POST", f"/api/posts/{post_id}/like/", None),
+            "comment": ("POST", f"/api/posts/{post_id}/comment/", {"content": "load test comment"}),
+            "profile": ("GET", f"/api/users/{random.choice(self.author_ids)}/profile/", None),
+            "explore": ("GET", "/api/feeds/explore/", None),
+        }
+        if name not in routes:
+            raise CommandError(f"Unknown request kind '{name}'. Choose from: {', '.join(routes)}")
+        return routes[name]
+
+    def parse_mix(self, mix):
+        names, weights = [], []
+        for part in mix.split(","):
+            name, _, weight = part.partition("=")
+            names.append(name.strip())
+            weights.append(float(weight or 1))
+        for name in names:
+            self.build_request(name)
+        return names, weights
+
+    # ------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------
+    def send(self, base_url, token, method, path, body, timeout):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(base_url + path, data=data, method=method)
+        request.add_header("Authorization", f"Bearer {token}")
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            return 0
+
+    def worker(self, options, names, weights, deadline):
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            method, path, body = self.build_request(name)
+            start = time.perf_counter()
+            code = self.send(options["base_url"], random.choice(self.tokens), method, path, body, options["timeout"])
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies[name].append(elapsed)
+                self.statuses[name][code] += 1
+
+    # ------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------
+    def handle(self, *args, **options):
+        user_ids = list(User.objects.filter(is_active=True).order_by("?").values_list("id", flat=True)[: options["users"]])
+        self.post_ids = list(Post.objects.order_by("-id").values_list("id", flat=True)[:10_000])
+        if not user_ids or not self.post_ids:
+            raise CommandError("No users/posts found. Run `manage.py seed_data` first.")
+        self.author_ids = list(Post.objects.order_by("-id").values_list("author_id", flat=True)[:10_000])
+        # Access tokens only: no refresh token rows are written for load-test users
+        self.tokens = [str(AccessToken.for_user(User(pk=user_id))) for user_id in user_ids]
+        names, weights = self.parse_mix(options["mix"])
+
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+        self.stdout.write(
+            f"Running {options['duration']}s against {options['base_url']} "
+            f"with {options['concurrency']} clients and {len(self.tokens)} users"
+        )
+        start = time.perf_counter()
+        deadline = start + options["duration"]
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            for _ in range(options["concurrency"]):
+                pool.submit(self.worker, options, names, weights, deadline)
+        self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        total = sum(len(v) for v in self.latencies.values())
+        self.stdout.write(f"\n{'endpoint':<14}{'reqs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+        for name in sorted(self.latencies):
+            samples = sorted(self.latencies[name])
+            q = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+            statuses = " ".join(f"{code}:{n}" for code, n in sorted(self.statuses[name].items()))
+            self.stdout.write(
+                f"{name:<14}{len(samples):>8}{len(samples) / elapsed:>9.1f}"
+                f"{q[49] * 1000:>9.1f}{q[94] * 1000:>9.1f}{q[98] * 1000:>9.1f}  {statuses}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)"))
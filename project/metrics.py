@@ -0,0 +1,228 @@
+import bisect
+import hmac
+import threading
+import weakref
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# In-process metrics registry
+# ------------------------------------------------------------
+# Counters and histograms keep one shard of values per thread: recording is
+# a dict update on the calling thread's own shard, with no lock and no
+# contention between request threads. A scrape (/metrics) sums the shards
+# under the registry lock. When a thread exits, its shard is folded into the
+# metric's retired totals and dropped, so counters never go backwards and
+# short-lived threads (e.g. sync_to_async workers) don't pile up shards.
+#
+# Values are per process: with several workers, scrape each one (or run the
+# metrics endpoint on a single-process deployment).
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ShardHolder:
+    """Thread-local owner of a shard; collected, and its shard retired, when the thread exits"""
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard):
+        self.shard = shard
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+
+    def _shard(self):
+        try:
+            return self._local.holder.shard
+        except AttributeError:
+            shard = {}
+            holder = self._local.holder = _ShardHolder(shard)
+            self.registry._add_shard(self, shard)
+            finalizer = weakref.finalize(holder, self.registry._retire_shard, self, shard)
+            finalizer.atexit = False
+            return shard
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def merge(self, into, shard):
+        for labels, value in shard.copy().items():
+            into[labels] = into.get(labels, 0) + value
+
+    def collect(self, shards):
+        totals = {}
+        for shard in shards:
+            # dict.copy() is atomic, so the owning thread can keep writing
+            for labels, value in shard.copy().items():
+                totals[labels] = totals.get(labels, 0) + value
+        return [(self.name, labels, value) for labels, value in sorted(totals.items())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # Per-bucket counts (the last one is +Inf), then the sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def merge(self, into, shard):
+        for labels, series in shard.copy().items():
+            total = into.setdefault(labels, [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+
+    def collect(self, shards):
+        totals = {}
+        for shard in shards:
+            for labels, series in shard.copy().items():
+                total = totals.setdefault(labels, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        samples = []
+        for labels, series in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (_format_value(bound),), cumulative))
+            samples.append((f"{self.name}_sum", labels, series[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        # Reentrant: a shard can be retired by garbage collection on any thread
+        self._lock = threading.RLock()
+        self._metrics = {}
+        self._shards = {}
+        self._retired = {}
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+            self._shards[metric.name] = []
+            self._retired[metric.name] = {}
+        return metric
+
+    def _add_shard(self, metric, shard):
+        # Once per thread and metric
+        with self._lock:
+            self._shards[metric.name].append(shard)
+
+    def _retire_shard(self, metric, shard):
+        # The owning thread has exited: nothing writes to the shard any more
+        with self._lock:
+            self._shards[metric.name] = [s for s in self._shards[metric.name] if s is not shard]
+            metric.merge(self._retired[metric.name], shard)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            # Under the lock, so a shard isn't retired (and counted twice) mid-scrape
+            metrics = [
+                (metric, metric.collect(self._shards[name] + [self._retired[name]]))
+                for name, metric in self._metrics.items()
+            ]
+        lines = []
+        for metric, samples in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            labelnames = metric.labelnames + (("le",) if metric.kind == "histogram" else ())
+            for name, labels, value in samples:
+                if labels:
+                    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labels))
+                    lines.append(f"{name}{{{pairs}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+
+# ------------------------------------------------------------
+# Metrics recorded by project.middleware / project.cache
+# ------------------------------------------------------------
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by URL name, method and status", ("view", "method", "status")
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response was returned, by URL name", ("view", "method")
+)
+DB_QUERIES = REGISTRY.counter(
+    "db_queries_total", "Database queries by alias and URL name", ("alias", "view")
+)
+DB_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database query time by alias", ("alias",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+CACHE_OPERATIONS = REGISTRY.counter(
+    "cache_operations_total", "Cache calls by cache, operation and result", ("cache", "operation", "result")
+)
+
+
+# ------------------------------------------------------------
+# Scrape endpoint
+# ------------------------------------------------------------
+def metrics_view(request):
+    """
+    GET -> all metrics in the Prometheus text format, for scrapers sending
+           `Authorization: Bearer <METRICS_TOKEN>` or, if configured, from
+           METRICS_ALLOWED_IPS. With neither set nobody may scrape.
+    """
+    token = _setting("METRICS_TOKEN", "")
+    allowed = bool(token) and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    )
+    # Opt-in: behind a proxy REMOTE_ADDR is the proxy's, so an allow-list can admit everyone
+    allowed = allowed or request.META.get("REMOTE_ADDR") in _setting("METRICS_ALLOWED_IPS", ())
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
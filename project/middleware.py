@@ -0,0 +1,114 @@
+import logging
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .metrics import DB_DURATION, DB_QUERIES, HTTP_DURATION, HTTP_REQUESTS
+
+logger = logging.getLogger("project.requests")
+
+# Anything else is counted as "other", so clients can't mint label values
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class QueryStats:
+    """execute_wrapper counting one request's queries and their time on one alias"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            DB_DURATION.observe(elapsed, self.alias)
+
+
+# ------------------------------------------------------------
+# Request metrics & structured request log
+# ------------------------------------------------------------
+class ObservabilityMiddleware:
+    """
+    Records request counts and latency per URL name, and query counts and
+    time per DB alias (project/metrics.py). Logs one JSON line per request
+    for every 5xx, every request slower than REQUEST_LOG_SLOW_MS and a
+    REQUEST_LOG_SAMPLE_RATE share of the rest. Goes first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_LOG_SAMPLE_RATE", 0.01)
+        self.slow_seconds = getattr(settings, "REQUEST_LOG_SLOW_MS", 1000) / 1000
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        stats = [QueryStats(alias) for alias in connections]
+        with ExitStack() as stack:
+            for query_stats in stats:
+                stack.enter_context(connections[query_stats.alias].execute_wrapper(query_stats))
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        # Async views query through sync_to_async threads, which this task's
+        # execute_wrappers don't reach: only request metrics here
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, ())
+        return response
+
+    def record(self, request, response, elapsed, stats):
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else "<unmatched>"
+        method = request.method if request.method in METHODS else "other"
+        status = response.status_code
+        HTTP_REQUESTS.inc(view, method, str(status))
+        HTTP_DURATION.observe(elapsed, view, method)
+        for query_stats in stats:
+            if query_stats.count:
+                DB_QUERIES.inc(query_stats.alias, view, amount=query_stats.count)
+
+        request_id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+        response["X-Request-ID"] = request_id
+
+        if status >= 500:
+            level, sample_rate = logging.ERROR, 1.0
+        elif elapsed >= self.slow_seconds:
+            level, sample_rate = logging.WARNING, 1.0
+        elif random.random() < self.sample_rate:
+            level, sample_rate = logging.INFO, self.sample_rate
+        else:
+            return
+        user = getattr(request, "user", None)  # set by DRF's authentication
+        logger.log(level, "%s %s %s", request.method, request.path, status, extra={
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "db_queries": sum(s.count for s in stats),
+            "db_ms": round(sum(s.seconds for s in stats) * 1000, 2),
+            "user_id": user.pk if user is not None and user.is_authenticated else None,
+            # Weight sampled lines by 1 / sample_rate when counting
+            "sample_rate": sample_rate,
+        })
@@ -0,0 +1,117 @@
+import datetime
+import decimal
+import json
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj):
+    """Types orjson does not handle natively (datetimes/UUIDs it does)"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        # Iterating would silently emit a list of ints; encode explicitly
+        raise TypeError(f"Type {type(obj).__name__} is not JSON serializable; decode or base64 it first")
+    if hasattr(obj, "tolist"):  # numpy arrays / scalars
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):  # sets, dict views, generators
+        return list(obj)
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONEncoder(DjangoJSONEncoder):
+    """Pure-Python fallback with the same output rules as the orjson path"""
+
+    def default(self, obj):
+        if isinstance(obj, (datetime.datetime, datetime.date, datetime.time, uuid.UUID)):
+            return super().default(obj)
+        return _default(obj)
+
+
+def dumps(data, compact=True, indent=None):
+    """
+    Serialize to UTF-8 JSON bytes using orjson when it is installed.
+    compact=False without an indent means indent=2, the only indent orjson has.
+    """
+    if not compact and not indent:
+        indent = 2
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+
+    separators = (",", ":") if not indent else (",", ": ")
+    return json.dumps(
+        data, cls=FastJSONEncoder, ensure_ascii=False, indent=indent, separators=separators
+    ).encode("utf-8")
+
+
+def loads(data):
+    """Parse JSON bytes/str using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+# ------------------------------------------------------------
+# DRF Renderer / Parser
+# ------------------------------------------------------------
+class FastJSONRenderer(BaseRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer.
+    Compact (no whitespace) unless FAST_JSON_COMPACT is False or the client
+    asks for an indent, e.g. Accept: application/json; indent=2
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        if accepted_media_type:
+            params = dict(
+                part.strip().split("=", 1)
+                for part in accepted_media_type.split(";")[1:]
+                if "=" in part
+            )
+            try:
+                return max(min(int(params["indent"]), 8), 0) or None
+            except (KeyError, ValueError, TypeError):
+                pass
+        return renderer_context.get("indent", None)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        compact = getattr(settings, "FAST_JSON_COMPACT", True)
+        return dumps(data, compact=compact, indent=indent)
+
+
+class FastJSONParser(BaseParser):
+    """Drop-in replacement for DRF's JSONParser"""
+    media_type = "application/json"
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition, require_safe
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------
+# Prebuilt schema artifact
+# ------------------------------------------------------------
+# `python manage.py build_schema` (once per deploy) renders the schema to
+# API_SCHEMA_DIR as schema.<hash>.json / .yaml plus a manifest naming the
+# current hash. Workers read it once and serve the bytes with the hash as
+# ETag; the hashed URLs (/api/schema/<hash>.json) never change content and
+# are cached as immutable.
+
+SCHEMA_FORMATS = {
+    "json": OpenApiJsonRenderer,
+    "yaml": OpenApiYamlRenderer,
+}
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class SchemaArtifact:
+    def __init__(self, digest, content):
+        self.digest = digest
+        self.content = content  # format -> bytes
+
+
+def schema_dir():
+    return Path(getattr(settings, "API_SCHEMA_DIR", settings.BASE_DIR / "build" / "schema"))
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def generate_schema():
+    """The public schema of the whole URLconf, as built by `manage.py build_schema`"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema_artifact(schema, directory=None):
+    """Render `schema` in every format and make it the current artifact; returns its hash"""
+    directory = Path(directory or schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    content = {fmt: renderer().render(schema, renderer_context={}) for fmt, renderer in SCHEMA_FORMATS.items()}
+    digest = hashlib.sha256(content["json"]).hexdigest()[:16]
+    files = {}
+    for fmt, data in content.items():
+        files[fmt] = f"schema.{digest}.{fmt}"
+        _write_atomic(directory / files[fmt], data)
+    # The manifest goes last: readers never see a hash whose files aren't there yet
+    _write_atomic(directory / MANIFEST_NAME, json.dumps({"hash": digest, "files": files}).encode())
+    return digest
+
+
+_artifact = None
+_artifact_loaded = False
+_artifact_lock = threading.Lock()
+
+
+def load_schema_artifact():
+    """The current SchemaArtifact, read from disk once per process, or None"""
+    global _artifact, _artifact_loaded
+    if not _artifact_loaded:
+        with _artifact_lock:
+            if not _artifact_loaded:
+                directory = schema_dir()
+                try:
+                    manifest = json.loads((directory / MANIFEST_NAME).read_bytes())
+                    _artifact = SchemaArtifact(manifest["hash"], {
+                        fmt: (directory / name).read_bytes() for fmt, name in manifest["files"].items()
+                    })
+                except (OSError, ValueError, KeyError):
+                    logger.warning("No schema artifact in %s (run `manage.py build_schema`): "
+                                   "generating the schema at runtime", directory)
+                    _artifact = None
+                _artifact_loaded = True
+    return _artifact
+
+
+def serving_artifact():
+    """Prebuilt artifact to serve, or None (DEBUG always generates live)"""
+    return None if settings.DEBUG else load_schema_artifact()
+
+
+def artifact_response(request, artifact, fmt, content_type=None, immutable=False):
+    etag = f'"schema-{artifact.digest}-{fmt}"'
+    response = HttpResponse(artifact.content[fmt], content_type=content_type or SCHEMA_FORMATS[fmt].media_type)
+    response["ETag"] = etag
+    if immutable:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        # Same URL, new deploy: revalidate (a 304 when nothing changed)
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+@require_safe
+def schema_artifact_view(request, digest, fmt):
+    """GET -> one format of the prebuilt schema at its content-addressed URL"""
+    artifact = serving_artifact()
+    if artifact is None or digest != artifact.digest or fmt not in artifact.content:
+        raise Http404("No such schema build")
+    return artifact_response(request, artifact, fmt, immutable=True)
+
+
+# ------------------------------------------------------------
+# Schema & docs views
+# ------------------------------------------------------------
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    GET -> the OpenAPI schema: the prebuilt artifact when there is one,
+           otherwise generated on the first request of each process
+           (on every request in DEBUG)
+    """
+    _schemas = {}
+    _lock = threading.Lock()
+
+    def get(self, request, *args, **kwargs):
+        artifact = serving_artifact()
+        if artifact is None or request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+        renderer = request.accepted_renderer
+        return artifact_response(request, artifact, renderer.format, content_type=renderer.media_type)
+
+    def build_schema(self, request, version):
+        generator = self.generator_class(urlconf=self.urlconf, api_version=version, patterns=self.patterns)
+        return generator.get_schema(request=request, public=self.serve_public)
+
+    def get_schema(self, request, version):
+        if settings.DEBUG or not self.serve_public:
+            # Live while developing; a per-user schema (SERVE_PUBLIC=False) can't be shared
+            return self.build_schema(request, version)
+        key = (version, translation.get_language())
+        schema = self._schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(key)
+                if schema is None:
+                    schema = self.build_schema(request, version)
+                    self._schemas[key] = schema
+        return schema
+
+    def _get_schema_response(self, request):
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        return Response(
+            data=self.get_schema(request, version),
+            headers={"Content-Disposition": f'inline; filename="{self._get_filename(request, version)}"'},
+        )
+
+
+def docs_etag(request, *args, **kwargs):
+    # The page only embeds the schema URL, so it changes with the artifact
+    artifact = serving_artifact()
+    if artifact is None:
+        return None
+    query = hashlib.md5(request.META.get("QUERY_STRING", "").encode(), usedforsecurity=False).hexdigest()[:8]
+    return f'"docs-{artifact.digest}-{query}"'
+
+
+class ArtifactDocsMixin:
+    """Point Swagger UI / Redoc at the immutable artifact URL when there is one"""
+
+    @method_decorator(condition(etag_func=docs_etag))
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if serving_artifact() is not None:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def _get_schema_url(self, request):
+        artifact = serving_artifact()
+        if artifact is None or self.url or request.GET.get("lang") or request.GET.get("version"):
+            return super()._get_schema_url(request)
+        return reverse("schema-artifact", kwargs={"digest": artifact.digest, "fmt": "json"})
+
+
+class SwaggerView(ArtifactDocsMixin, SpectacularSwaggerView):
+    pass
+
+
+class RedocView(ArtifactDocsMixin, SpectacularRedocView):
+    pass
@@ -0,0 +1,74 @@
+from rest_framework import permissions
+
+
+def parse_field_params(request):
+    """
+    Read ?fields= and ?expand= from a read request.
+
+    Returns (fields, expand) as sets, or None for a parameter that was not sent.
+    Writes always get the full serializer, so non-safe methods return (None, None).
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None, None
+
+    def _split(name):
+        raw = request.query_params.get(name)
+        if raw is None:
+            return None
+        return {f.strip() for f in raw.split(",") if f.strip()}
+
+    return _split("fields"), _split("expand")
+
+
+def resolve_fields(serializer_class, fields=None, expand=None):
+    """
+    Return the set of field names a serializer will emit for fields/expand.
+
+    - no params         -> every field (unchanged default output)
+    - ?fields=a,b       -> only a and b
+    - ?expand=x         -> adds x (one of Meta.expandable_fields) to ?fields=,
+                           or alone: every non-expandable field plus x
+    Expandable fields are dropped when ?fields= or ?expand= leaves them out.
+    """
+    all_fields = list(serializer_class.Meta.fields)
+    if fields is None and expand is None:
+        return set(all_fields)
+
+    expandable = set(getattr(serializer_class.Meta, "expandable_fields", []))
+    base = set(fields) if fields is not None else set(all_fields) - expandable
+    wanted = base | (set(expand or ()) & expandable)
+    return {name for name in all_fields if name in wanted}
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin that drops fields not requested through the
+    'fields' / 'expand' keys of the serializer context.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = self.context.get("fields"), self.context.get("expand")
+        if fields is None and expand is None:
+            return
+
+        keep = resolve_fields(type(self), fields, expand)
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """
+    Pass ?fields= / ?expand= to the serializer and expose the resolved
+    field names to get_queryset() as self.requested_fields.
+    """
+
+    @property
+    def requested_fields(self):
+        fields, expand = parse_field_params(self.request)
+        return resolve_fields(self.get_serializer_class(), fields, expand)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["expand"] = parse_field_params(self.request)
+        return context
@@ -10,12 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+# `manage.py test`
+TESTING = sys.argv[1:2] == ['test']
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -53,10 +59,23 @@ INSTALLED_APPS = [
     'social',
     'stories',
     'notifications',
-
+    'analytics',
+    'sync',
+    # Project-wide management commands
+    'project',
 ]
 
+# Route the admin and the OpenAPI schema/docs from this process
+# (project/settings_lean.py turns both off for API workers)
+ADMIN_ENABLED = True
+API_DOCS_ENABLED = True
+
+# Where `manage.py build_schema` writes the prebuilt OpenAPI schema
+API_SCHEMA_DIR = BASE_DIR / 'build' / 'schema'
+
 MIDDLEWARE = [
+    # First, so its timings cover the other middleware
+    'project.middleware.ObservabilityMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,13 +107,124 @@ WSGI_APPLICATION = 'project.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# ATOMIC_REQUESTS stays off: reads run in autocommit, and each write endpoint
+# goes through a service (posts/services.py, accounts/services.py) that opens
+# exactly one transaction and defers side effects to on_commit hooks.
+#
+# SQLite runs in WAL mode (readers never block the writer; synchronous=NORMAL
+# syncs at checkpoints rather than on every commit) and takes the write lock at
+# BEGIN, so concurrent writers wait on `timeout` instead of failing mid-transaction.
+# Set POSTGRES_DB (plus POSTGRES_USER/PASSWORD/HOST/PORT) to use PostgreSQL.
+
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
+    }
+
+
+# Cache
+# Shared Redis cache when REDIS_URL is set, otherwise per-process memory.
+# Revoked refresh tokens get their own alias on TOKEN_REDIS_URL (default:
+# REDIS_URL); that Redis must run with maxmemory-policy noeviction
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'project.cache.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'tokens': {
+            'BACKEND': 'project.cache.RedisCache',
+            'LOCATION': os.environ.get('TOKEN_REDIS_URL', os.environ['REDIS_URL']),
+            'KEY_PREFIX': 'tokens',
+            'METRICS_NAME': 'tokens',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'project.cache.LocMemCache',
+        }
     }
-}
+
+THROTTLE_CACHE = 'default'
+
+# Seconds a /api/users/<id>/profile/ payload stays cached (invalidated on change)
+PROFILE_CACHE_TIMEOUT = 300
+
+# Seconds a viewer's blocked/allowed author sets stay cached (social/visibility.py)
+VISIBILITY_CACHE_TIMEOUT = 300
+
+# Explore ranking (feeds/ranking.py); the pool is rebuilt by `manage.py refresh_explore_pool`
+EXPLORE_POOL_DAYS = 7
+EXPLORE_POOL_SIZE = 5000
+EXPLORE_POOL_TIMEOUT = 3600
+EXPLORE_VELOCITY_HOURS = 24
+EXPLORE_HALF_LIFE_HOURS = 12.0
+EXPLORE_WEIGHTS = {'recency': 1.0, 'velocity': 1.5, 'affinity': 0.8}
+EXPLORE_SEGMENT_AUTHORS = 5
+EXPLORE_RESULTS = 500
+EXPLORE_CACHE_TIMEOUT = 120
+
+# Suggested accounts: top SUGGESTIONS_PER_USER per user from friends of
+# friends and co-engagement, recomputed for queued users by
+# `manage.py refresh_suggestions` in batches of SUGGESTIONS_BATCH_SIZE
+SUGGESTIONS_PER_USER = 50
+SUGGESTIONS_BATCH_SIZE = 500
+SUGGESTIONS_WEIGHTS = {'mutual': 1.0, 'colike': 0.5}
+SUGGESTIONS_FOLLOWS_PER_USER = 500
+SUGGESTIONS_LIKE_DAYS = 30
+SUGGESTIONS_LIKES_PER_USER = 200
+SUGGESTIONS_MAX_POST_LIKERS = 5000
+# Followers queued when someone's follows change (their friends of friends)
+SUGGESTIONS_QUEUE_FOLLOWERS = 1000
+
+# Engagement analytics: events are compacted by `manage.py compact_analytics`
+ANALYTICS_HOURLY_RETENTION_DAYS = 14
+
+# Soft-deleted posts/accounts are removed by `manage.py reap_deleted`
+REAPER_GRACE_HOURS = 1
+REAPER_BATCH_SIZE = 1000
+
+# /api/sync/: changes per page
+SYNC_PAGE_SIZE = 500
+# PostgreSQL: changes are served once created this long before the oldest open write transaction
+SYNC_HOLDBACK_SECONDS = 1
+
+# Live post updates (/api/posts/live/, SSE over ASGI). The in-process broker
+# only reaches streams of the same worker; swap it for a shared one when
+# running several
+LIVE_BROKER = 'posts.live.InProcessBroker'
+LIVE_COALESCE_SECONDS = 0.5
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_MAX_POSTS = 50
+LIVE_QUEUE_SIZE = 1000
+LIVE_COMMENTS_PER_WINDOW = 20
+
+# Threads (and so DB connections per worker) the async read views query on
+ASYNC_DB_THREADS = 8
 
 
 # Password validation
@@ -108,7 +238,7 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+        'NAME': 'accounts.password_validation.CachedCommonPasswordValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
@@ -116,6 +246,30 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# Argon2id (argon2-cffi) is preferred when installed. Hashes made with any
+# other listed hasher, or with older Argon2 parameters, are upgraded
+# transparently on the user's next successful login.
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.BoundedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if importlib.util.find_spec('argon2'):
+    PASSWORD_HASHERS.insert(0, 'accounts.hashers.BoundedArgon2PasswordHasher')
+
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 19456  # KiB
+PASSWORD_ARGON2_PARALLELISM = 1
+
+# Max concurrent hash/verify calls per process (default: CPU count)
+PASSWORD_HASHING_WORKERS = None
+
+# Seconds between background rebuilds of the in-memory username Bloom filter
+USERNAME_INDEX_TTL = 600
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -150,8 +304,28 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'project.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'project.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token-bucket limits (project/throttling.py): capacity per period
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'register': '5/hour',
+        'like': '120/min',
+        'comment': '30/min',
+        'username_check': '60/min',
+    },
 }
 
+# JSON responses without whitespace (uses orjson when installed); False indents by 2
+FAST_JSON_COMPACT = True
+
 # Simple JWT Settings
 from datetime import timedelta
 
@@ -160,8 +334,15 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Revocations: TOKEN_REVOCATION_CACHE, or the blacklist tables (accounts/tokens.py)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.tokens.TokenRefreshSerializer',
 }
 
+# Cache alias holding revoked refresh-token ids (accounts/tokens.py): its own
+# alias, shared by all workers, never evicting. None keeps revocations in the
+# token_blacklist tables
+TOKEN_REVOCATION_CACHE = 'tokens' if 'tokens' in CACHES else None
+
 # Email Settings (for verification)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -177,5 +358,61 @@ EMAIL_TIMEOUT = 30
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Square avatar renditions (px) built from each profile image upload, on
+# AVATAR_WORKERS background threads (inline when AVATAR_PROCESS_INLINE).
+# Author blocks get the smallest rendition >= AVATAR_DEFAULT_SIZE.
+AVATAR_SIZES = (48, 96, 320)
+AVATAR_DEFAULT_SIZE = 96
+AVATAR_PROFILE_SIZE = 320
+AVATAR_JPEG_QUALITY = 85
+AVATAR_WORKERS = 2
+AVATAR_PROCESS_INLINE = False
+
+# Video uploads are probed, given a poster frame and transcoded to HLS
+# renditions (height, kbps) at or below the source height by these binaries,
+# on VIDEO_WORKERS background threads (posts/video.py)
+FFMPEG_BINARY = 'ffmpeg'
+FFPROBE_BINARY = 'ffprobe'
+# Demuxers uploads may be opened with (mp4/mov/m4v, mkv/webm, avi)
+VIDEO_INPUT_FORMATS = ('mov', 'matroska', 'avi')
+VIDEO_RENDITIONS = [(360, 800), (720, 2500), (1080, 5000)]
+VIDEO_SEGMENT_SECONDS = 4
+VIDEO_POSTER_WIDTH = 720
+VIDEO_MAX_SECONDS = 600
+VIDEO_MAX_BYTES = 200 * 1024 * 1024
+VIDEO_PROCESS_TIMEOUT = 600
+VIDEO_WORKERS = 1
+VIDEO_PROCESS_INLINE = False
+
+# Logging: one JSON object per line on stderr (project/logs.py). The request
+# log (project.middleware) has every 5xx and slow request plus a sampled
+# share of the rest (none under tests); 4xx noise from django.request is left to it.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', '0' if TESTING else '0.01'))
+REQUEST_LOG_SLOW_MS = 1000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'project.logs.JSONFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'django.request': {'handlers': ['console'], 'level': 'ERROR', 'propagate': False},
+        'django.db.backends': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Prometheus scrape endpoint (/metrics): scrapers send METRICS_TOKEN as a
+# bearer token; unset, /metrics is closed. Addresses listed here may scrape
+# without it (opt-in: only where REMOTE_ADDR is the scraper's, not a proxy's)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ()
+
 
 AUTH_USER_MODEL = 'accounts.User'
\ No newline at end of file
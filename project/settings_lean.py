@@ -0,0 +1,55 @@
+"""
+Lean settings for API worker processes:
+
+    DJANGO_SETTINGS_MODULE=project.settings_lean gunicorn project.wsgi
+
+Same database, cache, auth and API behaviour as project.settings, without
+what an API worker never serves: the admin, the OpenAPI schema and docs
+(drf-spectacular), the browsable API, sessions/messages and the stub apps
+that have no models or URLs yet. Run migrations, the admin and the docs
+from a process on project.settings.
+
+Compare boot time with:
+
+    python -m benchmarks.bench_startup
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+ADMIN_ENABLED = False
+API_DOCS_ENABLED = False
+
+LEAN_EXCLUDED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'drf_spectacular',
+    'drf_spectacular_sidecar',
+    # Stub apps: no models, views or URLs yet
+    'messaging',
+    'search',
+    'stories',
+    'notifications',
+}
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in LEAN_EXCLUDED_APPS]
+
+# JWT is authenticated by DRF itself; the session, CSRF and messages
+# middleware only matter to the admin and the browsable API
+MIDDLEWARE = [
+    m for m in MIDDLEWARE
+    if m not in {
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    }
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': ['project.renderers.FastJSONRenderer'],
+}
@@ -0,0 +1,207 @@
+import gc
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from posts import services
+from . import renderers
+from .metrics import Registry
+
+
+# ------------------------------------------------------------
+# Batch endpoint (project/batch.py)
+# ------------------------------------------------------------
+class BatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="batcher", password="pw12345!xZ", email="b@example.com")
+        self.post = services.create_post(self.user, caption="hello")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *requests):
+        response = self.client.post("/api/batch/", {"requests": list(requests)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["responses"]
+
+    def test_sub_request_paths_keep_their_query_string(self):
+        detail, sparse = self.batch(
+            {"path": f"/api/posts/{self.post.pk}/"},
+            {"path": f"/api/posts/{self.post.pk}/?fields=id,caption"},
+        )
+        self.assertEqual(detail["status"], 200)
+        self.assertIn("author", detail["body"])
+        self.assertEqual(sparse["status"], 200)
+        self.assertEqual(sparse["body"], {"id": self.post.pk, "caption": "hello"})
+
+    def test_failing_sub_requests_stay_within_their_item(self):
+        async_view, missing, ok = self.batch(
+            {"path": f"/api/posts/async/{self.post.pk}/"},
+            {"path": "/api/posts/not-a-route/"},
+            {"path": f"/api/posts/{self.post.pk}/"},
+        )
+        self.assertEqual(async_view["status"], 400)
+        self.assertEqual(missing["status"], 404)
+        self.assertEqual(ok["status"], 200)
+
+    def test_reads_after_a_write_see_it(self):
+        before, _, after = self.batch(
+            {"path": f"/api/posts/{self.post.pk}/?fields=likes_count"},
+            {"method": "POST", "path": f"/api/posts/{self.post.pk}/like/"},
+            {"path": f"/api/posts/{self.post.pk}/?fields=likes_count"},
+        )
+        self.assertEqual((before["body"]["likes_count"], after["body"]["likes_count"]), (0, 1))
+
+
+# ------------------------------------------------------------
+# Token-bucket throttle (project/throttling.py)
+# ------------------------------------------------------------
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_login_is_limited_per_client(self):
+        # 'login': '10/min' -> a full bucket of 10, then 429 with Retry-After
+        client = APIClient()
+        credentials = {"username": "nobody", "password": "wrong"}
+        statuses = [client.post("/api/accounts/login/", credentials, format="json").status_code for _ in range(11)]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
+
+        response = client.post("/api/accounts/login/", credentials, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        other = APIClient(REMOTE_ADDR="10.0.0.2")
+        self.assertNotEqual(other.post("/api/accounts/login/", credentials, format="json").status_code, 429)
+
+
+# ------------------------------------------------------------
+# orjson renderer (project/renderers.py)
+# ------------------------------------------------------------
+class RendererTests(TestCase):
+    payload = {
+        "id": 7,
+        "caption": "naïve café ✓",
+        "score": 0.1 + 0.2,
+        "tags": ["a", "b"],
+        "nested": {"empty": [], "none": None, "flag": True, "map": {}},
+    }
+
+    def test_fallback_encoder_matches_orjson_byte_for_byte(self):
+        for options in ({}, {"compact": False}, {"indent": 2}):
+            fast = renderers.dumps(self.payload, **options)
+            with mock.patch.object(renderers, "orjson", None):
+                slow = renderers.dumps(self.payload, **options)
+            self.assertEqual(fast, slow, options)
+
+    def test_response_parses_like_the_drf_renderer(self):
+        user = User.objects.create_user(username="renderer", password="pw12345!xZ", email="r@example.com")
+        services.add_comment(services.create_post(user, caption="ünïcode"), user, "hi")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get("/api/posts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b", ", response.content)
+        self.assertEqual(json.loads(response.content), json.loads(JSONRenderer().render(response.data)))
+
+    def test_accept_indent_is_honoured(self):
+        rendered = renderers.FastJSONRenderer().render({"a": [1]}, "application/json; indent=2", {})
+        self.assertEqual(rendered, b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_extra_types_are_encoded_the_same_way_on_both_paths(self):
+        data = {"price": Decimal("1.50"), "ids": {3}, "took": timedelta(seconds=1.5)}
+        expected = {"price": "1.50", "ids": [3], "took": 1.5}
+        self.assertEqual(json.loads(renderers.dumps(data)), expected)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(json.loads(renderers.dumps(data)), expected)
+
+    def test_bytes_are_rejected_instead_of_listed(self):
+        for encoder in (None, renderers.orjson):
+            with mock.patch.object(renderers, "orjson", encoder), self.assertRaises(TypeError):
+                renderers.dumps({"blob": b"\x00\x01"})
+
+
+# ------------------------------------------------------------
+# Metrics registry and /metrics (project/metrics.py)
+# ------------------------------------------------------------
+class MetricsRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.counter = self.registry.counter("jobs_total", "Jobs by queue", ("queue",))
+
+    def in_threads(self, fn, count=4):
+        threads = [threading.Thread(target=fn) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_per_thread_shards_sum_up_and_survive_their_threads(self):
+        self.counter.inc("mail")
+        self.in_threads(lambda: [self.counter.inc("mail", amount=2) for _ in range(100)])
+        gc.collect()
+        # The exited threads' shards were folded into the retired totals
+        self.assertEqual(len(self.registry._shards["jobs_total"]), 1)
+        self.assertIn('jobs_total{queue="mail"} 801', self.registry.render())
+
+        self.in_threads(lambda: self.counter.inc("mail"))
+        gc.collect()
+        self.assertIn('jobs_total{queue="mail"} 805', self.registry.render())
+
+    def test_histograms_render_cumulative_buckets(self):
+        histogram = self.registry.histogram("took_seconds", "Time taken", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value)
+        lines = self.registry.render().splitlines()
+        self.assertEqual(lines[-5:], [
+            'took_seconds_bucket{le="0.1"} 1',
+            'took_seconds_bucket{le="1"} 3',
+            'took_seconds_bucket{le="+Inf"} 4',
+            "took_seconds_sum 4.05",
+            "took_seconds_count 4",
+        ])
+
+    def test_names_are_registered_once(self):
+        with self.assertRaises(ValueError):
+            self.registry.counter("jobs_total", "Again")
+
+
+class MetricsEndpointTests(TestCase):
+    def scrape(self, **headers):
+        return self.client.get("/metrics", **headers)
+
+    @override_settings(METRICS_TOKEN="", METRICS_ALLOWED_IPS=())
+    def test_closed_without_a_token_or_allow_list(self):
+        self.assertEqual(self.scrape().status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret", METRICS_ALLOWED_IPS=())
+    def test_bearer_token_is_required(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer s3crét").status_code, 403)
+        response = self.scrape(HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE http_requests_total counter", response.content)
+
+    @override_settings(METRICS_TOKEN="s3cret", METRICS_ALLOWED_IPS=("127.0.0.1",))
+    def test_allow_listed_addresses_need_no_token(self):
+        self.assertEqual(self.scrape().status_code, 200)
+        self.assertEqual(self.scrape(REMOTE_ADDR="10.0.0.8").status_code, 403)
+
+    def test_requests_are_counted_but_not_sample_logged_under_tests(self):
+        with self.assertNoLogs("project.requests", level="INFO"):
+            for _ in range(50):
+                self.client.get("/metrics")
+        with override_settings(METRICS_TOKEN="s3cret"):
+            body = self.scrape(HTTP_AUTHORIZATION="Bearer s3cret").content.decode()
+        self.assertRegex(body, r'http_requests_total\{view="metrics",method="GET",status="403"\} [1-9]')
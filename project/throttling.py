@@ -0,0 +1,148 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+# In-process buckets used when the shared cache is unreachable
+_local_buckets = {}
+_LOCAL_MAX_KEYS = 10000
+_local_lock = threading.Lock()
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Refill and take in one step on the Redis server, timed by its clock.
+# KEYS[1] = bucket hash; ARGV = capacity, refill per second, ttl.
+# Returns {allowed (0/1), tokens left as a string}.
+_REDIS_TAKE = """
+local capacity, rate, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacity, refill_per_second), same syntax as DRF's throttle rates"""
+    num, period = rate.split("/")
+    capacity = int(num)
+    seconds = PERIODS[period[0]]
+    return capacity, capacity / seconds
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle: every client key holds up to `capacity` tokens that
+    refill continuously; each request spends one.
+
+    The refill-and-take step is atomic: one Lua script call on a Redis cache,
+    otherwise a get + set under a process lock (enough for per-process caches
+    like LocMem; other shared backends would need a script of their own).
+
+    Subclasses set `scope` (looked up in DEFAULT_THROTTLE_RATES) and `per`
+    ('user' -> authenticated user id, falling back to IP; 'ip' -> always IP).
+    """
+    scope = None
+    per = "user"
+    cache_alias = getattr(settings, "THROTTLE_CACHE", "default")
+
+    def __init__(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.capacity, self.refill_rate = parse_rate(rate) if rate else (None, None)
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        if self.per == "user" and request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return f"throttle:{self.scope}:{ident}"
+
+    def _take(self, state, now):
+        """Refill then try to spend one token; returns (allowed, new_state)"""
+        tokens, stamp = state if state else (self.capacity, now)
+        tokens = min(self.capacity, tokens + max(0, now - stamp) * self.refill_rate)
+        if tokens >= 1:
+            return True, (tokens - 1, now)
+        self.wait_seconds = (1 - tokens) / self.refill_rate
+        return False, (tokens, now)
+
+    def _take_redis(self, cache, key, timeout):
+        client = cache._cache.get_client(key, write=True)
+        allowed, tokens = client.eval(
+            _REDIS_TAKE, 1, cache.make_and_validate_key(key), self.capacity, self.refill_rate, timeout
+        )
+        if not allowed:
+            self.wait_seconds = (1 - float(tokens)) / self.refill_rate
+        return bool(allowed)
+
+    def _take_locked(self, cache, key, now, timeout):
+        with _local_lock:
+            allowed, state = self._take(cache.get(key), now)
+            cache.set(key, state, timeout)
+        return allowed
+
+    def allow_request(self, request, view):
+        if self.capacity is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        now = time.time()
+        # A full bucket refills in capacity / refill_rate seconds; no need to keep it longer
+        timeout = int(self.capacity / self.refill_rate) + 1
+        try:
+            cache = caches[self.cache_alias]
+            if isinstance(cache, RedisCache):
+                return self._take_redis(cache, key, timeout)
+            return self._take_locked(cache, key, now, timeout)
+        except Exception:
+            with _local_lock:
+                if len(_local_buckets) > _LOCAL_MAX_KEYS:
+                    _local_buckets.clear()
+                allowed, state = self._take(_local_buckets.get(key), now)
+                _local_buckets[key] = state
+            return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+# ------------------------------------------------------------
+# Scoped throttles
+# ------------------------------------------------------------
+class LoginRateThrottle(TokenBucketThrottle):
+    scope = "login"
+    per = "ip"
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    scope = "register"
+    per = "ip"
+
+
+class UsernameCheckRateThrottle(TokenBucketThrottle):
+    scope = "username_check"
+    per = "ip"
+
+
+class LikeRateThrottle(TokenBucketThrottle):
+    scope = "like"
+
+
+class CommentRateThrottle(TokenBucketThrottle):
+    scope = "comment"
@@ -14,21 +14,38 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from .batch import batch_view
+from .metrics import metrics_view
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
     path('api/posts/', include('posts.urls')),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/users/', include('social.urls')),
+    path('api/feeds/', include('feeds.urls')),
+    path('api/analytics/', include('analytics.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/batch/', batch_view, name='batch'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
+# Admin and API docs are only imported where they're served
+# (off in project/settings_lean.py)
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    urlpatterns += [path('admin/', admin.site.urls)]
+
+if settings.API_DOCS_ENABLED:
+    from .schema import CachedSchemaView, SwaggerView, RedocView, schema_artifact_view
+    urlpatterns += [
+        path('api/schema/', CachedSchemaView.as_view(), name='schema'),
+        path('api/schema/<slug:digest>.<slug:fmt>', schema_artifact_view, name='schema-artifact'),
+        path('api/docs/', SwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        path('api/redoc/', RedocView.as_view(url_name='schema'), name='redoc'),
+    ]
+
 # Media files configuration for development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social.suggestions import queue_all_suggestions, refresh_queued_suggestions
+
+
+class Command(BaseCommand):
+    help = "Recompute suggested accounts for users whose graph changed (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="queue every active account first")
+        parser.add_argument("--limit", type=int, default=None, help="max users per run")
+        parser.add_argument("--batch-size", type=int, default=None, help="defaults to SUGGESTIONS_BATCH_SIZE")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options["all"]:
+            queue_all_suggestions()
+        users, suggestions = refresh_queued_suggestions(limit=options["limit"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed suggestions for {users} users ({suggestions} stored) in {time.perf_counter() - start:.2f}s"
+        ))
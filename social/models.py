@@ -1,3 +1,57 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+User = settings.AUTH_USER_MODEL
+
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name="following")
+    following = models.ForeignKey(User, on_delete=models.CASCADE, related_name="followers")
+    # Follows of private accounts stay pending until the account accepts them
+    accepted = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("follower", "following")
+
+    def __str__(self):
+        return f"{self.follower} follows {self.following}"
+
+
+class Block(models.Model):
+    blocker = models.ForeignKey(User, on_delete=models.CASCADE, related_name="blocking")
+    blocked = models.ForeignKey(User, on_delete=models.CASCADE, related_name="blocked_by")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("blocker", "blocked")
+
+    def __str__(self):
+        return f"{self.blocker} blocks {self.blocked}"
+
+
+class Suggestion(models.Model):
+    """Precomputed accounts to suggest to `user` (social/suggestions.py), best first"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="suggestions")
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    # Accounts the user follows that follow the candidate
+    mutuals = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        # Also the index the suggestions endpoint reads in rank order
+        unique_together = ("user", "rank")
+
+    def __str__(self):
+        return f"Suggest {self.candidate_id} to {self.user_id} (#{self.rank})"
+
+
+class SuggestionQueue(models.Model):
+    """Users whose follow/like graph changed since their suggestions were computed"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="+")
+    queued_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Suggestions for {self.user_id} queued at {self.queued_at}"
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from accounts.models import User
+from posts.models import Post, PostMedia
+
+GRID_PAGE_SIZE = 12
+
+
+def profile_cache_key(user_id):
+    return f"profile:{user_id}"
+
+
+def invalidate_profile(*user_ids):
+    """Drop cached profile payloads after a post, profile or follow change"""
+    cache.delete_many([profile_cache_key(user_id) for user_id in user_ids])
+
+
+def build_profile_payload(user):
+    """Public info, precomputed counters and the first page of grid thumbnails"""
+    posts = (
+        Post.objects.filter(author_id=user.pk)
+        .only("id", "created_at")
+        .prefetch_related(Prefetch("media", queryset=PostMedia.objects.order_by("id"), to_attr="media_list"))
+        [:GRID_PAGE_SIZE]
+    )
+    grid = []
+    for post in posts:
+        first = post.media_list[0] if post.media_list else None
+        grid.append({
+            "id": post.id,
+            "thumbnail": (first.poster or first.file).url if first else None,
+            "type": first.type if first else None,
+            "media_count": len(post.media_list),
+        })
+
+    return {
+        "id": user.pk,
+        "username": user.username,
+        "bio": user.bio,
+        "profile_image_url": user.avatar_url(getattr(settings, "AVATAR_PROFILE_SIZE", 320)),
+        "is_verified": user.is_verified,
+        "is_private": user.is_private,
+        "posts_count": user.posts_count,
+        "followers_count": user.followers_count,
+        "following_count": user.following_count,
+        "posts": grid,
+        "has_more_posts": user.posts_count > GRID_PAGE_SIZE,
+    }
+
+
+def get_profile_payload(user_id):
+    """Return the cached profile payload, building it on a miss (None if no such user)"""
+    key = profile_cache_key(user_id)
+    payload = cache.get(key)
+    if payload is None:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            return None
+        payload = build_profile_payload(user)
+        cache.set(key, payload, getattr(settings, "PROFILE_CACHE_TIMEOUT", 300))
+    return payload
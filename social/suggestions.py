@@ -0,0 +1,246 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.models import User
+from posts.models import Like
+from .models import Block, Follow, Suggestion, SuggestionQueue
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Suggested accounts (precomputed, refreshed by `manage.py refresh_suggestions`)
+# ------------------------------------------------------------
+# Candidates for a user come from two two-hop walks over the graph:
+#   friends of friends -> accounts followed by the accounts the user follows
+#   co-engagement      -> accounts that liked the same recent posts (posts
+#                         with many likers count less, viral ones not at all)
+# Both are computed for a batch of users at a time as array joins over edge
+# lists, scored, and the top SUGGESTIONS_PER_USER are stored as Suggestion
+# rows. Follows, blocks and likes queue the users whose candidates they
+# change (SuggestionQueue); only those are recomputed.
+
+def _chunks(ids, size=10_000):
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _edges(rows):
+    """(a, b) pairs -> two int64 arrays"""
+    array = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    return array[:, 0], array[:, 1]
+
+
+def _first_per_group(groups, limit):
+    """Mask keeping the first `limit` items of each run in sorted `groups`"""
+    if not len(groups):
+        return np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    run_start = np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+    return np.arange(len(groups)) - run_start < limit
+
+
+def two_hop(src, mid, right_mid, right_dst, right_weight=None):
+    """
+    Join src->mid with mid->dst edges and sum the weights per (src, dst):
+    the vectorized equivalent of a sparse (src x mid) @ (mid x dst) product.
+    Returns (src, dst, weight) arrays.
+    """
+    if right_weight is None:
+        right_weight = np.ones(len(right_mid))
+    order = np.argsort(right_mid, kind="stable")
+    right_mid, right_dst, right_weight = right_mid[order], right_dst[order], right_weight[order]
+    starts = np.searchsorted(right_mid, mid, "left")
+    counts = np.searchsorted(right_mid, mid, "right") - starts
+    total = int(counts.sum())
+    if not total:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    # For each left edge, the index range of its matches on the right
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    index = np.repeat(starts, counts) + offsets
+    pair_src, pair_dst = np.repeat(src, counts), right_dst[index]
+
+    keys, inverse = np.unique(_pair_keys(pair_src, pair_dst), return_inverse=True)
+    weights = np.bincount(inverse, weights=right_weight[index])
+    return (*_split_keys(keys), weights)
+
+
+# (user, user) pairs are packed into one int64 key, high and low 32 bits
+_ID_LIMIT = 1 << 32
+
+
+def _pair_keys(a, b):
+    a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    for ids in (a, b):
+        if len(ids) and (ids.min() < 0 or ids.max() >= _ID_LIMIT):
+            raise ValueError(f"User ids must be in [0, 2**32) to be packed into pair keys, got {ids.min()}..{ids.max()}")
+    return (a << 32) | b
+
+
+def _split_keys(keys):
+    return keys >> 32, keys & (_ID_LIMIT - 1)
+
+
+def friends_of_friends(user_ids):
+    """(user, candidate, mutuals) over the batch; also returns the batch's own follow keys"""
+    per_user = _setting("SUGGESTIONS_FOLLOWS_PER_USER", 500)
+    rows = list(
+        Follow.objects.filter(follower_id__in=user_ids).order_by("follower_id", "-pk")
+        .values_list("follower_id", "following_id", "accepted")
+    )
+    followed = _pair_keys([r[0] for r in rows], [r[1] for r in rows])  # pending requests too
+    accepted = [(r[0], r[1]) for r in rows if r[2]]
+    src, mid = _edges(accepted)
+    keep = _first_per_group(src, per_user)
+    src, mid = src[keep], mid[keep]
+
+    right = []
+    for chunk in _chunks(np.unique(mid).tolist()):
+        right.extend(
+            Follow.objects.filter(follower_id__in=chunk, accepted=True).order_by("follower_id", "-pk")
+            .values_list("follower_id", "following_id")
+        )
+    right_mid, right_dst = _edges(right)
+    keep = _first_per_group(right_mid, per_user)
+    return two_hop(src, mid, right_mid[keep], right_dst[keep]), followed
+
+
+def co_engagement(user_ids):
+    """(user, candidate, weight): likers of the same recent posts, 1/log2(1 + likers) per post"""
+    since = timezone.now() - timedelta(days=_setting("SUGGESTIONS_LIKE_DAYS", 30))
+    rows = list(
+        Like.objects.filter(user_id__in=user_ids, created_at__gte=since).order_by("user_id", "-pk")
+        .values_list("user_id", "post_id")
+    )
+    src, mid = _edges(rows)
+    keep = _first_per_group(src, _setting("SUGGESTIONS_LIKES_PER_USER", 200))
+    src, mid = src[keep], mid[keep]
+
+    max_likers = _setting("SUGGESTIONS_MAX_POST_LIKERS", 5000)
+    likers = {}
+    for chunk in _chunks(np.unique(mid).tolist()):
+        likers.update(
+            Like.objects.filter(post_id__in=chunk).values("post_id").annotate(n=Count("id"))
+            .filter(n__lte=max_likers).values_list("post_id", "n")
+        )
+    right = []
+    for chunk in _chunks(likers):
+        right.extend(Like.objects.filter(post_id__in=chunk).values_list("post_id", "user_id"))
+    right_mid, right_dst = _edges(right)
+    counts = np.array([likers[post_id] for post_id in right_mid.tolist()], dtype=np.float64)
+    return two_hop(src, mid, right_mid, right_dst, 1.0 / np.log2(1.0 + counts))
+
+
+def compute_suggestions(user_ids):
+    """Top candidates per user: [(user_id, candidate_id, score, mutuals), ...] best first"""
+    weights = _setting("SUGGESTIONS_WEIGHTS", {"mutual": 1.0, "colike": 0.5})
+    (fof_src, fof_dst, mutuals), followed = friends_of_friends(user_ids)
+    co_src, co_dst, colikes = co_engagement(user_ids)
+
+    keys = np.concatenate([_pair_keys(fof_src, fof_dst), _pair_keys(co_src, co_dst)])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    mutual_counts = np.bincount(inverse[:len(fof_src)], weights=mutuals, minlength=len(keys))
+    scores = np.bincount(
+        inverse,
+        weights=np.concatenate([weights["mutual"] * mutuals, weights["colike"] * colikes]),
+        minlength=len(keys),
+    )
+
+    # Not the user, nor anyone they follow, requested, blocked or were blocked by
+    users, candidates = _split_keys(keys)
+    blocked = list(Block.objects.filter(blocker_id__in=user_ids).values_list("blocker_id", "blocked_id"))
+    blocked += [(b, a) for a, b in Block.objects.filter(blocked_id__in=user_ids).values_list("blocker_id", "blocked_id")]
+    excluded = np.concatenate([followed, _pair_keys(*_edges(blocked))])
+    keep = (users != candidates) & ~np.isin(keys, excluded)
+    users, candidates, scores, mutual_counts = users[keep], candidates[keep], scores[keep], mutual_counts[keep]
+
+    order = np.lexsort((candidates, -scores, users))
+    users, candidates, scores, mutual_counts = users[order], candidates[order], scores[order], mutual_counts[order]
+    top = _first_per_group(users, _setting("SUGGESTIONS_PER_USER", 50))
+    return list(zip(
+        users[top].tolist(), candidates[top].tolist(), scores[top].tolist(), mutual_counts[top].astype(int).tolist()
+    ))
+
+
+def refresh_suggestions(user_ids):
+    """Recompute and replace the stored suggestions of these users"""
+    user_ids = list(user_ids)
+    now = timezone.now()
+    rows, rank = [], {}
+    for user_id, candidate_id, score, mutuals in compute_suggestions(user_ids):
+        rank[user_id] = rank.get(user_id, -1) + 1
+        rows.append(Suggestion(
+            user_id=user_id, candidate_id=candidate_id, rank=rank[user_id],
+            score=score, mutuals=mutuals, computed_at=now,
+        ))
+    with transaction.atomic():
+        Suggestion.objects.filter(user_id__in=user_ids).delete()
+        Suggestion.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_queued_suggestions(limit=None, batch_size=None):
+    """Work through SuggestionQueue oldest first; returns (users, suggestions)"""
+    batch_size = batch_size or _setting("SUGGESTIONS_BATCH_SIZE", 500)
+    users = suggestions = 0
+    while limit is None or users < limit:
+        size = batch_size if limit is None else min(batch_size, limit - users)
+        started = timezone.now()
+        user_ids = list(SuggestionQueue.objects.order_by("queued_at").values_list("user_id", flat=True)[:size])
+        if not user_ids:
+            break
+        suggestions += refresh_suggestions(user_ids)
+        # Users queued again while this batch ran stay queued
+        SuggestionQueue.objects.filter(user_id__in=user_ids, queued_at__lt=started).delete()
+        users += len(user_ids)
+    return users, suggestions
+
+
+def queue_suggestions(*user_ids):
+    """Call inside the write that changed these users' follows, blocks or likes"""
+    now = timezone.now()
+    SuggestionQueue.objects.bulk_create(
+        [SuggestionQueue(user_id=user_id, queued_at=now) for user_id in set(user_ids)],
+        update_conflicts=True, unique_fields=["user"], update_fields=["queued_at"],
+    )
+
+
+def queue_all_suggestions(batch_size=1000):
+    """Queue every active account (first run, or after changing the weights)"""
+    user_ids = list(User.objects.filter(is_active=True).values_list("pk", flat=True))
+    for chunk in _chunks(user_ids, batch_size):
+        queue_suggestions(*chunk)
+    return len(user_ids)
+
+
+def follow_changed(follower_id):
+    """
+    A follow of `follower_id` was added, accepted or removed: their own
+    candidates change, and so do their followers' friends of friends.
+    """
+    followers = list(
+        Follow.objects.filter(following_id=follower_id, accepted=True).order_by("-pk")
+        .values_list("follower_id", flat=True)[:_setting("SUGGESTIONS_QUEUE_FOLLOWERS", 1000)]
+    )
+    queue_suggestions(follower_id, *followers)
+
+
+def get_suggestions(user, hidden=(), limit=20):
+    """Stored suggestions in rank order, skipping accounts followed or hidden since"""
+    return list(
+        Suggestion.objects.filter(user_id=user.pk, candidate__is_active=True)
+        .exclude(candidate_id__in=Follow.objects.filter(follower_id=user.pk).values("following_id"))
+        .exclude(candidate_id__in=list(hidden))
+        .select_related("candidate")
+        .order_by("rank")[:limit]
+    )
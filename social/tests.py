@@ -1,3 +1,194 @@
+import numpy as np
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from posts import services
+from posts.models import PostMedia
+from .models import Block, Follow, Suggestion, SuggestionQueue
+from .profile import GRID_PAGE_SIZE
+from .suggestions import _pair_keys, queue_suggestions, refresh_queued_suggestions, refresh_suggestions
+
+
+def make_user(username, **extra):
+    return User.objects.create_user(username=username, password="pw12345!xZ", email=f"{username}@example.com", **extra)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+# ------------------------------------------------------------
+# Profile page aggregate (social/profile.py)
+# ------------------------------------------------------------
+class ProfileAggregateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user("owner")
+        self.viewer = make_user("viewer")
+        self.client = client_for(self.viewer)
+
+    def profile(self, user=None):
+        response = self.client.get(f"/api/users/{(user or self.owner).pk}/profile/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_and_first_grid_page(self):
+        posts = [services.create_post(self.owner, caption=str(i)) for i in range(GRID_PAGE_SIZE + 1)]
+        PostMedia.objects.create(post=posts[-1], file="uploads/posts/first.jpg")
+        PostMedia.objects.create(post=posts[-1], file="uploads/posts/second.jpg")
+        self.client.post(f"/api/users/{self.owner.pk}/follow/")
+
+        payload = self.profile()
+        self.assertEqual(
+            (payload["posts_count"], payload["followers_count"], payload["following_count"]),
+            (GRID_PAGE_SIZE + 1, 1, 0),
+        )
+        self.assertEqual([p["id"] for p in payload["posts"]], [p.pk for p in reversed(posts)][:GRID_PAGE_SIZE])
+        self.assertTrue(payload["has_more_posts"])
+        newest = payload["posts"][0]
+        self.assertEqual(newest["media_count"], 2)
+        self.assertTrue(newest["thumbnail"].endswith("uploads/posts/first.jpg"))
+
+    def test_payload_is_cached_until_the_owner_posts(self):
+        self.assertEqual(self.profile()["posts_count"], 0)
+        with self.assertNumQueries(0):
+            self.profile()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.create_post(self.owner, caption="new")
+        self.assertEqual(self.profile()["posts_count"], 1)
+
+    def test_private_grid_needs_an_accepted_follow(self):
+        self.owner.is_private = True
+        self.owner.save()
+        services.create_post(self.owner, caption="secret")
+
+        payload = self.profile()
+        self.assertEqual((payload["posts_count"], payload["posts"]), (1, []))
+        # A pending request isn't enough
+        self.assertEqual(self.client.post(f"/api/users/{self.owner.pk}/follow/").status_code, 202)
+        self.assertEqual(client_for(User.objects.get(pk=self.viewer.pk)).get(
+            f"/api/users/{self.owner.pk}/profile/").json()["posts"], [])
+        self.assertEqual(len(client_for(self.owner).get(f"/api/users/{self.owner.pk}/profile/").json()["posts"]), 1)
+
+    def test_blocked_viewer_gets_not_found(self):
+        self.assertEqual(client_for(self.owner).post(f"/api/users/{self.viewer.pk}/block/").status_code, 201)
+        response = client_for(User.objects.get(pk=self.viewer.pk)).get(f"/api/users/{self.owner.pk}/profile/")
+        self.assertEqual(response.status_code, 404)
+
+
+# ------------------------------------------------------------
+# Per-viewer visibility (social/visibility.py)
+# ------------------------------------------------------------
+class VisibilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = make_user("author", is_private=True)
+        self.viewer = make_user("viewer")
+        self.post = services.create_post(self.author, caption="followers only")
+
+    def get(self, user, path):
+        # A fresh user object per request, as in production (visibility sets are memoized on it)
+        return client_for(User.objects.get(pk=user.pk)).get(path)
+
+    def feed_ids(self, user):
+        return [p["id"] for p in self.get(user, "/api/posts/").json()["results"]]
+
+    def test_private_posts_need_an_accepted_follow(self):
+        self.assertEqual(self.feed_ids(self.viewer), [])
+        self.assertEqual(self.get(self.viewer, f"/api/posts/{self.post.pk}/").status_code, 404)
+        self.assertEqual(self.feed_ids(self.author), [self.post.pk])
+
+        self.assertEqual(client_for(self.viewer).post(f"/api/users/{self.author.pk}/follow/").status_code, 202)
+        self.assertEqual(self.feed_ids(self.viewer), [])
+
+        response = client_for(self.author).post(f"/api/users/follow-requests/{self.viewer.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.feed_ids(self.viewer), [self.post.pk])
+        self.assertEqual(self.get(self.viewer, f"/api/posts/{self.post.pk}/").status_code, 200)
+
+    def test_going_public_accepts_pending_requests(self):
+        client_for(self.viewer).post(f"/api/users/{self.author.pk}/follow/")
+        response = client_for(self.author).patch("/api/accounts/profile/", {"is_private": False}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.feed_ids(self.viewer), [self.post.pk])
+        self.assertEqual(User.objects.get(pk=self.author.pk).followers_count, 1)
+
+    def test_blocks_hide_posts_and_comments_both_ways(self):
+        public = make_user("public")
+        public_post = services.create_post(public, caption="open")
+        services.add_comment(public_post, self.viewer, "from viewer")
+        services.add_comment(public_post, public, "from public")
+
+        self.assertEqual(client_for(public).post(f"/api/users/{self.viewer.pk}/block/").status_code, 201)
+        # The blocked side no longer sees the blocker's posts...
+        self.assertNotIn(public_post.pk, self.feed_ids(self.viewer))
+        self.assertEqual(self.get(self.viewer, f"/api/posts/{public_post.pk}/").status_code, 404)
+        # ...and a third party's view is unchanged, while the blocker stops seeing the blocked user's comments
+        comments = self.get(public, f"/api/posts/{public_post.pk}/comments/").json()["results"]
+        self.assertEqual([c["content"] for c in comments], ["from public"])
+        self.assertEqual(len(self.get(self.author, f"/api/posts/{public_post.pk}/comments/").json()["results"]), 2)
+
+        self.assertEqual(client_for(public).post(f"/api/users/{self.viewer.pk}/block/").status_code, 200)
+        self.assertIn(public_post.pk, self.feed_ids(self.viewer))
+
+
+# ------------------------------------------------------------
+# Suggested accounts (social/suggestions.py)
+# ------------------------------------------------------------
+class SuggestionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = {name: make_user(name) for name in ("me", "b", "c", "d", "e", "f")}
+        me, b, c, d, e = (self.users[n] for n in "me b c d e".split())
+        # d is followed by both accounts "me" follows, e by one of them
+        for follower, following in ((me, b), (me, c), (b, d), (c, d), (c, e)):
+            Follow.objects.create(follower=follower, following=following)
+        # f liked the same post as "me"
+        post = services.create_post(b, caption="liked")
+        services.toggle_post_like(post, me)
+        services.toggle_post_like(post, self.users["f"])
+        # Likes queue their users; tests queue their own
+        SuggestionQueue.objects.all().delete()
+
+    def suggested(self, user="me"):
+        return list(
+            Suggestion.objects.filter(user=self.users[user]).order_by("rank")
+            .values_list("candidate__username", "mutuals")
+        )
+
+    def test_friends_of_friends_outrank_co_likers(self):
+        self.assertEqual(refresh_suggestions([self.users["me"].pk]), 3)
+        self.assertEqual(self.suggested(), [("d", 2), ("e", 1), ("f", 0)])
+
+        response = client_for(self.users["me"]).get("/api/users/suggestions/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s["user"]["username"] for s in response.json()], ["d", "e", "f"])
+
+    def test_followed_requested_and_blocked_accounts_are_skipped(self):
+        me = self.users["me"]
+        Follow.objects.create(follower=me, following=self.users["d"], accepted=False)
+        Block.objects.create(blocker=self.users["e"], blocked=me)
+        refresh_suggestions([me.pk])
+        self.assertEqual(self.suggested(), [("f", 0)])
+
+    def test_queued_users_are_refreshed_in_batches(self):
+        me, c = self.users["me"], self.users["c"]
+        Suggestion.objects.create(user=c, candidate=self.users["f"], rank=0, score=1.0, mutuals=0, computed_at=timezone.now())
+        queue_suggestions(me.pk, c.pk, me.pk)
+        self.assertEqual(refresh_queued_suggestions(batch_size=1), (2, 3))
+        self.assertFalse(SuggestionQueue.objects.exists())
+        # c's stale row is replaced by what the graph gives now (nothing)
+        self.assertEqual(self.suggested("c"), [])
+        self.assertEqual(refresh_queued_suggestions(), (0, 0))
+
+    def test_pair_keys_reject_ids_that_do_not_fit_32_bits(self):
+        self.assertEqual(_pair_keys([1], [2]).tolist(), [(1 << 32) | 2])
+        for a, b in (([1 << 32], [1]), ([1], [-1])):
+            with self.assertRaises(ValueError):
+                _pair_keys(np.array(a), np.array(b))
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("<int:user_id>/profile/", views.ProfileAggregateView.as_view(), name="user-profile"),
+    path("<int:user_id>/follow/", views.FollowToggleView.as_view(), name="user-follow"),
+    path("<int:user_id>/block/", views.BlockToggleView.as_view(), name="user-block"),
+    path("suggestions/", views.SuggestionListView.as_view(), name="user-suggestions"),
+    path("follow-requests/", views.FollowRequestListView.as_view(), name="follow-requests"),
+    path("follow-requests/<int:user_id>/", views.FollowRequestView.as_view(), name="follow-request"),
+]
@@ -1,3 +1,183 @@
-from django.shortcuts import render
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.shortcuts import get_object_or_404
 
-# Create your views here.
+from accounts.models import User
+from posts.serializers import UserPublicSerializer
+from .models import Follow, Block
+from .profile import get_profile_payload, invalidate_profile
+from .suggestions import follow_changed, get_suggestions
+from .visibility import get_visibility, invalidate_visibility
+
+
+def adjust_follow_counters(follower_id, following_id, delta):
+    User.objects.filter(pk=follower_id).update(following_count=F("following_count") + delta)
+    User.objects.filter(pk=following_id).update(followers_count=F("followers_count") + delta)
+
+
+# ------------------------------------------------------------
+# Profile Page (aggregate)
+# ------------------------------------------------------------
+class ProfileAggregateView(APIView):
+    """
+    GET -> public info, post/follower/following counts and the first grid page
+           (no grid for private accounts the viewer doesn't follow)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, user_id):
+        hidden, allowed, _ = get_visibility(request.user)
+        payload = None if user_id in hidden else get_profile_payload(user_id)
+        if payload is None:
+            return Response({"detail": "No User matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+        if payload["is_private"] and user_id not in allowed:
+            payload = {**payload, "posts": [], "has_more_posts": False}
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+# ------------------------------------------------------------
+# Follow & Unfollow User
+# ------------------------------------------------------------
+class FollowToggleView(APIView):
+    """
+    POST -> toggle follow/unfollow a user (a request, for private accounts)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, user_id):
+        hidden, _, _ = get_visibility(request.user)
+        target = get_object_or_404(User.objects.exclude(pk__in=hidden), pk=user_id, is_active=True)
+        user = request.user
+        if target.pk == user.pk:
+            return Response({"error": "You cannot follow yourself"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            follow, created = Follow.objects.get_or_create(
+                follower=user, following=target, defaults={"accepted": not target.is_private}
+            )
+            if not created:
+                follow.delete()
+            if follow.accepted:
+                adjust_follow_counters(user.pk, target.pk, 1 if created else -1)
+            follow_changed(user.pk)
+        invalidate_profile(user.pk, target.pk)
+        invalidate_visibility(user.pk)
+
+        if created and not follow.accepted:
+            return Response({"message": "Follow requested"}, status=status.HTTP_202_ACCEPTED)
+        if created:
+            return Response({"message": "Followed user"}, status=status.HTTP_201_CREATED)
+        return Response({"message": "Unfollowed user"}, status=status.HTTP_200_OK)
+
+
+# ------------------------------------------------------------
+# Follow Requests (private accounts)
+# ------------------------------------------------------------
+class FollowRequestListView(APIView):
+    """
+    GET -> pending follow requests to the current user
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        pending = (
+            Follow.objects.filter(following=request.user, accepted=False, follower__is_active=True)
+            .select_related("follower")
+            .order_by("-created_at")[:100]
+        )
+        return Response([
+            {"user": UserPublicSerializer(follow.follower, context={"request": request}).data,
+             "created_at": follow.created_at}
+            for follow in pending
+        ], status=status.HTTP_200_OK)
+
+
+class FollowRequestView(APIView):
+    """
+    POST   -> accept a pending follow request from a user
+    DELETE -> decline it
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_request(self, request, user_id):
+        return get_object_or_404(Follow, follower_id=user_id, following=request.user, accepted=False)
+
+    def post(self, request, user_id):
+        follow = self.get_request(request, user_id)
+        with transaction.atomic():
+            Follow.objects.filter(pk=follow.pk).update(accepted=True)
+            adjust_follow_counters(follow.follower_id, request.user.pk, 1)
+            follow_changed(follow.follower_id)
+        invalidate_profile(follow.follower_id, request.user.pk)
+        invalidate_visibility(follow.follower_id)
+        return Response({"message": "Follow request accepted"}, status=status.HTTP_200_OK)
+
+    def delete(self, request, user_id):
+        self.get_request(request, user_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ------------------------------------------------------------
+# Suggested Accounts
+# ------------------------------------------------------------
+class SuggestionListView(APIView):
+    """
+    GET -> accounts to follow (friends of friends, co-engagement), best first,
+           as precomputed by `manage.py refresh_suggestions`; ?limit=<1-50>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, getattr(settings, "SUGGESTIONS_PER_USER", 50)))
+        hidden, _, _ = get_visibility(request.user)
+        suggestions = get_suggestions(request.user, hidden=hidden, limit=limit)
+        return Response([
+            {"user": UserPublicSerializer(suggestion.candidate, context={"request": request}).data,
+             "mutuals": suggestion.mutuals}
+            for suggestion in suggestions
+        ], status=status.HTTP_200_OK)
+
+
+# ------------------------------------------------------------
+# Block & Unblock User
+# ------------------------------------------------------------
+class BlockToggleView(APIView):
+    """
+    POST -> toggle block/unblock a user (blocking also removes follows both ways)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, user_id):
+        target = get_object_or_404(User, pk=user_id)
+        user = request.user
+        if target.pk == user.pk:
+            return Response({"error": "You cannot block yourself"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            block, created = Block.objects.get_or_create(blocker=user, blocked=target)
+            if not created:
+                block.delete()
+            else:
+                edges = Follow.objects.filter(
+                    Q(follower=user, following=target) | Q(follower=target, following=user)
+                )
+                for follow in edges:
+                    if follow.accepted:
+                        adjust_follow_counters(follow.follower_id, follow.following_id, -1)
+                edges.delete()
+            follow_changed(user.pk)
+            follow_changed(target.pk)
+        invalidate_profile(user.pk, target.pk)
+        invalidate_visibility(user.pk, target.pk)
+
+        if created:
+            return Response({"message": "Blocked user"}, status=status.HTTP_201_CREATED)
+        return Response({"message": "Unblocked user"}, status=status.HTTP_200_OK)
@@ -0,0 +1,86 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import User
+from .models import Block, Follow
+
+
+# ------------------------------------------------------------
+# Per-viewer visibility sets
+# ------------------------------------------------------------
+# Who a viewer may see comes down to two small id sets:
+#   hidden  -> authors the viewer blocked or was blocked by
+#   allowed -> private authors the viewer follows (accepted), plus the viewer
+# They are cached per viewer and memoized on the user object for the rest of
+# the request, and applied as one queryset filter (Post.objects.visible_to()).
+
+def visibility_cache_key(user_id):
+    return f"visibility:{user_id}"
+
+
+def invalidate_visibility(*user_ids):
+    """Drop cached visibility sets after a block, follow or privacy change"""
+    cache.delete_many([visibility_cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_follower_visibility(user_id, batch_size=1000):
+    """A user went private/public: every follower's allowed set may change"""
+    follower_ids = list(Follow.objects.filter(following_id=user_id).values_list("follower_id", flat=True))
+    for i in range(0, len(follower_ids), batch_size):
+        invalidate_visibility(*follower_ids[i:i + batch_size])
+
+
+def privacy_changed(user):
+    """
+    After a user toggles is_private: going public accepts pending follow
+    requests; either way followers' cached allowed sets are dropped.
+    """
+    from .suggestions import queue_suggestions  # posts.models -> visibility -> suggestions -> posts.models
+    if not user.is_private:
+        with transaction.atomic():
+            pending = list(
+                Follow.objects.filter(following_id=user.pk, accepted=False).values_list("pk", "follower_id")
+            )
+            if pending:
+                Follow.objects.filter(pk__in=[pk for pk, _ in pending]).update(accepted=True)
+                User.objects.filter(pk__in=[f for _, f in pending]).update(following_count=F("following_count") + 1)
+                User.objects.filter(pk=user.pk).update(followers_count=F("followers_count") + len(pending))
+                queue_suggestions(*[f for _, f in pending])
+    invalidate_follower_visibility(user.pk)
+
+
+def build_visibility(user_id):
+    hidden = set(Block.objects.filter(blocker_id=user_id).values_list("blocked_id", flat=True))
+    hidden.update(Block.objects.filter(blocked_id=user_id).values_list("blocker_id", flat=True))
+    allowed = set(
+        Follow.objects.filter(follower_id=user_id, accepted=True, following__is_private=True)
+        .values_list("following_id", flat=True)
+    )
+    allowed.add(user_id)
+    # Part of ETags, so a new block also changes cached comment previews
+    tag = hashlib.md5(",".join(map(str, sorted(hidden))).encode(), usedforsecurity=False).hexdigest()[:8]
+    return frozenset(hidden), frozenset(allowed), tag
+
+
+def get_visibility(user):
+    """Return (hidden_ids, allowed_ids, tag) for a viewer"""
+    sets = getattr(user, "_visibility", None)
+    if sets is None:
+        key = visibility_cache_key(user.pk)
+        sets = cache.get(key)
+        if sets is None:
+            sets = build_visibility(user.pk)
+            cache.set(key, sets, getattr(settings, "VISIBILITY_CACHE_TIMEOUT", 300))
+        user._visibility = sets
+    return sets
+
+
+def can_view_author(user, author_id, author_is_private):
+    hidden, allowed, _ = get_visibility(user)
+    if author_id in hidden:
+        return False
+    return not author_is_private or author_id in allowed
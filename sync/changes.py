@@ -0,0 +1,95 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Exists, OuterRef
+
+from posts.reaper import keyset_chunks, raw_delete
+from .models import Change
+
+
+# ------------------------------------------------------------
+# Recording changes
+# ------------------------------------------------------------
+# Called from the write services, inside their transaction: the change row
+# commits (or rolls back) together with the write it describes. Writers take
+# no lock here; keeping the cursor safe is the read path's job (below).
+
+def record_change(kind, object_id, post_id, deleted=False):
+    Change.objects.create(kind=kind, object_id=object_id, post_id=post_id, deleted=deleted)
+
+
+def record_changes(kind, rows, deleted=False, batch_size=1000):
+    """One change per (object_id, post_id) row, inserted in batches"""
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        Change.objects.bulk_create([
+            Change(kind=kind, object_id=object_id, post_id=post_id, deleted=deleted)
+            for object_id, post_id in batch
+        ])
+
+
+def record_author_removed(user_id):
+    """
+    A deactivated account's posts and comments disappear for every client at
+    once: one `author` change, however much content the account has. Clients
+    drop its posts (with their comments) and its comments elsewhere.
+    """
+    record_change(Change.AUTHOR, user_id, None, deleted=True)
+
+
+# ------------------------------------------------------------
+# Settled changes (read path)
+# ------------------------------------------------------------
+# A seq is taken at insert but becomes visible at commit, so seq 11 can be
+# readable while seq 10 is still in an open transaction; a client that moved
+# its cursor to 11 would never see 10. On SQLite that can't happen: write
+# transactions run one at a time (they start IMMEDIATE), so seqs commit in
+# order. On PostgreSQL the cursor is held back to the oldest open write
+# transaction instead: every seq such a transaction holds (or will take) was
+# allocated after it started, and so was every higher seq. Changes created
+# before that start, less SYNC_HOLDBACK_SECONDS for the time an INSERT
+# statement takes, can no longer be overtaken.
+#
+# Reading other sessions' xact_start needs the same role as the app's other
+# connections, or pg_read_all_stats.
+
+_OLDEST_WRITE_SQL = """
+    SELECT LEAST(MIN(xact_start), clock_timestamp()) FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+"""
+
+
+def settled_before():
+    """Changes created before the returned time are safe to serve (None: all committed ones are)"""
+    connection = connections[Change.objects.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(_OLDEST_WRITE_SQL)
+        (oldest,) = cursor.fetchone()
+    return oldest - timedelta(seconds=getattr(settings, "SYNC_HOLDBACK_SECONDS", 1))
+
+
+def settled_changes():
+    """The change log as far as a cursor may advance right now"""
+    before = settled_before()
+    changes = Change.objects.all()
+    return changes if before is None else changes.filter(created_at__lt=before)
+
+
+# ------------------------------------------------------------
+# Compaction
+# ------------------------------------------------------------
+# Only the latest change per object matters to a client: any cursor older
+# than a superseded row is also older than the row that replaced it.
+
+def compact_changes(batch_size=10_000):
+    """Delete changes superseded by a newer one for the same object; returns the count"""
+    newer = Change.objects.filter(kind=OuterRef("kind"), object_id=OuterRef("object_id"), seq__gt=OuterRef("seq"))
+    removed = 0
+    for rows in keyset_chunks(Change.objects.all(), batch_size=batch_size):
+        superseded = Change.objects.filter(seq__gte=rows[0][0], seq__lte=rows[-1][0]).filter(Exists(newer))
+        removed += raw_delete(Change, list(superseded.values_list("seq", flat=True)))
+    return removed
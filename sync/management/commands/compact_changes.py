@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sync.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = "Drop sync changes superseded by a newer change to the same object (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = compact_changes(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {count} superseded changes in {time.perf_counter() - start:.2f}s"
+        ))
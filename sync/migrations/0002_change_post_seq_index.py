@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['post_id', 'seq'], name='sync_change_post_id_3da817_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:38
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0002_change_post_seq_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='change',
+            name='created_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.AlterField(
+            model_name='change',
+            name='kind',
+            field=models.CharField(choices=[('post', 'Post'), ('comment', 'Comment'), ('author', 'Author')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='change',
+            name='post_id',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+from django.db.models.functions import Now
+
+
+class Change(models.Model):
+    """
+    Sequenced log of post and comment changes served by /api/sync/.
+    `seq` is the cursor clients resume from. Likes are recorded as an update
+    of the liked post/comment (its counters changed); a removed account is a
+    single deleted `author` change covering all its posts and comments.
+    Plain ids, like EngagementEvent, so the log never joins or cascades.
+    """
+    POST = "post"
+    COMMENT = "comment"
+    AUTHOR = "author"
+    KIND_CHOICES = [
+        (POST, "Post"),
+        (COMMENT, "Comment"),
+        (AUTHOR, "Author"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # The post a comment belongs to (a post's own id for posts, none for authors)
+    post_id = models.BigIntegerField(null=True)
+    deleted = models.BooleanField(default=False)
+    # Database clock at insert: the sync read path compares it with open transactions
+    created_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "object_id", "seq"]),
+            # Latest change of a post or its comments (post ETags)
+            models.Index(fields=["post_id", "seq"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.kind} {self.object_id}{' deleted' if self.deleted else ''}"
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.services import delete_account
+from posts import services
+from .changes import settled_before
+from .models import Change
+
+
+# ------------------------------------------------------------
+# /api/sync/ cursor
+# ------------------------------------------------------------
+class SyncCursorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="pw12345!xZ", email="a@example.com")
+        self.reader = User.objects.create_user(username="reader", password="pw12345!xZ", email="r@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def sync(self, since=None, **params):
+        if since is not None:
+            params["since"] = since
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def changes(self, since):
+        return [(c["type"], c["id"], c["deleted"]) for c in self.sync(since)["changes"]]
+
+    def test_cursor_without_since_skips_history(self):
+        services.create_post(self.author, caption="old")
+        cursor = self.sync()
+        self.assertEqual(cursor["changes"], [])
+        self.assertEqual(self.sync(cursor["next"])["changes"], [])
+
+    def test_changes_after_the_cursor_compacted_per_object(self):
+        cursor = self.sync()["next"]
+        post = services.create_post(self.author, caption="first")
+        services.update_post(post, caption="edited")
+        comment = services.add_comment(post, self.reader, "hi")
+
+        page = self.sync(cursor)
+        self.assertEqual([(c["type"], c["id"]) for c in page["changes"]], [("post", post.pk), ("comment", comment.pk)])
+        self.assertEqual(page["changes"][0]["data"]["caption"], "edited")
+        self.assertEqual(self.sync(page["next"])["changes"], [])
+
+        services.delete_post(post)
+        self.assertEqual(self.changes(page["next"]), [("post", post.pk, True)])
+
+    def test_pages_resume_from_next(self):
+        cursor = self.sync()["next"]
+        posts = [services.create_post(self.author, caption=str(i)) for i in range(5)]
+
+        seen = []
+        while True:
+            page = self.sync(cursor, limit=2)
+            seen += [c["id"] for c in page["changes"]]
+            cursor = page["next"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(seen, [p.pk for p in posts])
+
+    def test_rolled_back_writes_leave_no_change(self):
+        cursor = self.sync()["next"]
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            services.create_post(self.author, caption="never")
+            raise RuntimeError
+        self.assertEqual(self.sync(cursor), {"changes": [], "next": cursor, "has_more": False})
+
+    def test_removed_account_content_comes_back_deleted(self):
+        post = services.create_post(self.author, caption="mine")
+        services.add_comment(post, self.author, "me too")
+        cursor = self.sync()["next"]
+
+        with self.assertNumQueries(4):
+            delete_account(self.author)
+        # One change however much the account wrote; clients drop its content
+        self.assertEqual(self.changes(cursor), [("author", self.author.pk, True)])
+        self.assertFalse(Change.objects.exclude(kind=Change.AUTHOR).filter(deleted=True).exists())
+
+    def test_cursor_is_held_back_to_settled_changes(self):
+        cursor = self.sync()["next"]
+        post = services.create_post(self.author, caption="first")
+        with mock.patch("sync.views.settled_changes", return_value=Change.objects.filter(seq__lte=cursor)):
+            self.assertEqual(self.sync(cursor), {"changes": [], "next": cursor, "has_more": False})
+            self.assertEqual(self.sync()["next"], cursor)
+        self.assertEqual(self.changes(cursor), [("post", post.pk, False)])
+
+    def test_settled_before_is_a_no_op_on_sqlite(self):
+        self.assertIsNone(settled_before())
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db.models import Max
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from posts.models import Post, Comment
+from posts.serializers import PostSerializer, CommentSerializer
+from posts.views import shape_post_queryset, shape_comment_queryset
+from project.serializers import resolve_fields
+from .changes import settled_changes
+from .models import Change
+
+# Comments arrive as their own changes, so nothing is nested
+POST_FIELDS = resolve_fields(PostSerializer) - {"comments"}
+COMMENT_FIELDS = resolve_fields(CommentSerializer) - {"replies"}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ------------------------------------------------------------
+# Incremental Sync (change log)
+# ------------------------------------------------------------
+class SyncView(APIView):
+    """
+    GET -> changes to posts and comments after ?since=<seq>, compacted to the
+           latest state per object (deletions and objects the user may no
+           longer see come back as `deleted`; a deleted `author` means all of
+           that account's posts and comments are gone); resume from `next`
+           while `has_more`. Without ?since= only the current cursor is
+           returned. ?limit=<1-500>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if "since" not in request.query_params:
+            current = settled_changes().aggregate(seq=Max("seq"))["seq"] or 0
+            return Response({"changes": [], "next": current, "has_more": False}, status=status.HTTP_200_OK)
+        try:
+            since = max(int(request.query_params["since"]), 0)
+            limit = int(request.query_params.get("limit", _setting("SYNC_PAGE_SIZE", 500)))
+        except ValueError:
+            return Response({"detail": "since and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 500))
+
+        # Only settled changes (sync/changes.py), so nothing can appear behind the cursor
+        rows = list(
+            settled_changes().filter(seq__gt=since).order_by("seq")
+            .values_list("seq", "kind", "object_id", "post_id", "deleted")[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Latest change per object, ordered by that change's seq
+        latest = {}
+        for seq, kind, object_id, post_id, deleted in rows:
+            latest.pop((kind, object_id), None)
+            latest[(kind, object_id)] = (seq, post_id, deleted)
+
+        wanted = {Change.POST: set(), Change.COMMENT: set(), Change.AUTHOR: set()}
+        for (kind, object_id), (_, _, deleted) in latest.items():
+            if not deleted:
+                wanted[kind].add(object_id)
+        data = {
+            Change.POST: self.load_posts(request, wanted[Change.POST]),
+            Change.COMMENT: self.load_comments(request, wanted[Change.COMMENT]),
+            # Only ever recorded as removed
+            Change.AUTHOR: {},
+        }
+
+        changes = []
+        for (kind, object_id), (seq, post_id, deleted) in latest.items():
+            item = data[kind].get(object_id)
+            change = {"seq": seq, "type": kind, "id": object_id, "post": post_id, "deleted": item is None}
+            if item is not None:
+                change["data"] = item
+            changes.append(change)
+
+        return Response({
+            "changes": changes,
+            "next": rows[-1][0] if rows else since,
+            "has_more": has_more,
+        }, status=status.HTTP_200_OK)
+
+    def load_posts(self, request, ids):
+        if not ids:
+            return {}
+        queryset = shape_post_queryset(Post.objects.filter(pk__in=ids), POST_FIELDS, request.user)
+        items = PostSerializer(queryset, many=True, context={"request": request, "fields": POST_FIELDS}).data
+        return {item["id"]: item for item in items}
+
+    def load_comments(self, request, ids):
+        if not ids:
+            return {}
+        queryset = shape_comment_queryset(Comment.objects.filter(pk__in=ids), COMMENT_FIELDS, request.user)
+        comments = list(queryset)
+        # Comment visibility only covers the author; the post must be visible too
+        visible_posts = set(
+            Post.objects.visible_to(request.user)
+            .filter(pk__in={c.post_id for c in comments}).values_list("pk", flat=True)
+        )
+        comments = [c for c in comments if c.post_id in visible_posts]
+        items = CommentSerializer(comments, many=True, context={"request": request, "fields": COMMENT_FIELDS}).data
+        return {item["id"]: item for item in items}